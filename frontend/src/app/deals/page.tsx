@@ -1,27 +1,87 @@
 "use client";
 
-import { useEffect, useState } from "react";
+import { useCallback, useEffect, useState } from "react";
 import DealCard from "./components/DealCard";
 
+// API 回傳 naive UTC 時間，補上 Z 再解析
+const endTime = (deal: any) =>
+  deal.end_at ? Date.parse(deal.end_at.endsWith("Z") ? deal.end_at : `${deal.end_at}Z`) : null;
+
+const isActive = (deal: any) => {
+  const end = endTime(deal);
+  return end === null || end > Date.now();
+};
+
+const fetchDeals = (platform: string, cursor: string | null) => {
+  const params = new URLSearchParams({ platform });
+  if (cursor) params.set("cursor", cursor);
+  return fetch(`/api/flash-deals?${params}`).then((r) => r.json());
+};
+
 export default function DealsPage() {
   const [platform, setPlatform] = useState<"pchome" | "momo">("pchome");
   const [deals, setDeals] = useState<any[]>([]);
   const [sortBy, setSortBy] = useState<"discount" | "time">("discount");
   const [loading, setLoading] = useState(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const sortDeals = useCallback(
+    (items: any[]) => {
+      const sorted = [...items];
+      if (sortBy === "discount") {
+        sorted.sort((a, b) => (a.discount_rate || 1) - (b.discount_rate || 1));
+      }
+      return sorted;
+    },
+    [sortBy]
+  );
 
   useEffect(() => {
     setLoading(true);
-    fetch(`/api/flash-deals?platform=${platform}`)
-      .then((r) => r.json())
+    fetchDeals(platform, null).then((data) => {
+      setDeals(sortDeals(data.items || []));
+      setNextCursor(data.next_cursor || null);
+      setLoading(false);
+    });
+  }, [platform, sortDeals]);
+
+  // API 一次回傳一頁，依 next_cursor 載入下一頁
+  const loadMore = () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    fetchDeals(platform, nextCursor)
       .then((data) => {
-        const sorted = [...data];
-        if (sortBy === "discount") {
-          sorted.sort((a, b) => (a.discount_rate || 1) - (b.discount_rate || 1));
-        }
-        setDeals(sorted);
-        setLoading(false);
+        setDeals((prev) => {
+          const seen = new Set(prev.map((d) => d.id));
+          return sortDeals([...prev, ...(data.items || []).filter((d: any) => !seen.has(d.id))]);
+        });
+        setNextCursor(data.next_cursor || null);
+      })
+      .finally(() => setLoadingMore(false));
+  };
+
+  // 新上架的特賣由伺服器推送後直接加入列表
+  useEffect(() => {
+    const source = new EventSource("/api/events?types=flash_deal_added");
+    source.addEventListener("flash_deal_added", (e) => {
+      const deal = JSON.parse((e as MessageEvent).data);
+      if (deal.platform !== platform || !isActive(deal)) return;
+      setDeals((prev) => {
+        if (prev.some((d) => d.id === deal.id)) return prev;
+        return sortDeals([deal, ...prev]);
       });
-  }, [platform, sortBy]);
+    });
+    return () => source.close();
+  }, [platform, sortDeals]);
+
+  // 列表不會重新查詢，特賣結束後自行移除
+  useEffect(() => {
+    const timer = setInterval(() => {
+      setDeals((prev) => (prev.every(isActive) ? prev : prev.filter(isActive)));
+    }, 30_000);
+    return () => clearInterval(timer);
+  }, []);
 
   return (
     <main className="max-w-5xl mx-auto px-4 py-8">
@@ -62,11 +122,24 @@ export default function DealsPage() {
       ) : deals.length === 0 ? (
         <p className="text-center text-gray-400 py-12">目前無限時瘋搶資料</p>
       ) : (
-        <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
-          {deals.map((deal) => (
-            <DealCard key={deal.id} deal={deal} />
-          ))}
-        </div>
+        <>
+          <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
+            {deals.map((deal) => (
+              <DealCard key={deal.id} deal={deal} />
+            ))}
+          </div>
+          {nextCursor && (
+            <div className="flex justify-center mt-6">
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-5 py-2 rounded-xl border bg-white/60 text-sm text-gray-600 hover:bg-white disabled:opacity-50"
+              >
+                {loadingMore ? "載入中..." : "載入更多"}
+              </button>
+            </div>
+          )}
+        </>
       )}
     </main>
   );
@@ -17,11 +17,33 @@ export default function TrackingList() {
       .finally(() => setLoading(false));
   }, []);
 
+  // 排程更新價格時由伺服器推送，不需重新輪詢整個列表
+  useEffect(() => {
+    const source = new EventSource("/api/events?types=price_changed");
+    source.addEventListener("price_changed", (e) => {
+      const data = JSON.parse((e as MessageEvent).data);
+      setProducts((prev) =>
+        prev.map((p) =>
+          p.id === data.product_id
+            ? { ...p, current_price: data.price, lowest_price: data.lowest_price }
+            : p
+        )
+      );
+    });
+    return () => source.close();
+  }, []);
+
   const loadHistory = async (id: number) => {
     if (histories[id]) return;
-    const resp = await fetch(`/api/products/${id}/history`);
+    const resp = await fetch(
+      `/api/products/${id}/history?max_points=300&format=columnar`
+    );
     const data = await resp.json();
-    setHistories((prev) => ({ ...prev, [id]: data }));
+    const points = data.ts.map((ts: string, i: number) => ({
+      snapshot_at: ts,
+      price: data.price[i],
+    }));
+    setHistories((prev) => ({ ...prev, [id]: points }));
   };
 
   const toggle = (id: number) => {
@@ -76,6 +98,8 @@ export default function TrackingList() {
               <p className="font-medium">{p.name}</p>
               <p className="text-sm text-gray-400">
                 {p.platform.toUpperCase()}
+                {p.current_price != null && ` · 現價 $${p.current_price.toLocaleString()}`}
+                {p.lowest_price != null && ` · 最低 $${p.lowest_price.toLocaleString()}`}
                 {p.target_price && ` · 目標價 $${p.target_price.toLocaleString()}`}
               </p>
             </div>
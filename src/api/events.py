@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from typing import AsyncIterator, Optional, Set
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from src.config import get_settings
+from src.trackers.events import EVENT_TYPES, event_bus
+
+router = APIRouter(prefix="/api", tags=["events"])
+
+# 斷線後瀏覽器 EventSource 重新連線的等待時間（毫秒）
+RETRY_MS = 5000
+
+
+def _parse_types(types: Optional[str]) -> Optional[Set[str]]:
+    if not types:
+        return None
+    wanted = {t.strip() for t in types.split(",") if t.strip()}
+    unknown = wanted - set(EVENT_TYPES)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"未知的事件類型：{', '.join(sorted(unknown))}"
+        )
+    return wanted
+
+
+async def event_stream(
+    request: Request, types: Optional[Set[str]] = None, heartbeat: Optional[float] = None
+) -> AsyncIterator[str]:
+    """將訂閱到的事件轉為 SSE 格式；沒有事件時定期送出註解行維持連線"""
+    heartbeat = heartbeat or get_settings().event_heartbeat_seconds
+    with event_bus.subscribe(types) as subscription:
+        yield f"retry: {RETRY_MS}\n\n"
+        while not await request.is_disconnected():
+            event = await subscription.get(timeout=heartbeat)
+            yield event.to_sse() if event is not None else ": keep-alive\n\n"
+
+
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    types: Optional[str] = Query(None, description="以逗號分隔的事件類型，預設全部"),
+):
+    """價格變動、達到目標價與新特賣的即時推送（Server-Sent Events）"""
+    return StreamingResponse(
+        event_stream(request, _parse_types(types)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
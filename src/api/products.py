@@ -1,17 +1,38 @@
 from __future__ import annotations
 
 import re
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.config import get_settings
 from src.db.database import get_db
 from src.models.flash_deal import FlashDeal
 from src.models.price_history import PriceHistory
 from src.models.tracked_product import TrackedProduct
+from src.trackers.flash_deals import (
+    active_deal_clause,
+    after_cursor_clause,
+    discount_sort_key,
+    encode_cursor,
+)
+from src.trackers.history import PricePoint, downsample_lttb, expand_price_runs, to_columnar
+from src.trackers.registry import tracker_registry
+from src.trackers.rollups import (
+    bucket_start,
+    choose_grain,
+    first_rollup_query,
+    rollup_points,
+    rollup_query,
+    summarize_rollups,
+)
+from src.trackers.search import search_all_platforms
+from src.trackers.search_cache import search_cache
+from src.trackers.utils import get_async_tracker, utcnow
 
 router = APIRouter(prefix="/api", tags=["products"])
 
@@ -32,6 +53,8 @@ class ProductResponse(BaseModel):
     is_active: bool
     current_price: Optional[int] = None
     lowest_price: Optional[int] = None
+    last_checked_at: Optional[datetime] = None
+    lowest_price_at: Optional[datetime] = None
 
 
 class PriceHistoryResponse(BaseModel):
@@ -55,12 +78,45 @@ async def list_products(db: AsyncSession = Depends(get_db)):
                 url=p.url,
                 target_price=p.target_price,
                 is_active=p.is_active,
+                current_price=p.last_price,
+                lowest_price=p.lowest_price,
+                last_checked_at=p.last_checked_at,
+                lowest_price_at=p.lowest_price_at,
             )
             for p in products
         ]
     }
 
 
+@router.get("/products/search")
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """同時搜尋所有平台並依標題相關度合併；逾時的平台以 partial 標示"""
+    result = await search_all_platforms(
+        q, tracker_registry.platforms(), get_settings().search_deadline_seconds
+    )
+    return {
+        "query": q,
+        "partial": result.partial,
+        "platforms": result.platforms,
+        "items": [
+            {
+                "platform": r.product.platform,
+                "product_id": r.product.product_id,
+                "name": r.product.name,
+                "url": r.product.url,
+                "price": r.product.price,
+                "original_price": r.product.original_price,
+                "image_url": r.product.image_url,
+                "score": r.score,
+            }
+            for r in result.items[:limit]
+        ],
+    }
+
+
 @router.post("/products", status_code=201)
 async def add_product(body: AddProductRequest, db: AsyncSession = Depends(get_db)):
     if not body.url and not body.keyword:
@@ -96,12 +152,10 @@ async def add_product(body: AddProductRequest, db: AsyncSession = Depends(get_db
         await db.refresh(product)
         return {"id": product.id, "message": "已加入追蹤"}
 
-    from src.trackers.utils import get_tracker
-
-    tracker = get_tracker(platform)
+    tracker = get_async_tracker(platform)
     if tracker is None:
         raise HTTPException(status_code=500, detail="Tracker 不可用")
-    results = tracker.search_products(body.keyword)
+    results = await search_cache.search(tracker, body.keyword)
     return {
         "results": [
             {
@@ -127,44 +181,146 @@ async def remove_product(product_id: int, db: AsyncSession = Depends(get_db)):
 
 
 @router.get("/products/{product_id}/history")
-async def get_price_history(product_id: int, db: AsyncSession = Depends(get_db)):
-    result = await db.execute(
+async def get_price_history(
+    product_id: int,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    max_points: Optional[int] = Query(None, ge=2, le=5000),
+    format: Literal["rows", "columnar"] = Query("rows"),
+    db: AsyncSession = Depends(get_db),
+):
+    # 資料庫內皆為 naive UTC；帶時區的參數（例如 Z 結尾）先轉換
+    start, end = _naive_utc(start), _naive_utc(end)
+    points = None
+    if max_points is not None:
+        # 解析度足夠粗時直接讀 rollup，不掃描原始 price_history；
+        # 未指定起點時以商品最早的 rollup 估算資料跨度
+        first = start or await db.scalar(first_rollup_query(product_id))
+        if first is not None:
+            grain = choose_grain((end or utcnow()) - first, max_points)
+            if grain is not None:
+                result = await db.execute(rollup_query(product_id, grain, first, end))
+                points = rollup_points(result.scalars().all())
+    if not points:
+        # 尚未 backfill 的商品沒有 rollup，退回原始資料
+        points = await _load_price_points(db, product_id, start, end)
+    if max_points is not None:
+        points = downsample_lttb(points, max_points)
+
+    if format == "columnar":
+        return to_columnar(points)
+    return [
+        PriceHistoryResponse(
+            price=p.price,
+            original_price=p.original_price,
+            in_stock=p.in_stock,
+            snapshot_at=p.snapshot_at.isoformat(),
+            source=p.source,
+        )
+        for p in points
+    ]
+
+
+@router.get("/products/{product_id}/stats")
+async def get_price_stats(
+    product_id: int,
+    days: int = Query(30, ge=1, le=3650),
+    db: AsyncSession = Depends(get_db),
+):
+    """最近 N 天的最低／最高／平均／最新價，由 rollup 計算
+
+    只採用完全落在範圍內的 bucket；bucket 以 UTC 日／小時切分（非台北時間）。
+    起點所在的不完整 UTC 日改以小時 bucket 補上，統計範圍與 days 相符。
+    """
+    start = utcnow() - timedelta(days=days)
+    grain = choose_grain(timedelta(days=days))
+    result = await db.execute(rollup_query(product_id, grain, start, include_partial=False))
+    rollups = list(result.scalars().all())
+    if grain == "day":
+        first_day = bucket_start(start, "day")
+        if first_day < start:
+            first_day += timedelta(days=1)
+            result = await db.execute(rollup_query(
+                product_id, "hour", start, first_day - timedelta(hours=1), include_partial=False,
+            ))
+            rollups += result.scalars().all()
+    return {
+        "days": days,
+        "grain": grain,
+        "bucket_timezone": "UTC",
+        **summarize_rollups(rollups),
+    }
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+async def _load_price_points(
+    db: AsyncSession,
+    product_id: int,
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> List[PricePoint]:
+    stmt = (
         select(PriceHistory)
         .where(PriceHistory.product_id == product_id)
         .order_by(PriceHistory.snapshot_at.asc())
     )
-    history = result.scalars().all()
-    return [
-        PriceHistoryResponse(
-            price=h.price,
-            original_price=h.original_price,
-            in_stock=h.in_stock,
-            snapshot_at=h.snapshot_at.isoformat(),
-            source=h.source,
+    if start is not None:
+        stmt = stmt.where(
+            func.coalesce(PriceHistory.last_seen_at, PriceHistory.snapshot_at) >= start
         )
-        for h in history
-    ]
+    if end is not None:
+        stmt = stmt.where(PriceHistory.snapshot_at <= end)
+    result = await db.execute(stmt)
+    return expand_price_runs(result.scalars().all(), start, end)
 
 
 @router.get("/flash-deals")
 async def list_flash_deals(
     platform: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
     db: AsyncSession = Depends(get_db),
 ):
-    stmt = select(FlashDeal).order_by(FlashDeal.discount_rate.asc())
+    """目前進行中的特賣，依折扣排序並以 cursor 分頁"""
+    stmt = (
+        select(FlashDeal)
+        .where(active_deal_clause(utcnow()))
+        .order_by(discount_sort_key(), FlashDeal.id)
+        .limit(limit + 1)
+    )
     if platform:
         stmt = stmt.where(FlashDeal.platform == platform)
+    if cursor:
+        try:
+            stmt = stmt.where(after_cursor_clause(cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="cursor 格式錯誤")
     result = await db.execute(stmt)
     deals = result.scalars().all()
-    return [
-        {
-            "id": d.id,
-            "platform": d.platform,
-            "product_name": d.product_name,
-            "product_url": d.product_url,
-            "sale_price": d.sale_price,
-            "original_price": d.original_price,
-            "discount_rate": d.discount_rate,
-        }
-        for d in deals
-    ]
+
+    next_cursor = None
+    if len(deals) > limit:
+        deals = deals[:limit]
+        next_cursor = encode_cursor(deals[-1].discount_rate, deals[-1].id)
+    return {
+        "items": [
+            {
+                "id": d.id,
+                "platform": d.platform,
+                "product_name": d.product_name,
+                "product_url": d.product_url,
+                "sale_price": d.sale_price,
+                "original_price": d.original_price,
+                "discount_rate": d.discount_rate,
+                "start_at": d.start_at.isoformat() if d.start_at else None,
+                "end_at": d.end_at.isoformat() if d.end_at else None,
+            }
+            for d in deals
+        ],
+        "next_cursor": next_cursor,
+    }
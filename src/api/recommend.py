@@ -1,23 +1,24 @@
-from typing import Dict, List
+import json
+from typing import AsyncIterator, Dict, List
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import sessionmaker
 
 from src.config import get_settings
-from src.db.database import get_db
-from src.recommender.engine import RecommendationEngine, RecommendRequest
+from src.recommender.best_card import INDEX_DEPTH
+from src.recommender.cache import recommendation_cache
+from src.recommender.catalog import CatalogSnapshot, catalog_store
+from src.recommender.engine import CardRecommendation, RecommendationEngine, RecommendRequest
+from src.recommender.executor import (
+    RecommendBusyError,
+    RecommendTimeoutError,
+    recommend_executor,
+)
+from src.recommender.scoring import PLATFORM_CATEGORIES
 
 router = APIRouter(prefix="/api", tags=["recommend"])
 
-# 為推薦引擎創建同步 session
-settings = get_settings()
-sync_db_url = settings.database_url.replace("+aiosqlite", "")
-sync_engine = create_engine(sync_db_url)
-SyncSession = sessionmaker(bind=sync_engine)
-
 
 class RecommendRequestSchema(BaseModel):
     spending_habits: Dict[str, float]
@@ -40,34 +41,252 @@ class RecommendResponseSchema(BaseModel):
     recommendations: List[CardRecommendationSchema]
 
 
+class RecommendBatchRequestSchema(BaseModel):
+    profiles: List[RecommendRequestSchema]
+
+
+class RecommendBatchResponseSchema(BaseModel):
+    results: List[RecommendResponseSchema]
+
+
+class PortfolioRequestSchema(BaseModel):
+    spending_habits: Dict[str, float]
+    monthly_amount: int
+    preferences: List[str] = []
+    cards: int = 2
+
+
+class PortfolioCardSchema(BaseModel):
+    card_id: int
+    card_name: str
+    bank_name: str
+    annual_fee: int
+
+
+class AllocationSchema(BaseModel):
+    card_id: int
+    spend: float
+    reward: float
+
+
+class PortfolioResponseSchema(BaseModel):
+    cards: List[PortfolioCardSchema]
+    monthly_reward: float
+    monthly_fee: float
+    net_monthly_value: float
+    assignments: Dict[str, List[AllocationSchema]]
+
+
+class BestCardSchema(BaseModel):
+    rank: int
+    card_id: int
+    card_name: str
+    bank_name: str
+    reward_amount: float
+    best_rate: float
+    reason: str
+
+
+class BestCardResponseSchema(BaseModel):
+    platform: str
+    amount: int
+    cards: List[BestCardSchema]
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
 @router.post("/recommend", response_model=RecommendResponseSchema)
-async def get_recommendations(
-    request: RecommendRequestSchema,
-    db: AsyncSession = Depends(get_db),
+async def get_recommendations(request: RecommendRequestSchema):
+    # 相近的消費組合共用同一份快取結果；未命中時以原本的請求計算
+    recommend_request = RecommendRequest(
+        spending_habits=request.spending_habits,
+        monthly_amount=request.monthly_amount,
+        preferences=request.preferences,
+        limit=request.limit,
+    )
+    version = catalog_store.version
+    cached = recommendation_cache.get(recommend_request, version)
+    if cached is not None:
+        return cached
+
+    # 計算（與必要時重建目錄快照）在專屬執行緒池執行，不阻塞 event loop
+    try:
+        response = await recommend_executor.run(_recommend, recommend_request)
+    except RecommendBusyError:
+        raise HTTPException(status_code=503, detail="推薦服務忙碌中，請稍後再試")
+    except RecommendTimeoutError:
+        raise HTTPException(status_code=504, detail="推薦計算逾時")
+    recommendation_cache.put(recommend_request, version, response)
+    return response
+
+
+@router.post("/recommend/batch", response_model=RecommendBatchResponseSchema)
+async def get_batch_recommendations(batch: RecommendBatchRequestSchema, request: Request):
+    """多組消費輪廓一次評分，每組回傳前 N 張卡（不含推薦理由）
+
+    輪廓數超過 recommend_batch_stream_threshold，或 Accept 為 application/x-ndjson 時，
+    改為逐批計算並以 NDJSON 串流回傳，每行一個輪廓：{"index": i, "recommendations": [...]}。
+    """
+    settings = get_settings()
+    if len(batch.profiles) > settings.recommend_batch_max_profiles:
+        raise HTTPException(
+            status_code=413,
+            detail=f"一次最多 {settings.recommend_batch_max_profiles} 組消費輪廓",
+        )
+    requests = [
+        RecommendRequest(
+            spending_habits=profile.spending_habits,
+            monthly_amount=profile.monthly_amount,
+            preferences=profile.preferences,
+            limit=profile.limit,
+        )
+        for profile in batch.profiles
+    ]
+
+    try:
+        # 整批使用同一份目錄快照，串流途中目錄更新也不會前後不一致
+        catalog = await recommend_executor.run(catalog_store.current)
+        if (
+            len(requests) <= settings.recommend_batch_stream_threshold
+            and NDJSON_MEDIA_TYPE not in request.headers.get("accept", "")
+        ):
+            results = await recommend_executor.run(_recommend_batch, requests, catalog)
+            return RecommendBatchResponseSchema(results=results)
+    except RecommendBusyError:
+        raise HTTPException(status_code=503, detail="推薦服務忙碌中，請稍後再試")
+    except RecommendTimeoutError:
+        raise HTTPException(status_code=504, detail="推薦計算逾時")
+
+    return StreamingResponse(
+        _batch_stream(requests, catalog, settings.recommend_batch_chunk_size),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
+@router.post("/recommend/portfolio", response_model=PortfolioResponseSchema)
+async def get_portfolio(request: PortfolioRequestSchema):
+    """最多 cards 張卡的最佳組合（考慮回饋上限與年費），以及各類別的刷卡分配"""
+    max_cards = get_settings().recommend_portfolio_max_cards
+    if not 1 <= request.cards <= max_cards:
+        raise HTTPException(status_code=400, detail=f"cards 需介於 1 到 {max_cards}")
+    recommend_request = RecommendRequest(
+        spending_habits=request.spending_habits,
+        monthly_amount=request.monthly_amount,
+        preferences=request.preferences,
+    )
+    try:
+        return await recommend_executor.run(_portfolio, recommend_request, request.cards)
+    except RecommendBusyError:
+        raise HTTPException(status_code=503, detail="推薦服務忙碌中，請稍後再試")
+    except RecommendTimeoutError:
+        raise HTTPException(status_code=504, detail="推薦計算逾時")
+
+
+@router.get("/best-card", response_model=BestCardResponseSchema)
+async def get_best_card(
+    platform: str = Query(..., description="購物平台：pchome 或 momo"),
+    amount: int = Query(..., ge=0, description="購物金額（元）"),
+    limit: int = Query(3, ge=1, le=INDEX_DEPTH),
 ):
-    # 使用同步 session 執行推薦引擎
-    with SyncSession() as sync_session:
-        engine = RecommendationEngine(sync_session)
-        recommend_request = RecommendRequest(
-            spending_habits=request.spending_habits,
-            monthly_amount=request.monthly_amount,
-            preferences=request.preferences,
-            limit=request.limit,
+    """單次購物回饋最高的信用卡（考慮回饋上限），由目錄快照的預建索引查詢"""
+    if platform not in PLATFORM_CATEGORIES:
+        raise HTTPException(status_code=400, detail=f"不支援的平台：{platform}")
+    try:
+        catalog = await recommend_executor.run(catalog_store.current)
+    except RecommendBusyError:
+        raise HTTPException(status_code=503, detail="推薦服務忙碌中，請稍後再試")
+    except RecommendTimeoutError:
+        raise HTTPException(status_code=504, detail="推薦計算逾時")
+
+    cards = [
+        BestCardSchema(
+            rank=rank,
+            card_id=result["card"].id,
+            card_name=result["card"].name,
+            bank_name=catalog.banks[result["card"].bank_id].name,
+            reward_amount=result["reward_amount"],
+            best_rate=result["best_rate"],
+            reason=result["reason"],
         )
-        results = engine.recommend(recommend_request)
-
-        recommendations = []
-        for rank, rec in enumerate(results, start=1):
-            recommendations.append(
-                CardRecommendationSchema(
-                    rank=rank,
-                    card_id=rec.card.id,
-                    card_name=rec.card.name,
-                    bank_name=rec.card.bank.name,
-                    score=round(rec.score, 2),
-                    estimated_monthly_reward=rec.estimated_monthly_reward,
-                    reasons=rec.reasons,
+        for rank, result in enumerate(catalog.best_cards(platform, amount, limit), start=1)
+    ]
+    return BestCardResponseSchema(platform=platform, amount=amount, cards=cards)
+
+
+async def _batch_stream(
+    requests: List[RecommendRequest], catalog: CatalogSnapshot, chunk_size: int
+) -> AsyncIterator[str]:
+    # 每批各自在執行緒池計算並受期限限制；已送出狀態碼，失敗時以錯誤行結束串流
+    for start in range(0, len(requests), chunk_size):
+        chunk = requests[start:start + chunk_size]
+        try:
+            results = await recommend_executor.run(_recommend_batch, chunk, catalog)
+        except (RecommendBusyError, RecommendTimeoutError) as e:
+            yield json.dumps({"index": start, "error": str(e)}) + "\n"
+            return
+        for offset, result in enumerate(results):
+            yield json.dumps(
+                {"index": start + offset, **result.model_dump()}, ensure_ascii=False
+            ) + "\n"
+
+
+def _recommend_batch(
+    requests: List[RecommendRequest], catalog: CatalogSnapshot
+) -> List[RecommendResponseSchema]:
+    engine = RecommendationEngine(catalog=catalog)
+    return [_to_response(engine, results) for results in engine.recommend_many(requests)]
+
+
+def _portfolio(request: RecommendRequest, cards: int) -> PortfolioResponseSchema:
+    engine = RecommendationEngine(catalog=catalog_store.current())
+    portfolio = engine.recommend_portfolio(request, cards)
+    return PortfolioResponseSchema(
+        cards=[
+            PortfolioCardSchema(
+                card_id=card.id,
+                card_name=card.name,
+                bank_name=engine.catalog.banks[card.bank_id].name,
+                annual_fee=card.annual_fee or 0,
+            )
+            for card in portfolio.cards
+        ],
+        monthly_reward=round(portfolio.monthly_reward, 2),
+        monthly_fee=round(portfolio.monthly_fee, 2),
+        net_monthly_value=round(portfolio.net_monthly_value, 2),
+        assignments={
+            category: [
+                AllocationSchema(
+                    card_id=a.card_id, spend=round(a.spend, 2), reward=round(a.reward, 2)
                 )
+                for a in allocations
+            ]
+            for category, allocations in portfolio.assignments.items()
+        },
+    )
+
+
+def _recommend(request: RecommendRequest) -> RecommendResponseSchema:
+    # 目錄快照常駐記憶體，穩定狀態下推薦不查詢資料庫
+    engine = RecommendationEngine(catalog=catalog_store.current())
+    return _to_response(engine, engine.recommend(request))
+
+
+def _to_response(
+    engine: RecommendationEngine, results: List[CardRecommendation]
+) -> RecommendResponseSchema:
+    recommendations = []
+    for rank, rec in enumerate(results, start=1):
+        recommendations.append(
+            CardRecommendationSchema(
+                rank=rank,
+                card_id=rec.card.id,
+                card_name=rec.card.name,
+                bank_name=engine.catalog.banks[rec.card.bank_id].name,
+                score=round(rec.score, 2),
+                estimated_monthly_reward=rec.estimated_monthly_reward,
+                reasons=rec.reasons,
             )
+        )
 
-        return RecommendResponseSchema(recommendations=recommendations)
+    return RecommendResponseSchema(recommendations=recommendations)
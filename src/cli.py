@@ -17,7 +17,7 @@ from src.crawlers.banks import (
     TaishinCrawler,
     UbotCrawler,
 )
-from src.db.database import Base
+from src.db.database import Base, upgrade_schema
 
 settings = get_settings()
 sync_database_url = settings.database_url.replace("+aiosqlite", "")
@@ -27,6 +27,8 @@ def init_database():
     """初始化資料庫"""
     engine = create_engine(sync_database_url)
     Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        upgrade_schema(connection)
     logger.info("Database initialized")
 
 
@@ -63,6 +65,19 @@ def run_crawler(bank: str = None):
                 logger.info(f"Result: {result}")
 
 
+def backfill_price_rollups():
+    """由既有價格歷史重建 rollup"""
+    from src.trackers.rollups import backfill_rollups
+
+    engine = create_engine(sync_database_url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        upgrade_schema(connection)
+    with Session(engine) as session:
+        count = backfill_rollups(session)
+    logger.info(f"Rollups rebuilt from {count} observations")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Credit Card Crawler CLI")
     subparsers = parser.add_subparsers(dest="command", help="Commands")
@@ -80,6 +95,9 @@ def main():
     # seed command
     subparsers.add_parser("seed", help="Seed initial bank data")
 
+    # backfill-rollups command
+    subparsers.add_parser("backfill-rollups", help="Rebuild price rollups from price history")
+
     args = parser.parse_args()
 
     if args.command == "init":
@@ -99,6 +117,8 @@ def main():
         from src.db.seed import seed_banks
 
         seed_banks()
+    elif args.command == "backfill-rollups":
+        backfill_price_rollups()
     else:
         parser.print_help()
 
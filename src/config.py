@@ -25,6 +25,41 @@ class Settings(BaseSettings):
     crawler_delay_max: int = 5
     crawler_max_retries: int = 3
 
+    # Trackers
+    pchome_max_concurrency: int = 10
+    # Momo 取價／搜尋路徑："auto"（HTTP 被擋時改用瀏覽器）、"http"、"browser"
+    momo_fetch_mode: str = "auto"
+    # "changes": 價格／庫存有變動才新增 price_history；"all": 每次輪詢都新增
+    price_history_mode: str = "changes"
+    # 特賣結束超過 N 天後由排程刪除
+    flash_deal_retention_days: int = 7
+    # 關鍵字搜尋快取：ttl 內直接回傳，之後 stale 秒內先回舊結果並背景更新
+    search_cache_ttl_seconds: int = 300
+    search_cache_stale_seconds: int = 1800
+    # 跨平台搜尋的共同期限（秒），逾時的平台不列入結果
+    search_deadline_seconds: float = 5.0
+    # SSE：每個連線最多暫存的事件數（滿了丟最舊的），以及無事件時的 keep-alive 間隔
+    event_queue_size: int = 100
+    event_heartbeat_seconds: float = 15.0
+
+    # Recommender
+    # 推薦用的卡片目錄快照最長使用秒數（其他行程寫入的資料最晚在此時間後生效）
+    catalog_max_age_seconds: int = 600
+    # 推薦在專屬執行緒池計算：worker 數、同時進行的請求上限與單次期限（秒）
+    recommend_max_workers: int = 4
+    recommend_max_concurrency: int = 8
+    recommend_timeout_seconds: float = 5.0
+    # 推薦結果快取：存活秒數（宜小於 catalog_max_age_seconds）、最多筆數與每月金額的相對分組寬度
+    recommend_cache_ttl_seconds: int = 300
+    recommend_cache_max_entries: int = 1024
+    recommend_cache_amount_tolerance: float = 0.01
+    # /api/recommend/batch：輪廓數上限、超過多少組改以 NDJSON 串流，以及每批計算的輪廓數
+    recommend_batch_max_profiles: int = 10000
+    recommend_batch_stream_threshold: int = 200
+    recommend_batch_chunk_size: int = 100
+    # /api/recommend/portfolio 一次最多組合幾張卡
+    recommend_portfolio_max_cards: int = 3
+
     # Notifications
     telegram_bot_token: str = ""
     telegram_chat_id: str = ""
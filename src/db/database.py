@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+from typing import List
+
+from sqlalchemy import Connection, inspect, text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.schema import CreateIndex
 
 from src.config import get_settings
 
@@ -31,3 +35,65 @@ async def get_db() -> AsyncSession:
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(upgrade_schema)
+
+
+def upgrade_schema(connection: Connection) -> None:
+    """補上 create_all 不會替既有資料表加入的欄位與約束（沒有 migration 工具）"""
+    _ensure_flash_deal_unique_index(connection)
+    # 進行中特賣查詢與過期清理用的 end_at 索引
+    _ensure_indexes(connection, "flash_deals")
+    # 追蹤商品的輪詢間隔與下次檢查時間：既有商品補上欄位後視為立即到期
+    _add_missing_columns(connection, "tracked_products", ["poll_interval_minutes", "next_check_at"])
+    # 最後價格與歷史最低價：舊商品的最低價在下次寫入快照時由 price_history 補上
+    _add_missing_columns(
+        connection, "tracked_products",
+        ["last_price", "last_checked_at", "lowest_price", "lowest_price_at"],
+    )
+    _ensure_indexes(connection, "tracked_products")
+    # 變動才寫入模式的價格持續時間
+    _add_missing_columns(connection, "price_history", ["last_seen_at"])
+    _ensure_indexes(connection, "price_history")
+
+
+def _add_missing_columns(connection: Connection, table_name: str, column_names: List[str]) -> None:
+    # create_all 不會替已存在的資料表加欄位；新增欄位皆可為 NULL，直接 ADD COLUMN
+    inspector = inspect(connection)
+    if table_name not in inspector.get_table_names():
+        return
+    existing = {c["name"] for c in inspector.get_columns(table_name)}
+    table = Base.metadata.tables[table_name]
+    for name in column_names:
+        if name in existing:
+            continue
+        column_type = table.c[name].type.compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name} {column_type}"))
+
+
+def _ensure_indexes(connection: Connection, table_name: str) -> None:
+    for index in Base.metadata.tables[table_name].indexes:
+        connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+def _ensure_flash_deal_unique_index(connection: Connection) -> None:
+    # 特賣 upsert 的 ON CONFLICT 需要 (platform, product_url) 唯一索引；
+    # 舊資料表沒有，先刪除重複資料（保留最新一筆）再建立
+    inspector = inspect(connection)
+    if "flash_deals" not in inspector.get_table_names():
+        return
+    columns = ["platform", "product_url"]
+    if any(c["column_names"] == columns for c in inspector.get_unique_constraints("flash_deals")):
+        return
+    if any(
+        i["unique"] and i["column_names"] == columns
+        for i in inspector.get_indexes("flash_deals")
+    ):
+        return
+    connection.execute(text(
+        "DELETE FROM flash_deals WHERE id NOT IN "
+        "(SELECT MAX(id) FROM flash_deals GROUP BY platform, product_url)"
+    ))
+    connection.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_flash_deals_platform_url "
+        "ON flash_deals (platform, product_url)"
+    ))
@@ -8,7 +8,13 @@ from loguru import logger
 from src.api.router import api_router
 from src.config import get_settings
 from src.db.database import init_db
+from src.recommender.cache import recommendation_cache
+from src.recommender.catalog import catalog_store
+from src.recommender.executor import recommend_executor
 from src.scheduler.runner import start_scheduler
+from src.trackers.events import event_bus
+from src.trackers.registry import tracker_registry
+from src.trackers.search_cache import search_cache
 
 settings = get_settings()
 scheduler: Optional[object] = None
@@ -25,9 +31,11 @@ async def lifespan(app: FastAPI):
 
     yield
 
-    # 關閉排程器
+    # 關閉排程器（等待執行中的任務結束）後再釋放共用的 tracker 連線
     if scheduler:
         scheduler.shutdown()
+    tracker_registry.close_all()
+    recommend_executor.shutdown()
     logger.info("Shutting down...")
 
 
@@ -90,4 +98,10 @@ async def admin_status(x_admin_key: str = Header(None)):
     return {
         "scheduler_running": scheduler is not None and scheduler.running,
         "jobs": jobs,
+        "trackers": tracker_registry.stats(),
+        "search_cache": search_cache.stats(),
+        "events": event_bus.stats(),
+        "catalog": catalog_store.stats(),
+        "recommend": recommend_executor.stats(),
+        "recommend_cache": recommendation_cache.stats(),
     }
@@ -7,6 +7,7 @@ from src.models.notification_log import (
     NotificationType,
 )
 from src.models.price_history import PriceHistory
+from src.models.price_rollup import PriceRollup
 from src.models.promotion import Promotion
 from src.models.tracked_product import TrackedProduct
 
@@ -18,6 +19,7 @@ __all__ = [
     "NotificationLog",
     "NotificationType",
     "PriceHistory",
+    "PriceRollup",
     "Promotion",
     "TrackedProduct",
 ]
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Float, Integer, String
+from sqlalchemy import DateTime, Float, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.db.database import Base
@@ -12,6 +12,12 @@ from src.models.base import TimestampMixin
 
 class FlashDeal(Base, TimestampMixin):
     __tablename__ = "flash_deals"
+    __table_args__ = (
+        # 同一平台的同一商品只保留一筆，批次寫入時以 ON CONFLICT DO UPDATE 更新價格與場次時間
+        UniqueConstraint("platform", "product_url", name="uq_flash_deals_platform_url"),
+        # 「目前進行中」查詢與過期清理都以 end_at 篩選
+        Index("ix_flash_deals_active", "platform", "end_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     platform: Mapped[str] = mapped_column(String(20), nullable=False)
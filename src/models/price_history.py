@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db.database import Base
@@ -14,6 +14,9 @@ if TYPE_CHECKING:
 
 class PriceHistory(Base):
     __tablename__ = "price_history"
+    __table_args__ = (
+        Index("ix_price_history_product_time", "product_id", "snapshot_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("tracked_products.id"), nullable=False)
@@ -24,6 +27,8 @@ class PriceHistory(Base):
         DateTime, server_default=func.now(), nullable=False
     )
     source: Mapped[Optional[str]] = mapped_column(String(20))
+    # 變動才寫入模式：價格與庫存未變時只更新此欄，代表此價格持續到何時
+    last_seen_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
 
     product: Mapped["TrackedProduct"] = relationship(back_populates="price_history")
 
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.db.database import Base
+
+
+class PriceRollup(Base):
+    """每個商品每小時／每日的價格彙總，隨價格快照寫入時增量更新"""
+
+    __tablename__ = "price_rollups"
+    __table_args__ = (
+        UniqueConstraint("product_id", "grain", "bucket_start", name="uq_price_rollup_bucket"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("tracked_products.id"), nullable=False)
+    grain: Mapped[str] = mapped_column(String(10), nullable=False)  # hour / day
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    min_price: Mapped[int] = mapped_column(Integer, nullable=False)
+    max_price: Mapped[int] = mapped_column(Integer, nullable=False)
+    price_sum: Mapped[int] = mapped_column(Integer, nullable=False)
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_price: Mapped[int] = mapped_column(Integer, nullable=False)
+    last_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    @property
+    def avg_price(self) -> Optional[float]:
+        if not self.sample_count:
+            return None
+        return self.price_sum / self.sample_count
+
+    def __repr__(self) -> str:
+        return f"<PriceRollup product={self.product_id} {self.grain}@{self.bucket_start}>"
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import TYPE_CHECKING, List, Optional
 
-from sqlalchemy import Boolean, Integer, String
+from sqlalchemy import Boolean, DateTime, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.db.database import Base
@@ -14,6 +15,10 @@ if TYPE_CHECKING:
 
 class TrackedProduct(Base, TimestampMixin):
     __tablename__ = "tracked_products"
+    __table_args__ = (
+        # 排程每次只挑出已到期的 active 商品
+        Index("ix_tracked_products_due", "is_active", "next_check_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     platform: Mapped[str] = mapped_column(String(20), nullable=False)  # pchome / momo
@@ -22,6 +27,13 @@ class TrackedProduct(Base, TimestampMixin):
     url: Mapped[str] = mapped_column(String(500), nullable=False)
     target_price: Mapped[Optional[int]] = mapped_column(Integer)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    poll_interval_minutes: Mapped[Optional[int]] = mapped_column(Integer)
+    next_check_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    # 每次寫入快照時同步更新，列表與比價不必再查 price_history
+    last_price: Mapped[Optional[int]] = mapped_column(Integer)
+    last_checked_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    lowest_price: Mapped[Optional[int]] = mapped_column(Integer)
+    lowest_price_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
 
     price_history: Mapped[List["PriceHistory"]] = relationship(back_populates="product")
 
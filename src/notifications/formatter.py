@@ -10,6 +10,9 @@ COLOR_NEW_PROMOTION = 0x00CC66  # green
 COLOR_EXPIRING_PROMOTION = 0xFF9900  # orange
 COLOR_NEW_CARD = 0x3399FF  # blue
 
+# 單則降價通知最多合併的商品數（Discord 每則訊息上限 10 個 embed，也讓 Telegram 不超過 4096 字）
+PRICE_ALERT_BATCH_SIZE = 10
+
 
 def format_new_promotions(promotions: List[Promotion]) -> Dict[str, Any]:
     """Format new promotions for all channels.
@@ -241,3 +244,17 @@ def format_price_drop_alert(
     }
 
     return {"telegram": telegram_text, "discord_embeds": [embed]}
+
+
+def format_price_drop_alerts(alerts: list) -> dict:
+    """將多筆降價／目標價通知合併為一則訊息
+
+    Args:
+        alerts: (product, snapshot, top_cards, is_target_reached) 的列表。
+            每筆對應一個 Discord embed，順序與 dispatch 的 reference_ids 相同。
+    """
+    messages = [format_price_drop_alert(*alert) for alert in alerts]
+    return {
+        "telegram": "\n\n".join(m["telegram"] for m in messages),
+        "discord_embeds": [embed for m in messages for embed in m["discord_embeds"]],
+    }
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.recommender.matrix import RewardMatrix
+
+# 索引為每個切分點保留的候選卡數，也是單次查詢 top_n 的上限
+INDEX_DEPTH = 10
+
+
+class BestCardIndex:
+    """單一回饋類別的單次購物最佳卡索引
+
+    每張卡的回饋是金額的分段線性函數 min(金額 × 回饋率, 上限)，在膝點 上限 / 回饋率
+    之後變為定值。卡片依膝點排序：金額 a 時，膝點小於 a 的卡回饋等於上限，其餘卡
+    回饋與回饋率成正比。因此預先保留每個切分點之前上限最高、之後回饋率最高的
+    INDEX_DEPTH 張卡，查詢時二分搜尋切分點並只比較這兩組候選。
+    """
+
+    def __init__(self, matrix: RewardMatrix, category: str, depth: int = INDEX_DEPTH):
+        rates, caps = matrix.columns([category])
+        self.rates = rates[:, 0]
+        self.caps = caps[:, 0]
+        self.depth = depth
+        with np.errstate(divide="ignore", invalid="ignore"):
+            knees = np.where(self.rates > 0, self.caps / self.rates * 100, np.inf)
+        order = np.argsort(knees, kind="stable").tolist()
+        self._knees = knees[order].tolist()
+
+        # _capped[s]：膝點最小的 s 張卡中上限最高者；_uncapped[s]：其餘卡中回饋率最高者
+        # 同值時索引小者優先，與依卡片順序的穩定排序一致
+        self._capped = _running_top(order, self.caps, depth)
+        self._uncapped = _running_top(order[::-1], self.rates, depth)[::-1]
+
+    def top(self, amount: float, top_n: int = 3) -> List[Tuple[int, float]]:
+        """回饋最高的 top_n 張卡 (卡片索引, 回饋金額)
+
+        依未四捨五入的回饋由高到低，同額時索引小者在前；回饋金額四捨五入到小數兩位。
+        """
+        if top_n > self.depth:
+            raise ValueError(f"top_n must not exceed index depth {self.depth}")
+        if amount <= 0:
+            # 所有卡回饋皆為 0，依卡片順序
+            candidates = range(min(top_n, len(self.rates)))
+        else:
+            split = bisect_left(self._knees, amount)
+            candidates = set(self._capped[split]) | set(self._uncapped[split])
+        ranked = sorted((-self._reward(i, amount), i) for i in candidates)
+        return [(i, round(-reward, 2)) for reward, i in ranked[:top_n]]
+
+    def _reward(self, index: int, amount: float) -> float:
+        return float(min(amount * self.rates[index] / 100, self.caps[index]))
+
+    def limit(self, index: int) -> Optional[int]:
+        cap = self.caps[index]
+        return None if np.isinf(cap) else int(cap)
+
+
+def _running_top(order: List[int], values: np.ndarray, depth: int) -> List[Tuple[int, ...]]:
+    """result[s] 為 order[:s] 中 values 最高的 depth 個索引"""
+    result: List[Tuple[int, ...]] = [()]
+    heap: List[Tuple[float, int]] = []
+    for i in order:
+        item = (float(values[i]), -i)
+        if len(heap) < depth:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+        result.append(tuple(-j for _, j in heap))
+    return result
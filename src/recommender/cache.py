@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src.config import get_settings
+from src.recommender.engine import RecommendRequest
+
+RequestKey = Tuple[Hashable, ...]
+
+
+def request_key(request: RecommendRequest, amount_tolerance: float) -> RequestKey:
+    """請求的快取 key，讓只差一點點的請求共用同一個快取結果
+
+    消費比例四捨五入到 1%、每月金額依相對寬度 amount_tolerance 分組（等比級距），
+    類別與偏好排序；偏好保留重複值，因為權益分數以偏好數量為分母。
+    key 只用來查快取，推薦仍以呼叫端原本的請求計算。
+    """
+    spending = tuple(
+        (category, round(ratio, 2)) for category, ratio in sorted(request.spending_habits.items())
+    )
+    amount = request.monthly_amount
+    if amount > 0:
+        # 0 以下的金額維持原值，正數的分組編號從 1 開始以免相撞
+        amount = int(math.log(amount) / math.log1p(amount_tolerance)) + 1
+    return (spending, amount, tuple(sorted(request.preferences)), request.limit)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    stored_at: float
+
+
+class RecommendationCache:
+    """推薦結果的 LRU + TTL 快取
+
+    每筆結果記錄計算時的目錄版本；版本變動後第一次存取會清空整個快取。
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        amount_tolerance: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        settings = get_settings()
+        self.ttl = ttl if ttl is not None else settings.recommend_cache_ttl_seconds
+        self.max_entries = max_entries or settings.recommend_cache_max_entries
+        self.amount_tolerance = amount_tolerance or settings.recommend_cache_amount_tolerance
+        self._clock = clock
+        self._entries: OrderedDict[RequestKey, _Entry] = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def key(self, request: RecommendRequest) -> RequestKey:
+        return request_key(request, self.amount_tolerance)
+
+    def get(self, request: RecommendRequest, version: int) -> Optional[Any]:
+        """取得相近請求的快取結果；沒有或已過期時回傳 None"""
+        key = self.key(request)
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None or self._clock() - entry.stored_at >= self.ttl:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry.value
+
+    def put(self, request: RecommendRequest, version: int, value: Any) -> None:
+        """寫入結果；version 為開始計算時的目錄版本，已過時的結果不寫入"""
+        key = self.key(request)
+        with self._lock:
+            self._check_version(version)
+            if version != self._version:
+                return
+            self._entries[key] = _Entry(value=value, stored_at=self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "entries": len(self._entries), "version": self._version}
+
+    def _check_version(self, version: int) -> None:
+        # 只往新版本前進，計算期間目錄已更新的舊結果不會把快取帶回舊版本
+        if self._version is None or version > self._version:
+            if self._entries:
+                self._counters["invalidations"] += 1
+            self._entries.clear()
+            self._version = version
+
+
+recommendation_cache = RecommendationCache()
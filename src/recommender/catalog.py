@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, joinedload, selectinload, sessionmaker
+
+from src.config import get_settings
+from src.models import Bank, CreditCard, Promotion
+from src.recommender.best_card import BestCardIndex
+from src.recommender.matrix import RewardMatrix
+from src.recommender.scoring import PLATFORM_CATEGORIES, shopping_reason
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """推薦用的卡片目錄快照：卡片、銀行、依卡片分組的優惠、回饋矩陣與購物最佳卡索引
+
+    建立後不再修改（ORM 物件已與 session 分離，關聯皆已預先載入），
+    多個請求可同時讀取同一份快照。
+    """
+
+    version: int
+    built_at: float
+    cards: Tuple[CreditCard, ...]
+    banks: Mapping[int, Bank]
+    promotions_by_card: Mapping[int, Tuple[Promotion, ...]]
+    matrix: RewardMatrix
+    shopping_indexes: Mapping[str, BestCardIndex] = field(default_factory=dict)
+
+    @classmethod
+    def load(
+        cls, session: Session, version: int = 0, built_at: Optional[float] = None
+    ) -> CatalogSnapshot:
+        """以一次卡片（含銀行）查詢加一次優惠查詢建立快照"""
+        cards = tuple(
+            session.scalars(
+                select(CreditCard)
+                .options(joinedload(CreditCard.bank), selectinload(CreditCard.promotions))
+                .order_by(CreditCard.id)
+            ).unique()
+        )
+        promotions_by_card = {
+            card.id: tuple(sorted(card.promotions, key=lambda promo: promo.id)) for card in cards
+        }
+        # 與 session 分離，呼叫端之後 commit 時才不會讓快照中的物件過期
+        for obj in {*cards, *(card.bank for card in cards if card.bank is not None),
+                    *(promo for promos in promotions_by_card.values() for promo in promos)}:
+            if obj in session:
+                session.expunge(obj)
+        matrix = RewardMatrix(cards, promotions_by_card)
+        return cls(
+            version=version,
+            built_at=time.monotonic() if built_at is None else built_at,
+            cards=cards,
+            banks=MappingProxyType({card.bank_id: card.bank for card in cards}),
+            promotions_by_card=MappingProxyType(promotions_by_card),
+            matrix=matrix,
+            shopping_indexes=MappingProxyType({
+                category: BestCardIndex(matrix, category)
+                for category in set(PLATFORM_CATEGORIES.values())
+            }),
+        )
+
+    def best_cards(self, platform: str, amount: float, top_n: int = 3) -> List[Dict[str, Any]]:
+        """指定平台單次購物回饋最高的 top_n 張卡，格式同 calculate_shopping_reward 另含 card"""
+        category = PLATFORM_CATEGORIES.get(platform, "online_shopping")
+        index = self.shopping_indexes.get(category)
+        if index is None:
+            index = BestCardIndex(self.matrix, category)
+        results = []
+        for i, reward in index.top(amount, top_n):
+            rate = float(index.rates[i])
+            results.append({
+                "card": self.cards[i],
+                "reward_amount": reward,
+                "best_rate": rate,
+                "reason": shopping_reason(platform, rate, index.limit(i)),
+            })
+        return results
+
+
+class CatalogStore:
+    """持有目前的 CatalogSnapshot，目錄版本變動時重新建立並整份替換
+
+    爬蟲與清理任務結束後呼叫 invalidate() 遞增版本；下一個請求才重建快照，
+    期間其他請求繼續使用舊快照。其他行程（例如 CLI 爬蟲）寫入的資料無法通知，
+    因此快照超過 max_age 秒也會重建。
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        max_age: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_age = max_age if max_age is not None else get_settings().catalog_max_age_seconds
+        self.version = 0
+        self.rebuilds = 0
+        self._session_factory = session_factory
+        self._clock = clock
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+
+    def current(self, session: Optional[Session] = None) -> CatalogSnapshot:
+        """目前的快照；需要重建時使用傳入的 session（例如排程任務自己的連線）"""
+        snapshot = self._snapshot
+        if snapshot is not None and self._is_fresh(snapshot):
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or not self._is_fresh(snapshot):
+                snapshot = self._rebuild(session)
+        return snapshot
+
+    def invalidate(self) -> int:
+        """目錄已變更：遞增版本，回傳新版本號"""
+        with self._lock:
+            self.version += 1
+            return self.version
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "version": self.version,
+            "snapshot_version": snapshot.version if snapshot else None,
+            "cards": len(snapshot.cards) if snapshot else 0,
+            "rebuilds": self.rebuilds,
+        }
+
+    def _is_fresh(self, snapshot: CatalogSnapshot) -> bool:
+        return (
+            snapshot.version == self.version
+            and self._clock() - snapshot.built_at < self.max_age
+        )
+
+    def _rebuild(self, session: Optional[Session] = None) -> CatalogSnapshot:
+        version = self.version
+        if session is not None:
+            snapshot = CatalogSnapshot.load(session, version, built_at=self._clock())
+        else:
+            with self._new_session() as own_session:
+                snapshot = CatalogSnapshot.load(own_session, version, built_at=self._clock())
+        self._snapshot = snapshot
+        self.rebuilds += 1
+        logger.info(f"Catalog snapshot v{version} built with {len(snapshot.cards)} cards")
+        return snapshot
+
+    def _new_session(self) -> Session:
+        if self._session_factory is None:
+            database_url = get_settings().database_url.replace("+aiosqlite", "")
+            self._session_factory = sessionmaker(bind=create_engine(database_url))
+        return self._session_factory()
+
+
+catalog_store = CatalogStore()
@@ -1,10 +1,14 @@
+import heapq
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+import numpy as np
 from sqlalchemy.orm import Session
 
 from src.models import CreditCard, Promotion
-from src.recommender.scoring import calculate_total_score, estimate_monthly_reward
+from src.recommender.catalog import CatalogSnapshot
+from src.recommender.matrix import top_k
+from src.recommender.portfolio import Portfolio, PortfolioOptimizer
 
 
 @dataclass
@@ -28,82 +32,102 @@ class CardRecommendation:
 
 
 class RecommendationEngine:
-    def __init__(self, db_session: Session):
+    def __init__(
+        self,
+        db_session: Optional[Session] = None,
+        catalog: Optional[CatalogSnapshot] = None,
+    ):
+        # 傳入 catalog 時完全不查詢資料庫；否則第一次使用時從 db_session 載入
         self.db = db_session
+        self._catalog = catalog
+
+    @property
+    def catalog(self) -> CatalogSnapshot:
+        if self._catalog is None:
+            self._catalog = CatalogSnapshot.load(self.db)
+        return self._catalog
 
     def recommend(self, request: RecommendRequest) -> List[CardRecommendation]:
-        # 取得所有信用卡
-        cards = self.db.query(CreditCard).all()
-
-        # 篩選
-        filtered_cards = self._filter_cards(cards, request)
-
-        # 評分
-        scored_cards = []
-        for card in filtered_cards:
-            promotions = self.db.query(Promotion).filter_by(card_id=card.id).all()
-
-            scores = calculate_total_score(
-                card=card,
-                spending_habits=request.spending_habits,
-                monthly_amount=request.monthly_amount,
-                preferences=request.preferences,
-                promotions=promotions,
-            )
+        catalog = self.catalog
 
-            estimated_reward = self._estimate_monthly_reward(
-                card, request.spending_habits, request.monthly_amount, promotions
-            )
+        # 評分：所有卡片一次以矩陣運算完成
+        scores = catalog.matrix.score(
+            request.spending_habits, request.monthly_amount, request.preferences
+        )
 
-            reasons = self._generate_reasons(card, request, scores, promotions)
+        # 先只依分數取前 N 名（nlargest 與穩定排序後截斷結果相同），推薦理由只為回傳的卡產生
+        top = heapq.nlargest(
+            max(request.limit, 0),
+            self._candidate_indices(request),
+            key=lambda i: scores.total[i],
+        )
 
-            scored_cards.append(
+        results = []
+        for i in top:
+            card = catalog.cards[i]
+            card_scores = scores.for_card(i)
+            results.append(
                 CardRecommendation(
                     card=card,
-                    score=scores["total"],
-                    reward_score=scores["reward_score"],
-                    feature_score=scores["feature_score"],
-                    promotion_score=scores["promotion_score"],
-                    annual_fee_roi_score=scores["annual_fee_roi_score"],
-                    estimated_monthly_reward=estimated_reward,
-                    reasons=reasons,
+                    score=card_scores["total"],
+                    reward_score=card_scores["reward_score"],
+                    feature_score=card_scores["feature_score"],
+                    promotion_score=card_scores["promotion_score"],
+                    annual_fee_roi_score=card_scores["annual_fee_roi_score"],
+                    estimated_monthly_reward=round(card_scores["monthly_reward"], 0),
+                    reasons=self._generate_reasons(
+                        card, request, card_scores, list(catalog.promotions_by_card[card.id])
+                    ),
                 )
             )
+        return results
+
+    def recommend_many(self, requests: List[RecommendRequest]) -> List[List[CardRecommendation]]:
+        """多組請求一次評分，每組回傳與 recommend 相同的前 N 張卡（不產生推薦理由）"""
+        catalog = self.catalog
+        if not requests:
+            return []
+        scores = catalog.matrix.score_many(
+            [(r.spending_habits, r.monthly_amount, r.preferences) for r in requests]
+        )
+        fee_blocked = catalog.matrix.fee_blocked
 
-        # 排序並返回 Top N
-        scored_cards.sort(key=lambda x: x.score, reverse=True)
-        return scored_cards[: request.limit]
-
-    def _filter_cards(
-        self, cards: List[CreditCard], request: RecommendRequest
-    ) -> List[CreditCard]:
-        """篩選符合條件的信用卡"""
-        filtered = []
-
-        for card in cards:
-            # 如果要求免年費，過濾掉有年費且無減免的卡
+        results = []
+        for p, request in enumerate(requests):
+            totals = scores.total[p]
             if "no_annual_fee" in request.preferences:
-                if card.annual_fee and card.annual_fee > 0:
-                    if not card.annual_fee_waiver:
-                        continue
-            filtered.append(card)
-
-        return filtered
-
-    def _estimate_monthly_reward(
-        self,
-        card: CreditCard,
-        spending_habits: Dict[str, float],
-        monthly_amount: int,
-        promotions: List[Promotion],
-    ) -> float:
-        """估算每月回饋金額"""
-        return round(
-            estimate_monthly_reward(
-                card, spending_habits, monthly_amount, promotions, apply_limits=True
-            ),
-            0,
-        )
+                totals = np.where(fee_blocked, -np.inf, totals)
+            limit = min(max(request.limit, 0), len(totals) - int(np.isneginf(totals).sum()))
+            results.append([
+                CardRecommendation(
+                    card=catalog.cards[i],
+                    score=float(scores.total[p, i]),
+                    reward_score=float(scores.reward_score[p, i]),
+                    feature_score=float(scores.feature_score[p, i]),
+                    promotion_score=float(scores.promotion_score[p, i]),
+                    annual_fee_roi_score=float(scores.annual_fee_roi_score[p, i]),
+                    estimated_monthly_reward=round(float(scores.monthly_reward[p, i]), 0),
+                    reasons=[],
+                )
+                for i in top_k(totals, limit)
+            ])
+        return results
+
+    def recommend_portfolio(self, request: RecommendRequest, cards: int = 2) -> Portfolio:
+        """最多 cards 張卡的最佳組合，以及每個類別該刷哪張卡"""
+        return PortfolioOptimizer(
+            self.catalog.matrix,
+            request.spending_habits,
+            request.monthly_amount,
+            candidates=self._candidate_indices(request),
+        ).optimize(cards)
+
+    def _candidate_indices(self, request: RecommendRequest) -> List[int]:
+        """篩選符合條件的信用卡，回傳在目錄中的索引"""
+        # 如果要求免年費，過濾掉有年費且無減免的卡
+        if "no_annual_fee" in request.preferences:
+            return np.flatnonzero(~self.catalog.matrix.fee_blocked).tolist()
+        return list(range(len(self.catalog.cards)))
 
     def _generate_reasons(
         self,
@@ -157,14 +181,8 @@ class RecommendationEngine:
         elif scores.get("annual_fee_roi_score", 0) > 60:
             annual_fee = card.annual_fee or 0
             if annual_fee > 0:
-                monthly_reward = estimate_monthly_reward(
-                    card,
-                    request.spending_habits,
-                    request.monthly_amount,
-                    promotions,
-                    apply_limits=True,
-                )
-                annual_reward = monthly_reward * 12
+                # 沿用評分時已算出的每月回饋
+                annual_reward = scores["monthly_reward"] * 12
                 multiplier = annual_reward / annual_fee if annual_fee > 0 else 0
                 if multiplier >= 1:
                     reasons.append(
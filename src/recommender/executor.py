@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from loguru import logger
+
+from src.config import get_settings
+
+T = TypeVar("T")
+
+
+class RecommendBusyError(Exception):
+    """同時進行的推薦已達上限，且在期限內等不到空位"""
+
+
+class RecommendTimeoutError(Exception):
+    """推薦計算超過期限"""
+
+
+class RecommendExecutor:
+    """在專屬執行緒池執行推薦計算，不佔用 event loop 與預設執行緒池
+
+    max_concurrency 限制同時在池中執行或排隊的推薦數；逾時的計算仍會在背景跑完，
+    在那之前持續佔用名額，避免持續逾時的請求不斷堆積執行緒工作。
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+    ):
+        settings = get_settings()
+        self.max_workers = max_workers or settings.recommend_max_workers
+        self.max_concurrency = max_concurrency or settings.recommend_max_concurrency
+        self.timeout = timeout or settings.recommend_timeout_seconds
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._counters = {"completed": 0, "rejected": 0, "timeouts": 0}
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        deadline = time.monotonic() + self.timeout
+        slots = self._get_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self._counters["rejected"] += 1
+            raise RecommendBusyError("too many concurrent recommendations") from None
+
+        self._in_flight += 1
+        future = asyncio.get_running_loop().run_in_executor(self._get_pool(), fn, *args)
+        # 名額在工作真正結束時才釋放，而不是在呼叫端放棄等待時
+        future.add_done_callback(lambda _: self._release(slots))
+        try:
+            result = await asyncio.wait_for(
+                asyncio.shield(future), max(deadline - time.monotonic(), 0)
+            )
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            logger.warning(f"Recommendation exceeded {self.timeout}s timeout")
+            raise RecommendTimeoutError(f"recommendation exceeded {self.timeout}s") from None
+        self._counters["completed"] += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "max_workers": self.max_workers,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _release(self, slots: asyncio.Semaphore) -> None:
+        self._in_flight -= 1
+        slots.release()
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        # 第一次使用時才建立，綁定在實際執行的 event loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._slots
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="recommend"
+            )
+        return self._pool
+
+
+recommend_executor = RecommendExecutor()
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.models import CreditCard, Promotion
+from src.recommender.scoring import (
+    FREE_CARD_ROI_SCORE,
+    FULL_ROI_PERCENT,
+    MAX_REWARD_RATIO,
+    PREFERENCE_CHECKS,
+    ScoringWeights,
+    calculate_promotion_score,
+)
+
+_PREFERENCE_BITS = {name: bit for bit, name in enumerate(PREFERENCE_CHECKS)}
+
+
+@dataclass(frozen=True)
+class MatrixScores:
+    """RewardMatrix.score 的結果，每個欄位都是依卡片順序排列的陣列
+
+    score_many 的結果各欄位多一個輪廓維度，形狀為 (輪廓數, 卡片數)。
+    """
+
+    total: np.ndarray
+    reward_score: np.ndarray
+    feature_score: np.ndarray
+    promotion_score: np.ndarray
+    annual_fee_roi_score: np.ndarray
+    monthly_reward: np.ndarray
+
+    def for_card(self, index: int) -> Dict[str, float]:
+        """單張卡片的分數，格式同 calculate_total_score（另含 monthly_reward）"""
+        return {
+            "total": float(self.total[index]),
+            "reward_score": float(self.reward_score[index]),
+            "feature_score": float(self.feature_score[index]),
+            "promotion_score": float(self.promotion_score[index]),
+            "annual_fee_roi_score": float(self.annual_fee_roi_score[index]),
+            "monthly_reward": float(self.monthly_reward[index]),
+        }
+
+
+class RewardMatrix:
+    """卡片 × 消費類別的最佳回饋率與上限，以及年費、權益 bitmask、優惠分數向量
+
+    計算結果與 scoring.py 的逐卡函式相同：每個類別取高於基本回饋的最高優惠率
+    （同率取先出現者）及其上限；沒有優惠的類別使用基本回饋、無上限。
+    建立後不再修改，可在多個請求（執行緒）間共用。
+    """
+
+    def __init__(
+        self,
+        cards: Sequence[CreditCard],
+        promotions_by_card: Mapping[int, Sequence[Promotion]],
+    ):
+        self.cards: Tuple[CreditCard, ...] = tuple(cards)
+        n = len(self.cards)
+
+        categories: Dict[str, int] = {}
+        for card in self.cards:
+            for promo in promotions_by_card.get(card.id, ()):
+                if promo.category and promo.reward_rate:
+                    categories.setdefault(promo.category, len(categories))
+        self.categories = categories
+
+        self.base_rates = np.array([card.base_reward_rate or 0.0 for card in self.cards])
+        self.rates = np.repeat(self.base_rates[:, None], len(categories), axis=1)
+        self.caps = np.full((n, len(categories)), np.inf)  # np.inf 表示沒有上限
+        self.fees = np.array([float(card.annual_fee or 0) for card in self.cards])
+        self.fee_blocked = np.array(
+            [bool(card.annual_fee and card.annual_fee > 0 and not card.annual_fee_waiver)
+             for card in self.cards],
+            dtype=bool,
+        )
+        self.feature_bits = np.zeros(n, dtype=np.int64)
+        self.promotion_scores = np.zeros(n)
+
+        for i, card in enumerate(self.cards):
+            promotions = promotions_by_card.get(card.id, ())
+            for promo in promotions:
+                if not promo.category or not promo.reward_rate:
+                    continue
+                j = categories[promo.category]
+                if promo.reward_rate > self.rates[i, j]:
+                    self.rates[i, j] = promo.reward_rate
+                    self.caps[i, j] = np.inf if promo.reward_limit is None else promo.reward_limit
+
+            features = card.features or {}
+            for name, check in PREFERENCE_CHECKS.items():
+                if check(card, features):
+                    self.feature_bits[i] |= 1 << _PREFERENCE_BITS[name]
+            self.promotion_scores[i] = calculate_promotion_score(list(promotions))
+
+        for array in (self.base_rates, self.rates, self.caps, self.fees, self.fee_blocked,
+                      self.feature_bits, self.promotion_scores):
+            array.flags.writeable = False
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def columns(self, categories: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """指定類別的 (回饋率, 上限) 子矩陣；矩陣外的類別使用基本回饋、無上限"""
+        n = len(self.cards)
+        rates = np.empty((n, len(categories)))
+        caps = np.full((n, len(categories)), np.inf)
+        for k, category in enumerate(categories):
+            j = self.categories.get(category)
+            if j is None:
+                rates[:, k] = self.base_rates
+            else:
+                rates[:, k] = self.rates[:, j]
+                caps[:, k] = self.caps[:, j]
+        return rates, caps
+
+    def monthly_rewards(
+        self,
+        spending_habits: Mapping[str, float],
+        monthly_amount: int,
+        apply_limits: bool = True,
+    ) -> np.ndarray:
+        """所有卡片的每月回饋估算（同 estimate_monthly_reward）"""
+        categories = list(spending_habits)
+        rates, caps = self.columns(categories)
+        spend = monthly_amount * np.array([spending_habits[c] for c in categories], dtype=float)
+        rewards = spend * (rates / 100)
+        if apply_limits:
+            rewards = np.minimum(rewards, caps)
+        return rewards.sum(axis=1)
+
+    def feature_scores(self, preferences: Sequence[str]) -> np.ndarray:
+        """所有卡片的權益分數（同 calculate_feature_score）"""
+        if not preferences:
+            return np.full(len(self.cards), 50.0)
+        matched = np.zeros(len(self.cards))
+        for pref in preferences:
+            bit = _PREFERENCE_BITS.get(pref)
+            if bit is not None:
+                matched += (self.feature_bits >> bit) & 1
+        return np.round(matched / len(preferences) * 100, 2)
+
+    def score(
+        self,
+        spending_habits: Mapping[str, float],
+        monthly_amount: int,
+        preferences: List[str],
+        weights: Optional[ScoringWeights] = None,
+    ) -> MatrixScores:
+        """一次計算所有卡片的各項分數（同 calculate_total_score）"""
+        monthly = self.monthly_rewards(spending_habits, monthly_amount)
+        return self._combine(
+            monthly, np.float64(monthly_amount), self.feature_scores(preferences), weights
+        )
+
+    def score_many(
+        self,
+        profiles: Sequence[Tuple[Mapping[str, float], int, Sequence[str]]],
+        weights: Optional[ScoringWeights] = None,
+    ) -> MatrixScores:
+        """多組 (消費比例, 每月金額, 偏好) 一次評分，各欄位為 (輪廓數, 卡片數) 陣列
+
+        每月金額先展開成 輪廓 × 類別 的花費矩陣，再對 卡片 × 類別 回饋率廣播相乘；
+        每格回饋須先與上限取 min 才能加總，無法化成單純的矩陣乘法。
+        記憶體用量與 輪廓數 × 卡片數 × 類別數 成正比，大量輪廓請分批呼叫。
+        """
+        categories: Dict[str, int] = {}
+        for spending, _, _ in profiles:
+            for category in spending:
+                categories.setdefault(category, len(categories))
+        spend = np.zeros((len(profiles), len(categories)))
+        amounts = np.empty((len(profiles), 1))
+        for p, (spending, amount, _) in enumerate(profiles):
+            amounts[p, 0] = amount
+            for category, ratio in spending.items():
+                spend[p, categories[category]] = amount * ratio
+
+        rates, caps = self.columns(list(categories))
+        rewards = np.minimum(spend[:, None, :] * (rates / 100)[None, :, :], caps[None, :, :])
+        monthly = rewards.sum(axis=2)
+
+        feature_rows: Dict[Tuple[str, ...], np.ndarray] = {}
+        feature_score = np.empty_like(monthly)
+        for p, (_, _, preferences) in enumerate(profiles):
+            key = tuple(preferences)
+            if key not in feature_rows:
+                feature_rows[key] = self.feature_scores(preferences)
+            feature_score[p] = feature_rows[key]
+        return self._combine(monthly, amounts, feature_score, weights)
+
+    def _combine(
+        self,
+        monthly: np.ndarray,
+        amounts: np.ndarray,
+        feature_score: np.ndarray,
+        weights: Optional[ScoringWeights],
+    ) -> MatrixScores:
+        """由每月回饋與權益分數算出總分；amounts 可為純量或可廣播到 monthly 的陣列"""
+        weights = weights or ScoringWeights()
+        max_possible = amounts * MAX_REWARD_RATIO
+        annual_spending = amounts * 12
+        with np.errstate(divide="ignore", invalid="ignore"):
+            reward_score = np.where(
+                max_possible > 0,
+                np.round(np.minimum(monthly / max_possible * 100, 100), 2),
+                0.0,
+            )
+            roi = (monthly * 12 - self.fees) / annual_spending * 100
+            roi_score = np.where(
+                roi <= 0, 0.0, np.round(np.minimum(roi / FULL_ROI_PERCENT, 100), 2)
+            )
+        roi_score = np.where(annual_spending == 0, 0.0, roi_score)
+        roi_score = np.where(self.fees == 0, FREE_CARD_ROI_SCORE, roi_score)
+
+        promotion_score = np.broadcast_to(self.promotion_scores, monthly.shape)
+        total = np.round(
+            reward_score * weights.reward
+            + feature_score * weights.feature
+            + promotion_score * weights.promotion
+            + roi_score * weights.annual_fee_roi,
+            2,
+        )
+        return MatrixScores(
+            total=total,
+            reward_score=reward_score,
+            feature_score=feature_score,
+            promotion_score=promotion_score,
+            annual_fee_roi_score=roi_score,
+            monthly_reward=monthly,
+        )
+
+
+def top_k(totals: np.ndarray, k: int) -> np.ndarray:
+    """分數最高的 k 個索引，依分數由高到低；同分時索引小者在前（同穩定排序）
+
+    以 argpartition 找出第 k 高的分數，只對不低於它的項目排序。
+    """
+    k = min(k, len(totals))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    threshold = totals[np.argpartition(-totals, k - 1)[k - 1]]
+    chosen = np.flatnonzero(totals >= threshold)
+    return chosen[np.lexsort((chosen, -totals[chosen]))][:k]
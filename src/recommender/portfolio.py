@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.models import CreditCard
+from src.recommender.matrix import RewardMatrix
+
+# 浮點誤差容忍值，上界不超過目前最佳解時即剪枝
+_EPS = 1e-9
+
+
+@dataclass(frozen=True)
+class Allocation:
+    """某類別分配給某張卡的每月金額與回饋"""
+
+    card_id: int
+    spend: float
+    reward: float
+
+
+@dataclass(frozen=True)
+class Portfolio:
+    """多卡組合：卡片、每月回饋與年費攤提，以及每個類別的刷卡分配（依回饋率由高到低）"""
+
+    cards: Tuple[CreditCard, ...]
+    monthly_reward: float
+    monthly_fee: float
+    assignments: Mapping[str, Tuple[Allocation, ...]]
+    explored: int = 0
+
+    @property
+    def net_monthly_value(self) -> float:
+        return self.monthly_reward - self.monthly_fee
+
+
+class PortfolioOptimizer:
+    """找出最多 k 張卡的最佳組合（每月回饋減年費/12 最大）
+
+    每個類別依回饋率由高到低刷卡，達到該卡回饋上限後其餘金額改刷下一張；
+    單卡時結果與 estimate_monthly_reward 相同。搜尋前先刪去被至少 k 張其他卡
+    在所有類別回饋率、上限與年費上都不差的卡（最佳組合必定可以不用它），
+    再以分支定界搜尋：組合價值為 submodular，子樹上界為目前價值加上剩餘名額數
+    個最大的正邊際價值。每個節點以一次陣列運算評估所有候選卡的加入結果。
+    """
+
+    def __init__(
+        self,
+        matrix: RewardMatrix,
+        spending_habits: Mapping[str, float],
+        monthly_amount: int,
+        candidates: Optional[Sequence[int]] = None,
+    ):
+        self.matrix = matrix
+        self.categories = [c for c, ratio in spending_habits.items() if ratio > 0]
+        self.spend = monthly_amount * np.array(
+            [spending_habits[c] for c in self.categories], dtype=float
+        )
+        rates, self.caps = matrix.columns(self.categories)
+        self.rates = rates / 100
+        # 每張卡在各類別達到回饋上限前可刷的金額
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.capacity = np.where(self.rates > 0, self.caps / self.rates, np.inf)
+        self.monthly_fees = matrix.fees / 12
+        self.candidates = np.arange(len(matrix)) if candidates is None else np.asarray(
+            candidates, dtype=np.intp
+        )
+        self.explored = 0
+
+    def value(self, indices: Sequence[int]) -> float:
+        """組合的每月淨價值（回饋減年費/12）"""
+        sets = np.asarray([indices], dtype=np.intp)
+        return float(self._rewards(sets)[0] - self.monthly_fees[sets[0]].sum())
+
+    def optimize(self, k: int) -> Portfolio:
+        self.explored = 0
+        order = self._prune(self.candidates, k)
+        if k <= 0 or len(order) == 0:
+            return self._portfolio(())
+
+        singles = self._values((), order)
+        order = order[np.argsort(-singles, kind="stable")]
+        best = {"set": (int(order[0]),), "value": float(singles.max())}
+        self._greedy(order, k, best)
+        self._search((), 0.0, order, k, best)
+        return self._portfolio(best["set"])
+
+    def _greedy(self, order: np.ndarray, k: int, best: Dict) -> None:
+        # 先以貪婪法取得初始解，讓分支定界一開始就能剪枝
+        base: Tuple[int, ...] = ()
+        for _ in range(k):
+            rest = np.array([j for j in order if j not in base], dtype=np.intp)
+            if len(rest) == 0:
+                return
+            values = self._values(base, rest)
+            pick = int(np.argmax(values))
+            base = base + (int(rest[pick]),)
+            if values[pick] > best["value"] + _EPS:
+                best["set"], best["value"] = base, float(values[pick])
+
+    def _search(
+        self,
+        base: Tuple[int, ...],
+        base_value: float,
+        rest: np.ndarray,
+        k: int,
+        best: Dict,
+    ) -> None:
+        slots = k - len(base)
+        if slots <= 0 or len(rest) == 0:
+            return
+        values = self._values(base, rest)
+        gains = np.maximum(values - base_value, 0) if base else np.maximum(values, 0)
+        bounds = _suffix_top_sums(gains, slots - 1)
+
+        for offset, j in enumerate(rest):
+            value = float(values[offset])
+            if value > best["value"] + _EPS:
+                best["set"], best["value"] = base + (int(j),), value
+            # 子樹只會加入 rest[offset+1:] 的卡，每張的邊際價值不超過在 base 時的值
+            if slots > 1 and value + bounds[offset + 1] > best["value"] + _EPS:
+                self._search(base + (int(j),), value, rest[offset + 1:], k, best)
+
+    def _prune(self, candidates: np.ndarray, k: int) -> np.ndarray:
+        """刪去被至少 k 張其他候選卡支配的卡"""
+        if len(candidates) <= k:
+            return candidates
+        rates = self.rates[candidates]
+        caps = self.caps[candidates]
+        fees = self.monthly_fees[candidates]
+        weakly = (
+            (rates[:, None, :] >= rates[None, :, :]).all(axis=2)
+            & (caps[:, None, :] >= caps[None, :, :]).all(axis=2)
+            & (fees[:, None] <= fees[None, :])
+        )
+        # 完全相同的卡以索引較小者為準，避免互相支配而全部被刪
+        equal = weakly & weakly.T
+        index = np.arange(len(candidates))
+        dominates = weakly & (~equal | (index[:, None] < index[None, :]))
+        np.fill_diagonal(dominates, False)
+        return candidates[dominates.sum(axis=0) < k]
+
+    def _values(self, base: Tuple[int, ...], rest: np.ndarray) -> np.ndarray:
+        """base 分別加入 rest 中每張卡後的每月淨價值"""
+        sets = np.column_stack([np.tile(np.asarray(base, dtype=np.intp), (len(rest), 1)), rest])
+        self.explored += len(rest)
+        return self._rewards(sets) - self.monthly_fees[sets].sum(axis=1)
+
+    def _rewards(self, sets: np.ndarray) -> np.ndarray:
+        allocated, rates, _ = self._fill(sets)
+        return (allocated * rates).sum(axis=(1, 2))
+
+    def _fill(self, sets: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """sets 為 (組合數, 卡片數) 索引；回傳依回饋率排序後各卡在各類別分到的金額"""
+        rates = self.rates[sets]
+        capacity = self.capacity[sets]
+        order = np.argsort(-rates, axis=1, kind="stable")
+        rates = np.take_along_axis(rates, order, axis=1)
+        capacity = np.take_along_axis(capacity, order, axis=1)
+        before = np.zeros_like(capacity)
+        before[:, 1:] = np.cumsum(capacity[:, :-1], axis=1)
+        allocated = np.clip(self.spend - before, 0, capacity)
+        return allocated, rates, order
+
+    def _portfolio(self, indices: Tuple[int, ...]) -> Portfolio:
+        cards = tuple(self.matrix.cards[i] for i in indices)
+        if not indices:
+            return Portfolio(cards=(), monthly_reward=0.0, monthly_fee=0.0, assignments={},
+                             explored=self.explored)
+        sets = np.asarray([indices], dtype=np.intp)
+        allocated, rates, order = self._fill(sets)
+        assignments = {}
+        for c, category in enumerate(self.categories):
+            assignments[category] = tuple(
+                Allocation(
+                    card_id=cards[order[0, m, c]].id,
+                    spend=float(allocated[0, m, c]),
+                    reward=float(allocated[0, m, c] * rates[0, m, c]),
+                )
+                for m in range(len(indices))
+                if allocated[0, m, c] > 0
+            )
+        return Portfolio(
+            cards=cards,
+            monthly_reward=float((allocated * rates).sum()),
+            monthly_fee=float(self.monthly_fees[list(indices)].sum()),
+            assignments=assignments,
+            explored=self.explored,
+        )
+
+
+def _suffix_top_sums(values: np.ndarray, t: int) -> np.ndarray:
+    """result[i] 為 values[i:] 中最大 t 個值的和（result[len(values)] 為 0）"""
+    result = np.zeros(len(values) + 1)
+    if t <= 0:
+        return result
+    heap: list = []
+    total = 0.0
+    for i in range(len(values) - 1, -1, -1):
+        value = float(values[i])
+        if len(heap) < t:
+            heapq.heappush(heap, value)
+            total += value
+        elif value > heap[0]:
+            total += value - heapq.heapreplace(heap, value)
+        result[i] = total
+    return result
@@ -1,8 +1,16 @@
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 
 from src.models import CreditCard, Promotion
 
+# 回饋分數以每月消費 5% 為滿分；年費卡淨 ROI 達 5% 為滿分；免年費卡 ROI 固定 80 分
+MAX_REWARD_RATIO = 0.05
+FULL_ROI_PERCENT = 0.05
+FREE_CARD_ROI_SCORE = 80.0
+
+# 購物平台 → 回饋類別
+PLATFORM_CATEGORIES = {"pchome": "online_shopping", "momo": "online_shopping"}
+
 
 @dataclass
 class ScoringWeights:
@@ -59,12 +67,35 @@ def calculate_reward_score(
     )
 
     # 正規化到 0-100
-    max_possible = monthly_amount * 0.05  # 假設最高 5% 回饋
+    max_possible = monthly_amount * MAX_REWARD_RATIO
     score = min((total_reward / max_possible) * 100, 100) if max_possible > 0 else 0
 
     return round(score, 2)
 
 
+# 偏好 → 判斷卡片是否符合的函式 (card, features)；順序即 RewardMatrix 的 bit 位置
+PREFERENCE_CHECKS: Dict[str, Callable[[CreditCard, Dict], bool]] = {
+    "no_annual_fee": lambda c, f: c.annual_fee == 0 or c.annual_fee is None,
+    "airport_pickup": lambda c, f: f.get("airport_pickup", False),
+    "lounge_access": lambda c, f: f.get("lounge_access") or f.get("lounge", False),
+    "cashback": lambda c, f: f.get("reward_type") == "cashback",
+    "miles": lambda c, f: f.get("reward_type") == "miles",
+    "high_reward": lambda c, f: (c.base_reward_rate or 0) >= 2.0,
+    "travel": lambda c, f: (
+        f.get("reward_type") == "miles"
+        or f.get("overseas", False)
+        or f.get("airport_transfer", False)
+    ),
+    "dining": lambda c, f: f.get("dining", False),
+    "mobile_pay": lambda c, f: f.get("mobile_pay", False),
+    "online_shopping": lambda c, f: f.get("online_shopping", False),
+    "new_cardholder": lambda c, f: f.get("new_cardholder_bonus", False),
+    "installment": lambda c, f: f.get("installment", False),
+    "streaming": lambda c, f: f.get("streaming", False),
+    "travel_insurance": lambda c, f: f.get("travel_insurance", False),
+}
+
+
 def calculate_feature_score(
     card: CreditCard,
     preferences: List[str],
@@ -74,35 +105,11 @@ def calculate_feature_score(
         return 50.0
 
     features = card.features or {}
-    matched = 0
-
-    preference_mapping = {
-        "no_annual_fee": lambda c: c.annual_fee == 0 or c.annual_fee is None,
-        "airport_pickup": lambda c: features.get("airport_pickup", False),
-        "lounge_access": lambda c: (
-            features.get("lounge_access") or features.get("lounge", False)
-        ),
-        "cashback": lambda c: features.get("reward_type") == "cashback",
-        "miles": lambda c: features.get("reward_type") == "miles",
-        "high_reward": lambda c: (c.base_reward_rate or 0) >= 2.0,
-        "travel": lambda c: (
-            features.get("reward_type") == "miles"
-            or features.get("overseas", False)
-            or features.get("airport_transfer", False)
-        ),
-        "dining": lambda c: features.get("dining", False),
-        "mobile_pay": lambda c: features.get("mobile_pay", False),
-        "online_shopping": lambda c: features.get("online_shopping", False),
-        "new_cardholder": lambda c: features.get("new_cardholder_bonus", False),
-        "installment": lambda c: features.get("installment", False),
-        "streaming": lambda c: features.get("streaming", False),
-        "travel_insurance": lambda c: features.get("travel_insurance", False),
-    }
-
-    for pref in preferences:
-        if pref in preference_mapping:
-            if preference_mapping[pref](card):
-                matched += 1
+    matched = sum(
+        1
+        for pref in preferences
+        if pref in PREFERENCE_CHECKS and PREFERENCE_CHECKS[pref](card, features)
+    )
 
     score = (matched / len(preferences)) * 100
     return round(score, 2)
@@ -122,7 +129,7 @@ def calculate_annual_fee_roi(
     """
     annual_fee = card.annual_fee or 0
     if annual_fee == 0:
-        return 80.0
+        return FREE_CARD_ROI_SCORE
 
     monthly_reward = estimate_monthly_reward(
         card, spending_habits, monthly_amount, promotions, apply_limits=True
@@ -140,7 +147,7 @@ def calculate_annual_fee_roi(
         return 0.0
 
     # Normalize: 5% net ROI = perfect score
-    score = min(roi / 0.05, 100)
+    score = min(roi / FULL_ROI_PERCENT, 100)
     return round(score, 2)
 
 
@@ -209,8 +216,7 @@ def calculate_shopping_reward(
     Returns:
         {"reward_amount": float, "best_rate": float, "reason": str}
     """
-    platform_category = {"pchome": "online_shopping", "momo": "online_shopping"}
-    category = platform_category.get(platform, "online_shopping")
+    category = PLATFORM_CATEGORIES.get(platform, "online_shopping")
 
     base_rate = card.base_reward_rate or 0.0
     best_rate = base_rate
@@ -226,12 +232,16 @@ def calculate_shopping_reward(
     if best_limit is not None and reward > best_limit:
         reward = float(best_limit)
 
-    reason = f"{platform.upper()} 回饋 {best_rate}%"
-    if best_limit:
-        reason += f"（上限 {best_limit} 元）"
-
     return {
         "reward_amount": round(reward, 2),
         "best_rate": best_rate,
-        "reason": reason,
+        "reason": shopping_reason(platform, best_rate, best_limit),
     }
+
+
+def shopping_reason(platform: str, rate: float, limit: Optional[int]) -> str:
+    """單次購物回饋的說明文字"""
+    reason = f"{platform.upper()} 回饋 {rate}%"
+    if limit:
+        reason += f"（上限 {limit} 元）"
+    return reason
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import List
+from typing import Dict, List, Optional
 
 from loguru import logger
 from sqlalchemy import create_engine
@@ -13,10 +15,13 @@ from src.models import CreditCard, Promotion
 from src.models.notification_log import NotificationType
 from src.notifications.dispatcher import NotificationDispatcher
 from src.notifications.formatter import (
+    PRICE_ALERT_BATCH_SIZE,
     format_expiring_promotions,
     format_new_cards,
     format_new_promotions,
 )
+from src.recommender.catalog import catalog_store
+from src.trackers.base import PriceSnapshot
 
 settings = get_settings()
 
@@ -46,6 +51,7 @@ def run_daily_promotion_crawl():
             except Exception as e:
                 logger.error(f"Error crawling {crawler.bank_name}: {e}")
 
+    catalog_store.invalidate()
     logger.info("Daily promotion crawl completed")
 
 
@@ -74,6 +80,7 @@ def run_weekly_card_crawl():
             except Exception as e:
                 logger.error(f"Error sending new card notifications: {e}")
 
+    catalog_store.invalidate()
     logger.info("Weekly card crawl completed")
 
 
@@ -90,6 +97,8 @@ def cleanup_expired_promotions():
 
         session.commit()
         logger.info(f"Deleted {len(expired)} expired promotions")
+    if expired:
+        catalog_store.invalidate()
 
 
 def check_new_promotions():
@@ -162,36 +171,95 @@ def check_expiring_promotions():
 
 
 def run_price_tracking():
-    """每 30 分鐘：爬取所有 active 商品最新價格並觸發通知"""
-    from src.models.notification_log import NotificationType
-    from src.models.tracked_product import TrackedProduct
-    from src.notifications.formatter import format_price_drop_alert
-    from src.trackers.utils import check_price_and_snapshot
+    """每 5 分鐘：依平台並行爬取已到期商品的最新價格，批次寫入、觸發通知並排定下次檢查"""
+    from src.trackers.polling import get_due_products, schedule_next_checks
+    from src.trackers.utils import record_price_snapshots, utcnow
 
     logger.info("Starting price tracking job")
     with get_sync_session() as session:
-        products = session.query(TrackedProduct).filter_by(is_active=True).all()
-        logger.info(f"Tracking {len(products)} active products")
+        now = utcnow()
+        products = get_due_products(session, now)
+        logger.info(f"Tracking {len(products)} due products")
 
+        groups: Dict[str, List[str]] = defaultdict(list)
         for product in products:
-            try:
-                snapshot, is_drop, is_target = check_price_and_snapshot(session, product)
-                if snapshot and (is_drop or is_target):
-                    notification_type = (
-                        NotificationType.target_price_reached
-                        if is_target
-                        else NotificationType.price_drop
-                    )
-                    top_cards = _get_top_cards_for_shopping(
-                        session, product.platform, snapshot.price
-                    )
-                    message = format_price_drop_alert(product, snapshot, top_cards, is_target)
-                    dispatcher = NotificationDispatcher(session)
-                    dispatcher.dispatch(notification_type, [snapshot.id], message)
-            except Exception as e:
-                logger.error(f"Error tracking product {product.id}: {e}")
+            groups[product.platform].append(product.product_id)
+
+        fetched = asyncio.run(_fetch_prices_by_platform(groups))
+
+        snapshots = []
+        for product in products:
+            snapshot = fetched.get(product.platform, {}).get(product.product_id)
+            if snapshot is None:
+                logger.warning(f"No price fetched for product {product.id}")
+                continue
+            snapshots.append((product, snapshot))
+
+        results = record_price_snapshots(session, snapshots, now)
+
+        prices = {product.id: snapshot.price for product, snapshot in snapshots}
+        schedule_next_checks(
+            session, [(product, prices.get(product.id)) for product in products], now
+        )
+        session.commit()
+
+        try:
+            _notify_price_alerts(session, results)
+        except Exception as e:
+            logger.error(f"Error sending price alerts: {e}")
+
+    logger.info(f"Price tracking job completed: {len(results)}/{len(products)} updated")
+
+
+async def _fetch_prices_by_platform(
+    groups: Dict[str, List[str]],
+) -> Dict[str, Dict[str, Optional[PriceSnapshot]]]:
+    """各平台同時抓取；平台內的並行上限由各 tracker 的 fetch_prices 控制"""
+    from src.trackers.utils import get_async_tracker
 
-    logger.info("Price tracking job completed")
+    async def fetch(platform: str, product_ids: List[str]):
+        tracker = get_async_tracker(platform)
+        if tracker is None:
+            return {}
+        try:
+            return await tracker.fetch_prices(product_ids)
+        except Exception as e:
+            logger.error(f"Error fetching prices for {platform}: {e}")
+            return {}
+
+    platforms = list(groups)
+    results = await asyncio.gather(*(fetch(platform, groups[platform]) for platform in platforms))
+    return dict(zip(platforms, results))
+
+
+def _notify_price_alerts(session: Session, results: list):
+    """依通知類型合併降價／目標價通知，每批最多 PRICE_ALERT_BATCH_SIZE 筆"""
+    from src.notifications.formatter import format_price_drop_alerts
+
+    alerts = [r for r in results if r.is_price_drop or r.is_target_reached]
+    if not alerts:
+        return
+
+    catalog = catalog_store.current(session)
+    by_type = defaultdict(list)
+    for result in alerts:
+        notification_type = (
+            NotificationType.target_price_reached
+            if result.is_target_reached
+            else NotificationType.price_drop
+        )
+        top_cards = catalog.best_cards(result.product.platform, result.snapshot.price)
+        by_type[notification_type].append(
+            (result.product, result.snapshot, top_cards, result.is_target_reached)
+        )
+
+    dispatcher = NotificationDispatcher(session)
+    for notification_type, items in by_type.items():
+        for i in range(0, len(items), PRICE_ALERT_BATCH_SIZE):
+            batch = items[i : i + PRICE_ALERT_BATCH_SIZE]
+            message = format_price_drop_alerts(batch)
+            reference_ids = [snapshot.id for _, snapshot, _, _ in batch]
+            dispatcher.dispatch(notification_type, reference_ids, message)
 
 
 def run_flash_deals_refresh():
@@ -209,21 +277,17 @@ def run_flash_deals_refresh():
     logger.info("Flash deals refresh completed")
 
 
-def _get_top_cards_for_shopping(session: Session, platform: str, amount: int, top_n: int = 3):
-    """取得指定購物平台與金額的 Top N 信用卡（含回饋試算）"""
-    from src.models.card import CreditCard
-    from src.models.promotion import Promotion
-    from src.recommender.scoring import calculate_shopping_reward
-
-    cards = session.query(CreditCard).all()
-    ranked = []
-    for card in cards:
-        promotions = session.query(Promotion).filter_by(card_id=card.id).all()
-        result = calculate_shopping_reward(card, platform, amount, promotions)
-        ranked.append({"card": card, **result})
+def run_flash_deals_purge():
+    """每日：刪除結束超過保留天數的限時特賣"""
+    from src.trackers.flash_deals import purge_ended_flash_deals
+    from src.trackers.utils import utcnow
 
-    ranked.sort(key=lambda x: x["reward_amount"], reverse=True)
-    return ranked[:top_n]
+    retention = timedelta(days=settings.flash_deal_retention_days)
+    with get_sync_session() as session:
+        try:
+            purge_ended_flash_deals(session, utcnow(), retention)
+        except Exception as e:
+            logger.error(f"Error purging flash deals: {e}")
 
 
 def _notify_new_cards(session: Session, card_ids: List[int]):
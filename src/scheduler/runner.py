@@ -7,6 +7,7 @@ from src.scheduler.jobs import (
     check_new_promotions,
     cleanup_expired_promotions,
     run_daily_promotion_crawl,
+    run_flash_deals_purge,
     run_flash_deals_refresh,
     run_price_tracking,
     run_weekly_card_crawl,
@@ -56,11 +57,11 @@ def create_scheduler() -> BackgroundScheduler:
         name="Check Expiring Promotions",
     )
 
-    # 每 30 分鐘追蹤商品價格
+    # 每 5 分鐘追蹤已到期商品價格（各商品的輪詢間隔由 src.trackers.polling 決定）
     scheduler.add_job(
         run_price_tracking,
         "interval",
-        minutes=30,
+        minutes=5,
         id="price_tracking",
         name="Price Tracking",
     )
@@ -74,6 +75,14 @@ def create_scheduler() -> BackgroundScheduler:
         name="Flash Deals Refresh",
     )
 
+    # 每日凌晨 4:30 清理已結束的限時特賣
+    scheduler.add_job(
+        run_flash_deals_purge,
+        CronTrigger(hour=4, minute=30),
+        id="flash_deals_purge",
+        name="Flash Deals Purge",
+    )
+
     logger.info("Scheduler configured with jobs")
     return scheduler
 
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Dict, List, Optional, TypeVar
+
+from src.trackers.base import (
+    AsyncBaseTracker,
+    BaseTracker,
+    FlashDealResult,
+    PriceSnapshot,
+    ProductResult,
+)
+
+T = TypeVar("T")
+
+
+class SyncTrackerAdapter(BaseTracker):
+    """以同步介面包裝 AsyncBaseTracker，供排程器等執行緒使用。
+
+    httpx.AsyncClient 與 async Playwright 物件綁定在建立它們的 event loop，
+    因此 adapter 以專屬背景執行緒執行一個常駐 loop，所有呼叫都排入該 loop。
+    FastAPI route 等 async 呼叫端則透過 `aio` 取得可在任意 loop 上 await 的代理。
+    """
+
+    def __init__(self, tracker: AsyncBaseTracker):
+        self.tracker = tracker
+        self.platform = tracker.platform
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        self._aio = _LoopBoundTracker(self)
+
+    @property
+    def aio(self) -> AsyncBaseTracker:
+        return self._aio
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """在 tracker 的 loop 上執行 coroutine 並等待結果（不可在該 loop 內呼叫）"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    async def run_async(self, coro: Awaitable[T]) -> T:
+        """在任意 event loop 上 await tracker 的 coroutine"""
+        loop = self._ensure_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def close(self) -> None:
+        with self._loop_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.tracker.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.tracker.stats()
+
+    def search_products(self, keyword: str) -> List[ProductResult]:
+        return self.run(self.tracker.search_products(keyword))
+
+    def fetch_product_by_url(self, url: str) -> Optional[ProductResult]:
+        return self.run(self.tracker.fetch_product_by_url(url))
+
+    def fetch_price(self, product_id: str) -> Optional[PriceSnapshot]:
+        return self.run(self.tracker.fetch_price(product_id))
+
+    def fetch_prices(self, product_ids: List[str]) -> Dict[str, Optional[PriceSnapshot]]:
+        return self.run(self.tracker.fetch_prices(product_ids))
+
+    def fetch_flash_deals(self) -> List[FlashDealResult]:
+        return self.run(self.tracker.fetch_flash_deals())
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name=f"tracker-loop-{self.platform}",
+                    daemon=True,
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+
+class _LoopBoundTracker(AsyncBaseTracker):
+    """將呼叫轉送到 adapter 專屬 loop 的 async 代理"""
+
+    def __init__(self, adapter: SyncTrackerAdapter):
+        self._adapter = adapter
+        self.platform = adapter.platform
+
+    def stats(self) -> Dict[str, Any]:
+        return self._adapter.stats()
+
+    async def search_products(self, keyword: str) -> List[ProductResult]:
+        return await self._adapter.run_async(self._adapter.tracker.search_products(keyword))
+
+    async def fetch_product_by_url(self, url: str) -> Optional[ProductResult]:
+        return await self._adapter.run_async(self._adapter.tracker.fetch_product_by_url(url))
+
+    async def fetch_price(self, product_id: str) -> Optional[PriceSnapshot]:
+        return await self._adapter.run_async(self._adapter.tracker.fetch_price(product_id))
+
+    async def fetch_prices(self, product_ids: List[str]) -> Dict[str, Optional[PriceSnapshot]]:
+        return await self._adapter.run_async(self._adapter.tracker.fetch_prices(product_ids))
+
+    async def fetch_flash_deals(self) -> List[FlashDealResult]:
+        return await self._adapter.run_async(self._adapter.tracker.fetch_flash_deals())
+
+
+class ThreadedAsyncTracker(AsyncBaseTracker):
+    """尚未提供 async 實作的同步 tracker，以 worker thread 執行避免阻塞 event loop"""
+
+    def __init__(self, tracker: BaseTracker):
+        self._tracker = tracker
+        self.platform = tracker.platform
+
+    def stats(self) -> Dict[str, Any]:
+        return self._tracker.stats()
+
+    async def search_products(self, keyword: str) -> List[ProductResult]:
+        return await asyncio.to_thread(self._tracker.search_products, keyword)
+
+    async def fetch_product_by_url(self, url: str) -> Optional[ProductResult]:
+        return await asyncio.to_thread(self._tracker.fetch_product_by_url, url)
+
+    async def fetch_price(self, product_id: str) -> Optional[PriceSnapshot]:
+        return await asyncio.to_thread(self._tracker.fetch_price, product_id)
+
+    async def fetch_prices(self, product_ids: List[str]) -> Dict[str, Optional[PriceSnapshot]]:
+        return await asyncio.to_thread(self._tracker.fetch_prices, product_ids)
+
+    async def fetch_flash_deals(self) -> List[FlashDealResult]:
+        return await asyncio.to_thread(self._tracker.fetch_flash_deals)
+
+
+def as_async(tracker: BaseTracker) -> AsyncBaseTracker:
+    """取得 tracker 的 async 介面"""
+    if isinstance(tracker, SyncTrackerAdapter):
+        return tracker.aio
+    return ThreadedAsyncTracker(tracker)
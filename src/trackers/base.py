@@ -1,8 +1,18 @@
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+# 電商平台顯示的時間皆為台灣時間；資料庫統一存 naive UTC
+TAIPEI_TZ = timezone(timedelta(hours=8))
+
+
+def taipei_to_utc(value: datetime) -> datetime:
+    """將台灣時間（naive）轉為 naive UTC"""
+    return value.replace(tzinfo=TAIPEI_TZ).astimezone(timezone.utc).replace(tzinfo=None)
 
 
 @dataclass
@@ -32,11 +42,26 @@ class FlashDealResult:
     original_price: Optional[int] = None
     discount_rate: Optional[float] = None
     image_url: Optional[str] = None
+    start_at: Optional[datetime] = None  # naive UTC
+    end_at: Optional[datetime] = None  # naive UTC
 
 
 class BaseTracker(ABC):
     platform: str = ""
 
+    def __enter__(self) -> BaseTracker:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """釋放連線或瀏覽器等長駐資源"""
+
+    def stats(self) -> Dict[str, Any]:
+        """連線池／工作階段狀態，供管理端點檢視"""
+        return {}
+
     @abstractmethod
     def search_products(self, keyword: str) -> List[ProductResult]:
         """以關鍵字搜尋商品，回傳候選清單"""
@@ -52,7 +77,49 @@ class BaseTracker(ABC):
         """取得指定商品目前最新價格快照"""
         ...
 
+    def fetch_prices(self, product_ids: List[str]) -> Dict[str, Optional[PriceSnapshot]]:
+        """批次取得多個商品價格，預設逐一呼叫 fetch_price；平台可覆寫為批次實作"""
+        return {product_id: self.fetch_price(product_id) for product_id in product_ids}
+
     @abstractmethod
     def fetch_flash_deals(self) -> List[FlashDealResult]:
         """抓取平台限時瘋搶列表"""
         ...
+
+
+class AsyncBaseTracker(ABC):
+    """BaseTracker 的 async 版本，可直接在 event loop 內 await 而不阻塞其他請求"""
+
+    platform: str = ""
+
+    async def aclose(self) -> None:
+        """釋放連線或瀏覽器等長駐資源"""
+
+    def stats(self) -> Dict[str, Any]:
+        """連線池／工作階段狀態，供管理端點檢視"""
+        return {}
+
+    @abstractmethod
+    async def search_products(self, keyword: str) -> List[ProductResult]:
+        """以關鍵字搜尋商品，回傳候選清單"""
+        ...
+
+    @abstractmethod
+    async def fetch_product_by_url(self, url: str) -> Optional[ProductResult]:
+        """從 URL 解析商品基本資訊"""
+        ...
+
+    @abstractmethod
+    async def fetch_price(self, product_id: str) -> Optional[PriceSnapshot]:
+        """取得指定商品目前最新價格快照"""
+        ...
+
+    async def fetch_prices(self, product_ids: List[str]) -> Dict[str, Optional[PriceSnapshot]]:
+        """批次取得多個商品價格，預設同時呼叫 fetch_price；平台可覆寫為批次實作"""
+        snapshots = await asyncio.gather(*(self.fetch_price(pid) for pid in product_ids))
+        return dict(zip(product_ids, snapshots))
+
+    @abstractmethod
+    async def fetch_flash_deals(self) -> List[FlashDealResult]:
+        """抓取平台限時瘋搶列表"""
+        ...
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from loguru import logger
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import async_playwright
+from playwright_stealth import Stealth
+
+T = TypeVar("T")
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36"
+)
+
+
+class BrowserSession:
+    """長駐的 headless Chromium 工作階段（async Playwright）。
+
+    browser / context 在多次呼叫之間重複使用，用完的 page 放回池中給下次取用，
+    同時開啟的 page 數以 max_pages 限制。Playwright 物件綁定在第一次使用時的
+    event loop，之後都必須在同一個 loop 上呼叫（由 SyncTrackerAdapter 保證）。
+    """
+
+    def __init__(self, max_pages: int = 2, user_agent: str = DEFAULT_USER_AGENT):
+        self.max_pages = max_pages
+        self.user_agent = user_agent
+        self.launch_count = 0
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._idle_pages: List[Any] = []
+        self._closed = False
+        self._launch_lock: Optional[asyncio.Lock] = None
+        self._page_slots: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> BrowserSession:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def run(self, fn: Callable[[Any], Awaitable[T]]) -> T:
+        """以池中的 page 執行 await fn(page)；browser 已當掉時自動重啟並重試一次"""
+        if self._closed:
+            raise RuntimeError("BrowserSession is closed")
+        if self._page_slots is None:
+            self._launch_lock = asyncio.Lock()
+            self._page_slots = asyncio.Semaphore(self.max_pages)
+
+        async with self._page_slots:
+            relaunched = False
+            while True:
+                await self._ensure_started()
+                page = await self._acquire_page()
+                try:
+                    result = await fn(page)
+                except PlaywrightError as e:
+                    if not relaunched and not self.is_healthy():
+                        logger.warning(f"Browser session crashed, relaunching: {e}")
+                        relaunched = True
+                        await self._shutdown()
+                        continue
+                    await self._release_page(page)
+                    raise
+                except Exception:
+                    await self._release_page(page)
+                    raise
+                await self._release_page(page)
+                return result
+
+    def is_healthy(self) -> bool:
+        return not self._closed and self._browser is not None and self._browser.is_connected()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.is_healthy(),
+            "launch_count": self.launch_count,
+            "idle_pages": len(self._idle_pages),
+            "max_pages": self.max_pages,
+        }
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        await self._shutdown()
+
+    async def _ensure_started(self) -> None:
+        async with self._launch_lock:
+            if self.is_healthy():
+                return
+            if self._playwright is not None:
+                await self._shutdown()
+
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(headless=True)
+            self._context = await self._browser.new_context(user_agent=self.user_agent)
+            await Stealth().apply_stealth_async(self._context)
+            self.launch_count += 1
+            logger.info(f"Browser session launched (#{self.launch_count})")
+
+    async def _acquire_page(self):
+        while self._idle_pages:
+            page = self._idle_pages.pop()
+            if not page.is_closed():
+                return page
+        return await self._context.new_page()
+
+    async def _release_page(self, page) -> None:
+        if page.is_closed() or not self.is_healthy():
+            return
+        if len(self._idle_pages) >= self.max_pages:
+            try:
+                await page.close()
+            except PlaywrightError:
+                pass
+            return
+        self._idle_pages.append(page)
+
+    async def _shutdown(self) -> None:
+        self._idle_pages = []
+        for closer in (self._context, self._browser):
+            if closer is None:
+                continue
+            try:
+                await closer.close()
+            except Exception as e:
+                logger.debug(f"Ignoring error while closing browser session: {e}")
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.debug(f"Ignoring error while stopping playwright: {e}")
+        self._context = None
+        self._browser = None
+        self._playwright = None
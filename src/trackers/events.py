@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from loguru import logger
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+from src.config import get_settings
+
+EVENT_TYPES = ("price_changed", "target_reached", "flash_deal_added")
+
+# 尚未 commit 的事件暫存在 session.info，commit 後才發佈、rollback 則丟棄
+_PENDING_KEY = "pending_events"
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    data: Dict[str, Any]
+
+    def to_sse(self) -> str:
+        payload = json.dumps(self.data, ensure_ascii=False, default=str)
+        return f"id: {self.id}\nevent: {self.type}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """單一 SSE 連線的訂閱，事件放入綁定在該連線 event loop 的有界佇列"""
+
+    def __init__(
+        self,
+        bus: EventBus,
+        loop: asyncio.AbstractEventLoop,
+        types: Optional[Set[str]],
+        max_queue: int,
+    ):
+        self.loop = loop
+        self.types = types
+        self.dropped = 0
+        self._bus = bus
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+
+    def __enter__(self) -> Subscription:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """取得下一個事件；timeout 內沒有事件時回傳 None"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self._bus._unsubscribe(self)
+
+    def _offer(self, event: Event) -> None:
+        # 只在訂閱端的 loop 上執行；佇列滿時丟掉最舊的事件，慢的連線不會拖住其他人
+        if self.types is not None and event.type not in self.types:
+            return
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+
+class EventBus:
+    """行程內的 pub/sub，排程器執行緒發佈、API event loop 上的 SSE 連線訂閱"""
+
+    def __init__(self, max_queue: Optional[int] = None):
+        self.max_queue = max_queue or get_settings().event_queue_size
+        self.published = 0
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self, types: Optional[Iterable[str]] = None) -> Subscription:
+        """在目前的 event loop 上建立訂閱；types 為空代表接收所有事件"""
+        subscription = Subscription(
+            self,
+            asyncio.get_running_loop(),
+            set(types) if types else None,
+            self.max_queue,
+        )
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> Event:
+        """發佈事件，可在任意執行緒呼叫"""
+        with self._lock:
+            event = Event(id=next(self._ids), type=event_type, data=data)
+            self.published += 1
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._offer, event)
+            except RuntimeError:
+                # 訂閱端的 loop 已關閉（例如伺服器重啟中）
+                self._unsubscribe(subscription)
+        return event
+
+    def publish_after_commit(self, session: Session, event_type: str, data: Dict[str, Any]) -> None:
+        """事件隨 session 的交易一起生效：commit 後發佈，rollback 則丟棄"""
+        pending: List[Tuple[str, Dict[str, Any]]] = session.info.setdefault(_PENDING_KEY, [])
+        pending.append((event_type, data))
+
+    def stats(self) -> Dict[str, Any]:
+        subscribers = list(self._subscribers)
+        return {
+            "subscribers": len(subscribers),
+            "published": self.published,
+            "dropped": sum(s.dropped for s in subscribers),
+        }
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+
+event_bus = EventBus()
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    for event_type, data in pending or []:
+        event_bus.publish(event_type, data)
+    if pending:
+        logger.debug(f"Published {len(pending)} events after commit")
+
+
+@sa_event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session: Session, previous_transaction) -> None:
+    # savepoint 的 rollback 不影響外層交易排入的事件
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
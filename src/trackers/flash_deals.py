@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import base64
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from src.models.flash_deal import FlashDeal
+
+# 來源沒有提供結束時間的特賣，視為寫入後 24 小時內有效
+FLASH_DEAL_DEFAULT_TTL = timedelta(hours=24)
+
+# 排序時 discount_rate 為空的特賣視為沒有折扣（排在最後）
+_NO_DISCOUNT = 1.0
+
+
+def active_deal_clause(now: datetime):
+    """「目前進行中」的條件，由 ix_flash_deals_active (platform, end_at) 支撐"""
+    return and_(
+        FlashDeal.end_at > now,
+        or_(FlashDeal.start_at.is_(None), FlashDeal.start_at <= now),
+    )
+
+
+def discount_sort_key():
+    return func.coalesce(FlashDeal.discount_rate, _NO_DISCOUNT)
+
+
+def encode_cursor(discount_rate: Optional[float], deal_id: int) -> str:
+    rate = discount_rate if discount_rate is not None else _NO_DISCOUNT
+    return base64.urlsafe_b64encode(f"{rate}:{deal_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """解析分頁 cursor；格式錯誤時拋出 ValueError"""
+    try:
+        rate, deal_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        return float(rate), int(deal_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def after_cursor_clause(cursor: str):
+    """依 (discount_rate, id) 的 keyset 條件取得 cursor 之後的資料"""
+    rate, deal_id = decode_cursor(cursor)
+    key = discount_sort_key()
+    return or_(key > rate, and_(key == rate, FlashDeal.id > deal_id))
+
+
+def purge_ended_flash_deals(session: Session, now: datetime, retention: timedelta) -> int:
+    """刪除結束超過 retention 的特賣，回傳刪除筆數
+
+    命中追蹤商品的特賣價格已寫入 price_history，刪除特賣不會遺失價格歷史。
+    欄位新增前寫入、沒有 end_at 的舊資料先以 created_at + 預設 TTL 補上。
+    """
+    legacy: List[Tuple[int, datetime]] = session.execute(
+        select(FlashDeal.id, FlashDeal.created_at).where(FlashDeal.end_at.is_(None))
+    ).all()
+    if legacy:
+        session.execute(
+            update(FlashDeal),
+            [
+                {"id": deal_id, "end_at": created_at + FLASH_DEAL_DEFAULT_TTL}
+                for deal_id, created_at in legacy
+            ],
+        )
+
+    result = session.execute(delete(FlashDeal).where(FlashDeal.end_at < now - retention))
+    session.commit()
+    logger.info(f"Purged {result.rowcount} ended flash deals")
+    return result.rowcount
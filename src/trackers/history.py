@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.models.price_history import PriceHistory
+
+
+@dataclass
+class PricePoint:
+    price: int
+    snapshot_at: datetime
+    original_price: Optional[int] = None
+    in_stock: bool = True
+    source: Optional[str] = None
+
+
+def expand_price_runs(
+    rows: Iterable[PriceHistory],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> List[PricePoint]:
+    """把變動才寫入的 price_history 還原為時間序列
+
+    每筆資料代表一段價格不變的區間：snapshot_at 為開始，last_seen_at 為最後一次
+    輪詢仍看到此價格的時間。有 last_seen_at 時補上區間結束點，讓圖表維持水平線段
+    而不是直接斜線連到下一次變價。給定 start / end 時，區間會被裁切到該範圍內。
+    rows 需依 snapshot_at 由舊到新排序。
+    """
+    points: List[PricePoint] = []
+    for row in rows:
+        run_start = row.snapshot_at
+        run_end = max(row.last_seen_at or run_start, run_start)
+        if start is not None:
+            if run_end < start:
+                continue
+            run_start = max(run_start, start)
+        if end is not None:
+            if run_start > end:
+                continue
+            run_end = min(run_end, end)
+
+        for at in (run_start, run_end) if run_end > run_start else (run_start,):
+            points.append(
+                PricePoint(
+                    price=row.price,
+                    snapshot_at=at,
+                    original_price=row.original_price,
+                    in_stock=row.in_stock,
+                    source=row.source,
+                )
+            )
+    return points
+
+
+def downsample_lttb(points: List[PricePoint], threshold: int) -> List[PricePoint]:
+    """Largest-Triangle-Three-Buckets 降採樣，保留價格曲線的轉折與極值
+
+    頭尾兩點固定保留，中間每個 bucket 選出與前一個選點、下一個 bucket 平均點
+    所構成三角形面積最大的點。
+    """
+    n = len(points)
+    if threshold >= n:
+        return list(points)
+    if threshold < 3:
+        return [points[0], points[-1]][:threshold]
+
+    xs = [p.snapshot_at.timestamp() for p in points]
+    ys = [float(p.price) for p in points]
+
+    sampled = [points[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int((i + 1) * bucket_size) + 1
+        avg_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_count = avg_end - avg_start
+        avg_x = sum(xs[avg_start:avg_end]) / avg_count
+        avg_y = sum(ys[avg_start:avg_end]) / avg_count
+
+        range_start = int(i * bucket_size) + 1
+        range_end = int((i + 1) * bucket_size) + 1
+        ax, ay = xs[a], ys[a]
+        max_area = -1.0
+        next_a = range_start
+        for j in range(range_start, range_end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                next_a = j
+        sampled.append(points[next_a])
+        a = next_a
+
+    sampled.append(points[-1])
+    return sampled
+
+
+def to_columnar(points: List[PricePoint]) -> Dict[str, List[Any]]:
+    """以平行陣列輸出，省去每個點重複的欄位名稱"""
+    return {
+        "ts": [p.snapshot_at.isoformat() for p in points],
+        "price": [p.price for p in points],
+        "original_price": [p.original_price for p in points],
+        "in_stock": [p.in_stock for p in points],
+    }
@@ -1,21 +1,88 @@
 from __future__ import annotations
 
+import asyncio
 import re
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
 
+import httpx
+import lxml.html
 from loguru import logger
-from playwright.sync_api import sync_playwright
-from playwright_stealth import Stealth
 
-from src.trackers.base import BaseTracker, FlashDealResult, PriceSnapshot, ProductResult
+from src.config import get_settings
+from src.trackers.adapter import SyncTrackerAdapter
+from src.trackers.base import (
+    TAIPEI_TZ,
+    AsyncBaseTracker,
+    FlashDealResult,
+    PriceSnapshot,
+    ProductResult,
+    taipei_to_utc,
+)
+from src.trackers.browser import DEFAULT_USER_AGENT, BrowserSession
 
 SEARCH_URL = "https://www.momoshop.com.tw/search/searchShop.jsp?keyword={keyword}"
 MOMO_HOME_URL = "https://www.momoshop.com.tw/"
-
-
-def _parse_price(text: str) -> Optional[int]:
+MOMO_BASE_URL = "https://www.momoshop.com.tw"
+GOODS_URL = "https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code={product_id}"
+# 搜尋頁前端呼叫的 JSON API，回傳格式與攔截到的 XHR 相同
+SEARCH_API_URL = "https://apisearch.momoshop.com.tw/momoSearchCloud/moec/textSearch"
+# 限時搶購頁上目前場次的時段標籤（例如「10:00~12:00」）
+FLASH_SLOT_SELECTOR = "li.selected, li.on, li.current"
+_TIME_RANGE_RE = re.compile(r"(\d{1,2}):(\d{2})\s*[~～\-－至]\s*(\d{1,2}):(\d{2})")
+
+# 搜尋頁以 XHR 載入商品列表；攔截到 JSON 就不必等 DOM 渲染
+SEARCH_XHR_RE = re.compile(r"momoSearchCloud|textSearch|searchShop.*\.jsp\?.*json", re.I)
+XHR_WAIT_SECONDS = 8
+SEARCH_LIMIT = 10
+FLASH_DEAL_LIMIT = 30
+
+# "auto"：先走 HTTP，被擋時改用瀏覽器；"http"／"browser"：只走指定路徑
+FETCH_MODES = ("auto", "http", "browser")
+BLOCKED_STATUSES = {403, 429, 503}
+HTTP_MAX_CONCURRENCY = 5
+HEADERS = {"User-Agent": DEFAULT_USER_AGENT, "Accept-Language": "zh-TW,zh;q=0.9"}
+
+# 每個頁面只做一次 page.evaluate，在瀏覽器內一次取出所有欄位
+SEARCH_EXTRACT_JS = """
+(limit) => Array.from(document.querySelectorAll('.prdListArea .li_column'))
+  .slice(0, limit)
+  .map((el) => ({
+    name: el.querySelector('.prdName')?.innerText ?? null,
+    price: el.querySelector('.price b')?.innerText ?? null,
+    url: el.querySelector('a')?.getAttribute('href') ?? null,
+  }))
+"""
+
+PRICE_EXTRACT_JS = """
+() => ({
+  price: document.querySelector('.goodsPrice .price b')?.innerText ?? null,
+  original_price: document.querySelector('.goodsPrice .originalPrice')?.innerText ?? null,
+  in_stock: document.querySelector('.addBtnArea') !== null,
+})
+"""
+
+FLASH_DEALS_EXTRACT_JS = """
+([slotSelector, limit]) => ({
+  slots: Array.from(document.querySelectorAll(slotSelector)).map((el) => el.innerText),
+  items: Array.from(document.querySelectorAll('li.box1'))
+    .slice(0, limit)
+    .map((el) => ({
+      brand: el.querySelector('.brand')?.innerText ?? null,
+      name: el.querySelector('.brand2')?.innerText ?? null,
+      sale_price: el.querySelector('.price span')?.innerText ?? null,
+      original_price: el.querySelector('.oldPrice span')?.innerText ?? null,
+      url: el.querySelector("a[id^='gdsHref']")?.getAttribute('href') ?? null,
+    })),
+})
+"""
+
+
+def _parse_price(text: Optional[str]) -> Optional[int]:
     """從文字中萃取數字價格"""
-    cleaned = text.replace(",", "").replace("NT$", "").replace("元", "")
+    if not text:
+        return None
+    cleaned = str(text).replace(",", "").replace("NT$", "").replace("元", "")
     match = re.search(r"\d+", cleaned)
     if match:
         try:
@@ -31,165 +98,426 @@ def _calculate_discount_rate(sale: int, original: int) -> Optional[float]:
     return round(sale / original, 3)
 
 
-class MomoTracker(BaseTracker):
-    platform = "momo"
+def _parse_time_range(
+    text: str, now: Optional[datetime] = None
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """解析「HH:MM~HH:MM」場次時間（台灣時間），回傳 naive UTC 的 (start_at, end_at)
+
+    結束時間早於開始時間代表跨日場次；「24:00」視為隔日 00:00。
+    過午夜後仍在進行的跨日場次（開始時間晚於現在）從前一天開始。
+    """
+    match = _TIME_RANGE_RE.search(text or "")
+    if match is None:
+        return None, None
+    now = now or datetime.now(TAIPEI_TZ).replace(tzinfo=None)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    sh, sm, eh, em = (int(g) for g in match.groups())
+    start = today + timedelta(hours=sh, minutes=sm)
+    end = today + timedelta(hours=eh, minutes=em)
+    if end <= start:
+        end += timedelta(days=1)
+    if start > now and end - timedelta(days=1) > now:
+        start -= timedelta(days=1)
+        end -= timedelta(days=1)
+    return taipei_to_utc(start), taipei_to_utc(end)
+
+
+class MomoBlockedError(Exception):
+    """HTTP 請求被擋（403／429 或回傳驗證頁），需改用瀏覽器"""
 
-    def _get_browser_page(self, playwright):
-        browser = playwright.chromium.launch(headless=True)
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                       "AppleWebKit/537.36 Chrome/120.0.0.0 Safari/537.36"
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _first_text(tree, xpath: str) -> Optional[str]:
+    for value in tree.xpath(xpath):
+        text = value if isinstance(value, str) else value.text_content()
+        if text.strip():
+            return text.strip()
+    return None
+
+
+def _parse_goods_html(html: str) -> Optional[PriceSnapshot]:
+    """解析伺服器端渲染的 GoodsDetail.jsp；找不到價格時回傳 None"""
+    if not html.strip():
+        return None
+    tree = lxml.html.fromstring(html)
+    price = _parse_price(
+        _first_text(tree, "//meta[@property='product:price:amount']/@content")
+        or _first_text(tree, f"//*[{_has_class('goodsPrice')}]//*[{_has_class('price')}]//b")
+    )
+    if price is None:
+        return None
+    original_price = _parse_price(
+        _first_text(tree, f"//*[{_has_class('goodsPrice')}]//*[{_has_class('originalPrice')}]")
+    )
+    availability = _first_text(tree, "//meta[@property='product:availability']/@content")
+    if availability is not None:
+        in_stock = "out" not in availability.lower()
+    else:
+        in_stock = bool(tree.xpath(f"//*[{_has_class('addBtnArea')}]"))
+    return PriceSnapshot(price=price, original_price=original_price, in_stock=in_stock)
+
+
+def _search_api_body(keyword: str) -> Dict[str, Any]:
+    return {
+        "host": "momoshop",
+        "flag": "searchEngine",
+        "data": {"searchValue": keyword, "curPage": "1", "searchType": "1", "cateLevel": "-1"},
+    }
+
+
+def _absolute_url(url: str) -> str:
+    if url.startswith("//"):
+        return "https:" + url
+    if url.startswith("/"):
+        return MOMO_BASE_URL + url
+    return url
+
+
+def _product_id_from_url(url: str) -> str:
+    m = re.search(r"i_code=(\d+)", url)
+    return m.group(1) if m else url
+
+
+def _parse_search_items(raw: List[Dict[str, Any]]) -> List[ProductResult]:
+    """SEARCH_EXTRACT_JS 回傳的商品列表"""
+    results = []
+    for item in raw:
+        if not item.get("name") or not item.get("price") or not item.get("url"):
+            continue
+        url = _absolute_url(item["url"])
+        results.append(
+            ProductResult(
+                platform=AsyncMomoTracker.platform,
+                product_id=_product_id_from_url(url),
+                name=item["name"].strip(),
+                url=url,
+                price=_parse_price(item["price"]) or 0,
+            )
+        )
+    return results
+
+
+def _parse_search_xhr(payload: Any) -> List[ProductResult]:
+    """搜尋 XHR 回傳的 JSON（rtnSearchData.goodsInfoList）"""
+    if not isinstance(payload, dict):
+        return []
+    goods = (payload.get("rtnSearchData") or {}).get("goodsInfoList") or []
+    results = []
+    for item in goods[:SEARCH_LIMIT]:
+        product_id = str(item.get("goodsCode") or "")
+        name = item.get("goodsName")
+        price = _parse_price(item.get("goodsPrice"))
+        if not product_id or not name or price is None:
+            continue
+        results.append(
+            ProductResult(
+                platform=AsyncMomoTracker.platform,
+                product_id=product_id,
+                name=name.strip(),
+                url=GOODS_URL.format(product_id=product_id),
+                price=price,
+                original_price=_parse_price(item.get("goodsPriceOri")),
+                image_url=item.get("imgUrl"),
+            )
         )
-        page = context.new_page()
-        Stealth().apply_stealth_sync(page)
-        return browser, page
+    return results
+
+
+def _parse_price_snapshot(raw: Dict[str, Any]) -> Optional[PriceSnapshot]:
+    """PRICE_EXTRACT_JS 回傳的價格資訊"""
+    price = _parse_price(raw.get("price"))
+    if price is None:
+        return None
+    return PriceSnapshot(
+        price=price,
+        original_price=_parse_price(raw.get("original_price")),
+        in_stock=bool(raw.get("in_stock")),
+    )
+
+
+def _parse_flash_deal_items(raw: Dict[str, Any]) -> List[FlashDealResult]:
+    """FLASH_DEALS_EXTRACT_JS 回傳的場次與商品列表"""
+    start_at = end_at = None
+    for slot_text in raw.get("slots", []):
+        start_at, end_at = _parse_time_range(slot_text)
+        if start_at is not None:
+            break
+
+    results = []
+    for item in raw.get("items", []):
+        if not item.get("name") or not item.get("sale_price") or not item.get("url"):
+            continue
+        brand = (item.get("brand") or "").strip()
+        product_name = item["name"].strip()
+        sale_price = _parse_price(item["sale_price"]) or 0
+        original_price = _parse_price(item.get("original_price"))
+        results.append(
+            FlashDealResult(
+                platform=AsyncMomoTracker.platform,
+                product_name=f"{brand} {product_name}".strip() if brand else product_name,
+                product_url=_absolute_url(item["url"]),
+                sale_price=sale_price,
+                original_price=original_price,
+                discount_rate=_calculate_discount_rate(sale_price, original_price or 0),
+                start_at=start_at,
+                end_at=end_at,
+            )
+        )
+    return results
+
+
+class AsyncMomoTracker(AsyncBaseTracker):
+    platform = "momo"
+
+    def __init__(
+        self,
+        session: Optional[BrowserSession] = None,
+        mode: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        # 未注入 session 時於第一次使用才啟動瀏覽器，並由本 tracker 負責關閉
+        self._session = session
+        self._owns_session = session is None
+        self.mode = _check_mode(mode or get_settings().momo_fetch_mode)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # 各請求實際由哪條路徑取得結果；fallbacks 為 HTTP 被擋後改用瀏覽器的次數
+        self.served = {
+            "search": {"http": 0, "xhr": 0, "dom": 0},
+            "price": {"http": 0, "browser": 0},
+        }
+        self.fallbacks = 0
+
+    @property
+    def session(self) -> BrowserSession:
+        if self._session is None:
+            self._session = BrowserSession()
+        return self._session
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # 第一次使用時才建立，讓 client 與 semaphore 綁定在實際執行的 event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=10,
+                headers=HEADERS,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=HTTP_MAX_CONCURRENCY),
+                transport=self._transport,
+            )
+            self._semaphore = asyncio.Semaphore(HTTP_MAX_CONCURRENCY)
+        return self._client
+
+    async def aclose(self) -> None:
+        # client 與 semaphore 綁定目前的 event loop，關閉後清除，下次使用時重建
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+        if self._session is not None and self._owns_session:
+            await self._session.aclose()
+            self._session = None
+
+    def stats(self) -> Dict[str, Any]:
+        # 尚未啟動瀏覽器時不為了查狀態而啟動
+        session = self._session
+        browser = {"connected": False, "launch_count": 0} if session is None else session.stats()
+        return {
+            **browser,
+            "mode": self.mode,
+            "served": {op: dict(counts) for op, counts in self.served.items()},
+            "fallbacks": self.fallbacks,
+        }
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        client = self.client
+        async with self._semaphore:
+            resp = await client.request(method, url, **kwargs)
+        if resp.status_code in BLOCKED_STATUSES:
+            raise MomoBlockedError(f"HTTP {resp.status_code} from {url}")
+        resp.raise_for_status()
+        return resp
+
+    async def search_products(
+        self, keyword: str, mode: Optional[str] = None
+    ) -> List[ProductResult]:
+        mode = _check_mode(mode or self.mode)
+        if mode != "browser":
+            try:
+                results = await self._search_http(keyword)
+                self._record("search", "http")
+                return results
+            except MomoBlockedError as e:
+                if mode == "http":
+                    logger.warning(f"Momo HTTP search blocked: {e}")
+                    return []
+                self.fallbacks += 1
+                logger.info(f"Momo HTTP search blocked, falling back to browser: {e}")
+            except Exception as e:
+                logger.error(f"Momo search failed: {e}")
+                return []
 
-    def search_products(self, keyword: str) -> List[ProductResult]:
-        results = []
         try:
-            with sync_playwright() as p:
-                browser, page = self._get_browser_page(p)
-                page.goto(SEARCH_URL.format(keyword=keyword), timeout=30000)
-                page.wait_for_selector(".prdListArea", timeout=15000)
-
-                items = page.query_selector_all(".prdListArea .li_column")
-                for item in items[:10]:
-                    name_el = item.query_selector(".prdName")
-                    price_el = item.query_selector(".price b")
-                    url_el = item.query_selector("a")
-
-                    if not name_el or not price_el or not url_el:
-                        continue
-
-                    name = name_el.inner_text().strip()
-                    price = _parse_price(price_el.inner_text()) or 0
-                    url = url_el.get_attribute("href") or ""
-                    if url.startswith("/"):
-                        url = "https://www.momoshop.com.tw" + url
-
-                    m = re.search(r"i_code=(\d+)", url)
-                    product_id = m.group(1) if m else url
-
-                    results.append(
-                        ProductResult(
-                            platform=self.platform,
-                            product_id=product_id,
-                            name=name,
-                            url=url,
-                            price=price,
-                        )
-                    )
-                browser.close()
+            return await self.session.run(lambda page: self._search_on_page(page, keyword))
         except Exception as e:
             logger.error(f"Momo search failed: {e}")
-        return results
+            return []
 
-    def fetch_product_by_url(self, url: str) -> Optional[ProductResult]:
-        snapshot = self.fetch_price(url)
+    async def _search_http(self, keyword: str) -> List[ProductResult]:
+        resp = await self._request("POST", SEARCH_API_URL, json=_search_api_body(keyword))
+        try:
+            payload = resp.json()
+        except ValueError as e:
+            raise MomoBlockedError("search API returned non-JSON response") from e
+        if not isinstance(payload, dict) or "rtnSearchData" not in payload:
+            raise MomoBlockedError("search API response has no rtnSearchData")
+        return _parse_search_xhr(payload)
+
+    async def _search_on_page(self, page, keyword: str) -> List[ProductResult]:
+        captured: asyncio.Future = asyncio.get_running_loop().create_future()
+
+        async def on_response(response) -> None:
+            if captured.done() or not SEARCH_XHR_RE.search(response.url):
+                return
+            try:
+                results = _parse_search_xhr(await response.json())
+            except Exception:
+                return
+            if results and not captured.done():
+                captured.set_result(results)
+
+        # page 會放回池中重複使用，離開前一定要移除 listener
+        page.on("response", on_response)
+        try:
+            await page.goto(SEARCH_URL.format(keyword=keyword), timeout=30000)
+            try:
+                results = await asyncio.wait_for(
+                    asyncio.shield(captured), timeout=XHR_WAIT_SECONDS
+                )
+                self._record("search", "xhr")
+                return results
+            except asyncio.TimeoutError:
+                pass
+
+            await page.wait_for_selector(".prdListArea", timeout=15000)
+            raw = await page.evaluate(SEARCH_EXTRACT_JS, SEARCH_LIMIT)
+            self._record("search", "dom")
+            return _parse_search_items(raw)
+        finally:
+            page.remove_listener("response", on_response)
+
+    async def fetch_product_by_url(self, url: str) -> Optional[ProductResult]:
+        snapshot = await self.fetch_price(url)
         if snapshot is None:
             return None
-        m = re.search(r"i_code=(\d+)", url)
-        product_id = m.group(1) if m else url
         return ProductResult(
             platform=self.platform,
-            product_id=product_id,
+            product_id=_product_id_from_url(url),
             name="",
             url=url,
             price=snapshot.price,
             original_price=snapshot.original_price,
         )
 
-    def fetch_price(self, product_id: str) -> Optional[PriceSnapshot]:
+    async def fetch_price(
+        self, product_id: str, mode: Optional[str] = None
+    ) -> Optional[PriceSnapshot]:
+        mode = _check_mode(mode or self.mode)
         url = (
             product_id
             if product_id.startswith("http")
-            else f"https://www.momoshop.com.tw/goods/GoodsDetail.jsp?i_code={product_id}"
+            else GOODS_URL.format(product_id=product_id)
         )
-        try:
-            with sync_playwright() as p:
-                browser, page = self._get_browser_page(p)
-                page.goto(url, timeout=30000)
-                page.wait_for_selector(".goodsPrice", timeout=15000)
-
-                price_el = page.query_selector(".goodsPrice .price b")
-                orig_el = page.query_selector(".goodsPrice .originalPrice")
-                stock_el = page.query_selector(".addBtnArea")
-
-                price = _parse_price(price_el.inner_text()) if price_el else None
-                original_price = _parse_price(orig_el.inner_text()) if orig_el else None
-                in_stock = stock_el is not None
-
-                browser.close()
-
-                if price is None:
+        if mode != "browser":
+            try:
+                snapshot = await self._price_http(url)
+                self._record("price", "http")
+                return snapshot
+            except MomoBlockedError as e:
+                if mode == "http":
+                    logger.warning(f"Momo HTTP fetch_price blocked for {product_id}: {e}")
                     return None
-                return PriceSnapshot(
-                    price=price, original_price=original_price, in_stock=in_stock
-                )
+                self.fallbacks += 1
+                logger.info(f"Momo HTTP fetch_price blocked for {product_id}, using browser: {e}")
+            except Exception as e:
+                logger.error(f"Momo fetch_price failed for {product_id}: {e}")
+                return None
+
+        try:
+            return await self.session.run(lambda page: self._price_on_page(page, url))
         except Exception as e:
             logger.error(f"Momo fetch_price failed for {product_id}: {e}")
             return None
 
-    def fetch_flash_deals(self) -> List[FlashDealResult]:
-        results = []
+    async def _price_http(self, url: str) -> PriceSnapshot:
+        resp = await self._request("GET", url)
+        snapshot = _parse_goods_html(resp.text)
+        # 驗證頁或改版頁面同樣回 200，找不到價格時視為被擋
+        if snapshot is None:
+            raise MomoBlockedError(f"no price markup in {url}")
+        return snapshot
+
+    async def _price_on_page(self, page, url: str) -> Optional[PriceSnapshot]:
+        await page.goto(url, timeout=30000)
+        await page.wait_for_selector(".goodsPrice", timeout=15000)
+        snapshot = _parse_price_snapshot(await page.evaluate(PRICE_EXTRACT_JS))
+        self._record("price", "browser")
+        return snapshot
+
+    async def fetch_flash_deals(self) -> List[FlashDealResult]:
         try:
-            with sync_playwright() as p:
-                browser, page = self._get_browser_page(p)
-
-                # 從首頁動態取得當前限時搶購 EDM 連結
-                page.goto(MOMO_HOME_URL, timeout=30000)
-                page.wait_for_load_state("networkidle", timeout=15000)
-                flash_link = page.query_selector("a:has-text('限時搶購')")
-                if flash_link is None:
-                    logger.warning("Momo: 找不到限時搶購連結")
-                    browser.close()
-                    return []
-                flash_url = flash_link.get_attribute("href") or ""
-                if flash_url.startswith("//"):
-                    flash_url = "https:" + flash_url
-                elif flash_url.startswith("/"):
-                    flash_url = "https://www.momoshop.com.tw" + flash_url
-
-                page.goto(flash_url, timeout=30000)
-                page.wait_for_load_state("networkidle", timeout=20000)
-                page.wait_for_selector("li.box1", timeout=15000)
-
-                items = page.query_selector_all("li.box1")
-                for item in items[:30]:
-                    brand_el = item.query_selector(".brand")
-                    name_el = item.query_selector(".brand2")
-                    sale_el = item.query_selector(".price span")
-                    orig_el = item.query_selector(".oldPrice span")
-                    url_el = item.query_selector("a[id^='gdsHref']")
-
-                    if not name_el or not sale_el or not url_el:
-                        continue
-
-                    brand = brand_el.inner_text().strip() if brand_el else ""
-                    product_name = name_el.inner_text().strip()
-                    full_name = f"{brand} {product_name}".strip() if brand else product_name
-
-                    sale_price = _parse_price(sale_el.inner_text()) or 0
-                    original_price = _parse_price(orig_el.inner_text()) if orig_el else None
-                    discount_rate = _calculate_discount_rate(sale_price, original_price or 0)
-
-                    url = url_el.get_attribute("href") or ""
-                    if url.startswith("//"):
-                        url = "https:" + url
-                    elif url.startswith("/"):
-                        url = "https://www.momoshop.com.tw" + url
-
-                    results.append(
-                        FlashDealResult(
-                            platform=self.platform,
-                            product_name=full_name,
-                            product_url=url,
-                            sale_price=sale_price,
-                            original_price=original_price,
-                            discount_rate=discount_rate,
-                        )
-                    )
-                browser.close()
+            return await self.session.run(self._flash_deals_on_page)
         except Exception as e:
             logger.error(f"Momo fetch_flash_deals failed: {e}")
-        return results
+            return []
+
+    async def _flash_deals_on_page(self, page) -> List[FlashDealResult]:
+        # 從首頁動態取得當前限時搶購 EDM 連結
+        await page.goto(MOMO_HOME_URL, timeout=30000)
+        await page.wait_for_load_state("networkidle", timeout=15000)
+        flash_link = await page.query_selector("a:has-text('限時搶購')")
+        if flash_link is None:
+            logger.warning("Momo: 找不到限時搶購連結")
+            return []
+        flash_url = _absolute_url(await flash_link.get_attribute("href") or "")
+
+        await page.goto(flash_url, timeout=30000)
+        await page.wait_for_load_state("networkidle", timeout=20000)
+        await page.wait_for_selector("li.box1", timeout=15000)
+
+        raw = await page.evaluate(FLASH_DEALS_EXTRACT_JS, [FLASH_SLOT_SELECTOR, FLASH_DEAL_LIMIT])
+        return _parse_flash_deal_items(raw)
+
+    def _record(self, operation: str, path: str) -> None:
+        self.served[operation][path] += 1
+        logger.debug(f"Momo {operation} served via {path}")
+
+
+def _check_mode(mode: str) -> str:
+    if mode not in FETCH_MODES:
+        raise ValueError(f"Unknown Momo fetch mode: {mode}")
+    return mode
+
+
+class MomoTracker(SyncTrackerAdapter):
+    """AsyncMomoTracker 的同步介面（排程器使用）"""
+
+    platform = "momo"
+
+    def __init__(
+        self,
+        session: Optional[BrowserSession] = None,
+        mode: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        super().__init__(AsyncMomoTracker(session, mode, transport))
+
+    def search_products(self, keyword: str, mode: Optional[str] = None) -> List[ProductResult]:
+        return self.run(self.tracker.search_products(keyword, mode))
+
+    def fetch_price(self, product_id: str, mode: Optional[str] = None) -> Optional[PriceSnapshot]:
+        return self.run(self.tracker.fetch_price(product_id, mode))
@@ -1,54 +1,206 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import asyncio
+import importlib.util
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
 
 import httpx
 from loguru import logger
 
-from src.trackers.base import BaseTracker, FlashDealResult, PriceSnapshot, ProductResult
+from src.config import get_settings
+from src.trackers.adapter import SyncTrackerAdapter
+from src.trackers.base import (
+    AsyncBaseTracker,
+    FlashDealResult,
+    PriceSnapshot,
+    ProductResult,
+    taipei_to_utc,
+)
 
 SEARCH_URL = "https://ecshweb.pchome.com.tw/search/v3.3/"
 PRODUCT_URL = "https://ecapi.pchome.com.tw/ecshop/prodapi/v2/prod/{product_id}"
+# 多商品查詢端點：id 以逗號分隔，回傳陣列（Id 可能帶有 -000 規格後綴）
+BATCH_PRODUCT_URL = (
+    "https://ecapi.pchome.com.tw/ecshop/prodapi/v2/prod/button"
+    "&id={product_ids}&fields=Id,Price,Qty,ButtonType"
+)
 FLASH_DEALS_URL = "https://ecapi-cdn.pchome.com.tw/fsapi/cms/onsale"
 BASE_PRODUCT_URL = "https://24h.pchome.com.tw/prod/{product_id}"
 
+BATCH_SIZE = 20
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+# HTTP/2 需要 h2 套件（httpx[http2]），未安裝時退回 HTTP/1.1
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _parse_product(data: Dict[str, Any]) -> PriceSnapshot:
+    price_data = data.get("Price", {})
+    return PriceSnapshot(
+        price=price_data.get("M", 0),
+        original_price=price_data.get("P"),
+        in_stock=bool(data.get("Stock", True)),
+    )
+
+
+def _parse_batch_entry(entry: Dict[str, Any]) -> PriceSnapshot:
+    price_data = entry.get("Price", {})
+    in_stock = entry.get("ButtonType", "ForSale") != "SoldOut" and entry.get("Qty", 1) != 0
+    return PriceSnapshot(
+        price=price_data.get("M", 0),
+        original_price=price_data.get("P"),
+        in_stock=in_stock,
+    )
+
+
+def _parse_slot(slot: Optional[str]) -> Optional[datetime]:
+    """限時特賣時段代碼（台灣時間 YYYYMMDDHHMM）轉為 naive UTC"""
+    try:
+        return taipei_to_utc(datetime.strptime(slot or "", "%Y%m%d%H%M"))
+    except ValueError:
+        return None
+
+
+def _sale_day_end(slot: Optional[str]) -> Optional[datetime]:
+    """時段所在特賣日（台灣時間）結束的時間，轉為 naive UTC"""
+    try:
+        day = datetime.strptime((slot or "")[:8], "%Y%m%d")
+    except ValueError:
+        return None
+    return taipei_to_utc(day + timedelta(days=1))
+
+
+def _parse_search(data: Dict[str, Any]) -> List[ProductResult]:
+    results = []
+    for prod in data.get("prods", []):
+        price_data = prod.get("Price", {})
+        product_id = prod.get("Id", "")
+        results.append(
+            ProductResult(
+                platform=PChomeTracker.platform,
+                product_id=product_id,
+                name=prod.get("Name", ""),
+                url=BASE_PRODUCT_URL.format(product_id=product_id),
+                price=price_data.get("M", 0),
+                original_price=price_data.get("P"),
+            )
+        )
+    return results
+
+
+def _parse_flash_deals(data: Dict[str, Any]) -> List[FlashDealResult]:
+    # 取出目前進行中（status='now'）的時段商品；結束時間為下一個時段的開始，
+    # 當天最後一個時段則到特賣日結束為止
+    slots = data.get("data", [])
+    items: list = []
+    start_at = end_at = None
+    for i, slot in enumerate(slots):
+        if slot.get("status") == "now":
+            items = slot.get("products", [])
+            start_at = _parse_slot(slot.get("slot"))
+            if i + 1 < len(slots):
+                end_at = _parse_slot(slots[i + 1].get("slot"))
+            else:
+                end_at = _sale_day_end(slot.get("slot"))
+            break
+
+    results = []
+    for item in items:
+        price_data = item.get("price", {})
+        sale_price = price_data.get("onsale", 0)
+        original_price = price_data.get("origin")
+        discount_rate = (
+            round(sale_price / original_price, 3)
+            if original_price and original_price > 0
+            else None
+        )
+        results.append(
+            FlashDealResult(
+                platform=PChomeTracker.platform,
+                product_name=item.get("name", ""),
+                product_url=item.get("url", ""),
+                sale_price=sale_price,
+                original_price=original_price,
+                discount_rate=discount_rate,
+                start_at=start_at,
+                end_at=end_at,
+            )
+        )
+    return results
+
+
+class AsyncPChomeTracker(AsyncBaseTracker):
+    """PChome 24h tracker，所有請求共用一個 httpx.AsyncClient（連線池、HTTP/2）"""
 
-class PChomeTracker(BaseTracker):
     platform = "pchome"
 
-    def __init__(self):
-        self.client = httpx.Client(timeout=10, headers={"User-Agent": "Mozilla/5.0"})
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.max_concurrency = max_concurrency or get_settings().pchome_max_concurrency
+        self.request_count = 0
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # 第一次使用時才建立，讓 client 與 semaphore 綁定在實際執行的 event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=10,
+                headers=HEADERS,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=self.max_concurrency),
+                event_hooks={"request": [self._count_request]},
+                transport=self._transport,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def aclose(self) -> None:
+        # client 與 semaphore 綁定目前的 event loop，關閉後清除，下次使用時重建
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
 
-    def search_products(self, keyword: str) -> List[ProductResult]:
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.request_count,
+            "max_concurrency": self.max_concurrency,
+            "http2": HTTP2_AVAILABLE,
+            "closed": self._client is None or self._client.is_closed,
+        }
+
+    async def _count_request(self, request: httpx.Request) -> None:
+        # event hook 只在單一 event loop 上執行，不需要鎖
+        self.request_count += 1
+
+    async def _get_json(self, url: str, **kwargs) -> Any:
+        client = self.client
+        async with self._semaphore:
+            resp = await client.get(url, **kwargs)
+        resp.raise_for_status()
+        return resp.json()
+
+    async def search_products(self, keyword: str) -> List[ProductResult]:
         try:
-            resp = self.client.get(
+            data = await self._get_json(
                 SEARCH_URL, params={"q": keyword, "page": 1, "sort": "rnk/dc"}
             )
-            resp.raise_for_status()
-            data = resp.json()
         except Exception as e:
             logger.error(f"PChome search failed: {e}")
             return []
+        return _parse_search(data)
 
-        results = []
-        for prod in data.get("prods", []):
-            price_data = prod.get("Price", {})
-            product_id = prod.get("Id", "")
-            results.append(
-                ProductResult(
-                    platform=self.platform,
-                    product_id=product_id,
-                    name=prod.get("Name", ""),
-                    url=BASE_PRODUCT_URL.format(product_id=product_id),
-                    price=price_data.get("M", 0),
-                    original_price=price_data.get("P"),
-                )
-            )
-        return results
-
-    def fetch_product_by_url(self, url: str) -> Optional[ProductResult]:
+    async def fetch_product_by_url(self, url: str) -> Optional[ProductResult]:
         product_id = url.rstrip("/").split("/")[-1]
-        snapshot = self.fetch_price(product_id)
+        snapshot = await self.fetch_price(product_id)
         if snapshot is None:
             return None
         return ProductResult(
@@ -60,57 +212,72 @@ class PChomeTracker(BaseTracker):
             original_price=snapshot.original_price,
         )
 
-    def fetch_price(self, product_id: str) -> Optional[PriceSnapshot]:
+    async def fetch_price(self, product_id: str) -> Optional[PriceSnapshot]:
         try:
-            resp = self.client.get(PRODUCT_URL.format(product_id=product_id))
-            resp.raise_for_status()
-            data = resp.json()
+            data = await self._get_json(PRODUCT_URL.format(product_id=product_id))
         except Exception as e:
             logger.error(f"PChome fetch_price failed for {product_id}: {e}")
             return None
+        return _parse_product(data)
 
-        price_data = data.get("Price", {})
-        return PriceSnapshot(
-            price=price_data.get("M", 0),
-            original_price=price_data.get("P"),
-            in_stock=bool(data.get("Stock", True)),
-        )
+    async def fetch_prices(self, product_ids: List[str]) -> Dict[str, Optional[PriceSnapshot]]:
+        """批次取得多個商品價格。
+
+        先以多商品端點每次查詢 BATCH_SIZE 個 id，未回傳的商品再以單品端點補抓；
+        同時進行的請求數以 max_concurrency 限制。
+        """
+        unique_ids = list(dict.fromkeys(product_ids))
+        if not unique_ids:
+            return {}
+
+        chunks = [unique_ids[i : i + BATCH_SIZE] for i in range(0, len(unique_ids), BATCH_SIZE)]
+        results: Dict[str, Optional[PriceSnapshot]] = {}
+        for batch in await asyncio.gather(*(self._fetch_batch(chunk) for chunk in chunks)):
+            results.update(batch)
 
-    def fetch_flash_deals(self) -> List[FlashDealResult]:
+        missing = [pid for pid in unique_ids if pid not in results]
+        if missing:
+            logger.debug(f"PChome batch missed {len(missing)} products, fetching singly")
+            singles = await asyncio.gather(*(self.fetch_price(pid) for pid in missing))
+            results.update(zip(missing, singles))
+        return results
+
+    async def _fetch_batch(self, product_ids: List[str]) -> Dict[str, PriceSnapshot]:
+        url = BATCH_PRODUCT_URL.format(product_ids=",".join(product_ids))
         try:
-            resp = self.client.get(FLASH_DEALS_URL)
-            resp.raise_for_status()
-            data = resp.json()
+            entries = await self._get_json(url)
+        except Exception as e:
+            logger.warning(f"PChome batch fetch failed for {len(product_ids)} products: {e}")
+            return {}
+
+        by_id = {}
+        for entry in entries if isinstance(entries, list) else []:
+            entry_id = entry.get("Id", "")
+            # 多商品端點回傳的 Id 帶規格後綴（如 -000），還原為原始商品 id
+            by_id[re.sub(r"-\d{3}$", "", entry_id)] = entry
+            by_id[entry_id] = entry
+
+        return {
+            pid: _parse_batch_entry(by_id[pid]) for pid in product_ids if pid in by_id
+        }
+
+    async def fetch_flash_deals(self) -> List[FlashDealResult]:
+        try:
+            data = await self._get_json(FLASH_DEALS_URL)
         except Exception as e:
             logger.error(f"PChome fetch_flash_deals failed: {e}")
             return []
+        return _parse_flash_deals(data)
 
-        # 取出目前進行中（status='now'）的時段商品
-        slots = data.get("data", [])
-        items: list = []
-        for slot in slots:
-            if slot.get("status") == "now":
-                items = slot.get("products", [])
-                break
-
-        results = []
-        for item in items:
-            price_data = item.get("price", {})
-            sale_price = price_data.get("onsale", 0)
-            original_price = price_data.get("origin")
-            discount_rate = (
-                round(sale_price / original_price, 3)
-                if original_price and original_price > 0
-                else None
-            )
-            results.append(
-                FlashDealResult(
-                    platform=self.platform,
-                    product_name=item.get("name", ""),
-                    product_url=item.get("url", ""),
-                    sale_price=sale_price,
-                    original_price=original_price,
-                    discount_rate=discount_rate,
-                )
-            )
-        return results
+
+class PChomeTracker(SyncTrackerAdapter):
+    """AsyncPChomeTracker 的同步介面（排程器使用）"""
+
+    platform = "pchome"
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        super().__init__(AsyncPChomeTracker(max_concurrency, transport))
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.orm import Session
+
+from src.models.flash_deal import FlashDeal
+from src.models.price_history import PriceHistory
+from src.models.tracked_product import TrackedProduct
+from src.trackers.flash_deals import active_deal_clause
+from src.trackers.utils import IN_CHUNK_SIZE, utcnow
+
+MIN_INTERVAL = timedelta(minutes=5)
+DEFAULT_INTERVAL = timedelta(minutes=30)
+MAX_INTERVAL = timedelta(hours=6)
+
+# 以最近 7 天的價格變動次數估計波動度；追蹤未滿 1 天的商品沿用預設間隔
+VOLATILITY_WINDOW = timedelta(days=7)
+MIN_OBSERVATION_DAYS = 1.0
+
+# 現價高於目標價不到 5% 時加密輪詢
+NEAR_TARGET_RATIO = 0.05
+NEAR_TARGET_INTERVAL = timedelta(minutes=15)
+
+
+def compute_poll_interval(
+    changes: int,
+    observed_days: float,
+    current_price: Optional[int] = None,
+    target_price: Optional[int] = None,
+    in_flash_deal: bool = False,
+) -> timedelta:
+    """依價格變動頻率、與目標價距離及是否在特賣中決定下次輪詢間隔"""
+    if in_flash_deal:
+        return MIN_INTERVAL
+
+    if observed_days < MIN_OBSERVATION_DAYS:
+        interval = DEFAULT_INTERVAL
+    else:
+        changes_per_day = changes / observed_days
+        if changes_per_day >= 1:
+            interval = timedelta(minutes=15)
+        elif changes_per_day >= 2 / 7:
+            interval = timedelta(minutes=30)
+        elif changes > 0:
+            interval = timedelta(hours=2)
+        else:
+            interval = MAX_INTERVAL
+
+    if (
+        current_price is not None
+        and target_price is not None
+        and target_price < current_price <= target_price * (1 + NEAR_TARGET_RATIO)
+    ):
+        interval = min(interval, NEAR_TARGET_INTERVAL)
+
+    return max(MIN_INTERVAL, min(interval, MAX_INTERVAL))
+
+
+def get_due_products(session: Session, now: Optional[datetime] = None) -> List[TrackedProduct]:
+    """取出 next_check_at 已到期（或從未檢查過）的 active 商品"""
+    now = now or utcnow()
+    return (
+        session.query(TrackedProduct)
+        .filter(
+            TrackedProduct.is_active == True,  # noqa: E712
+            or_(TrackedProduct.next_check_at.is_(None), TrackedProduct.next_check_at <= now),
+        )
+        .all()
+    )
+
+
+def active_flash_deal_urls(session: Session, now: Optional[datetime] = None) -> Set[str]:
+    now = now or utcnow()
+    rows = session.execute(select(FlashDeal.product_url).where(active_deal_clause(now)))
+    return {url for (url,) in rows}
+
+
+def count_price_changes(
+    session: Session, product_ids: List[int], since: datetime
+) -> Dict[int, int]:
+    """以 window function 在資料庫端計算各商品自 since 起的價格變動次數"""
+    changes: Dict[int, int] = {}
+    for i in range(0, len(product_ids), IN_CHUNK_SIZE):
+        chunk = product_ids[i : i + IN_CHUNK_SIZE]
+        prev_price = func.lag(PriceHistory.price).over(
+            partition_by=PriceHistory.product_id,
+            order_by=(PriceHistory.snapshot_at, PriceHistory.id),
+        )
+        history = (
+            select(
+                PriceHistory.product_id,
+                PriceHistory.price,
+                prev_price.label("prev_price"),
+            )
+            .where(PriceHistory.product_id.in_(chunk), PriceHistory.snapshot_at >= since)
+            .subquery()
+        )
+        rows = session.execute(
+            select(
+                history.c.product_id,
+                func.sum(case((history.c.price != history.c.prev_price, 1), else_=0)),
+            ).group_by(history.c.product_id)
+        )
+        changes.update({product_id: int(count or 0) for product_id, count in rows})
+    return changes
+
+
+def schedule_next_checks(
+    session: Session,
+    products: List[Tuple[TrackedProduct, Optional[int]]],
+    now: Optional[datetime] = None,
+) -> None:
+    """為本輪檢查過的商品計算輪詢間隔並寫入 next_check_at（不 commit）
+
+    Args:
+        products: (商品, 本輪抓到的價格；抓取失敗為 None)。
+    """
+    if not products:
+        return
+    now = now or utcnow()
+
+    changes = count_price_changes(
+        session, [product.id for product, _ in products], now - VOLATILITY_WINDOW
+    )
+    flash_urls = active_flash_deal_urls(session, now)
+    window_days = VOLATILITY_WINDOW.total_seconds() / 86400
+
+    for product, current_price in products:
+        age_days = (now - product.created_at).total_seconds() / 86400 if product.created_at else 0
+        interval = compute_poll_interval(
+            changes=changes.get(product.id, 0),
+            observed_days=min(age_days, window_days),
+            current_price=current_price,
+            target_price=product.target_price,
+            in_flash_deal=product.url in flash_urls,
+        )
+        product.poll_interval_minutes = int(interval.total_seconds() // 60)
+        product.next_check_at = now + interval
+
+    session.flush()
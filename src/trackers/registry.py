@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from src.trackers.base import BaseTracker
+
+
+def _create_pchome() -> BaseTracker:
+    from src.trackers.platforms.pchome import PChomeTracker
+
+    return PChomeTracker()
+
+
+def _create_momo() -> BaseTracker:
+    from src.trackers.platforms.momo import MomoTracker
+
+    return MomoTracker()
+
+
+DEFAULT_FACTORIES: Dict[str, Callable[[], BaseTracker]] = {
+    "pchome": _create_pchome,
+    "momo": _create_momo,
+}
+
+
+class TrackerRegistry:
+    """Process 層級的 tracker 實例表。
+
+    每個平台只建立一個 tracker，並在 API 與排程器的各執行緒間共用，
+    讓 httpx 連線池與 Momo 瀏覽器工作階段得以重複使用。
+    取得的 tracker 由 registry 管理生命週期，呼叫端不應自行 close()。
+    """
+
+    def __init__(self, factories: Optional[Dict[str, Callable[[], BaseTracker]]] = None):
+        self._factories = factories if factories is not None else DEFAULT_FACTORIES
+        self._trackers: Dict[str, BaseTracker] = {}
+        self._hits: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def platforms(self) -> List[str]:
+        """可建立 tracker 的平台（不論是否已建立）"""
+        return list(self._factories)
+
+    def get(self, platform: str) -> Optional[BaseTracker]:
+        with self._lock:
+            tracker = self._trackers.get(platform)
+            if tracker is None:
+                factory = self._factories.get(platform)
+                if factory is None:
+                    return None
+                tracker = factory()
+                self._trackers[platform] = tracker
+                logger.info(f"Tracker created for {platform}")
+            self._hits[platform] += 1
+            return tracker
+
+    def close_all(self) -> None:
+        with self._lock:
+            trackers, self._trackers = self._trackers, {}
+        for platform, tracker in trackers.items():
+            try:
+                tracker.close()
+                logger.info(f"Tracker closed for {platform}")
+            except Exception as e:
+                logger.error(f"Error closing tracker for {platform}: {e}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            trackers = dict(self._trackers)
+            hits = dict(self._hits)
+        return {
+            platform: {"hits": hits.get(platform, 0), **tracker.stats()}
+            for platform, tracker in trackers.items()
+        }
+
+
+tracker_registry = TrackerRegistry()
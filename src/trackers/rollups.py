@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import case, delete, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from src.models.price_history import PriceHistory
+from src.models.price_rollup import PriceRollup
+from src.trackers.history import PricePoint
+
+GRAINS: Dict[str, timedelta] = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+_BACKFILL_BATCH_SIZE = 5000
+
+
+def bucket_start(at: datetime, grain: str) -> datetime:
+    if grain == "hour":
+        return at.replace(minute=0, second=0, microsecond=0)
+    return at.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def choose_grain(span: timedelta, max_points: Optional[int] = None) -> Optional[str]:
+    """回傳仍滿足所需解析度的最粗 grain；需要原始資料時回傳 None
+
+    圖表以 span / max_points 作為每點的時間解析度；統計查詢則以整段 span 判斷。
+    """
+    resolution = span / max_points if max_points else span
+    for grain in ("day", "hour"):
+        if resolution >= GRAINS[grain]:
+            return grain
+    return None
+
+
+def update_rollups(session: Session, observations: List[Tuple[int, int, datetime]]) -> None:
+    """將 (product_id, price, observed_at) 觀測值併入各 grain 的 bucket（單一 upsert 語句）"""
+    if not observations:
+        return
+
+    rows = [
+        {
+            "product_id": product_id,
+            "grain": grain,
+            "bucket_start": bucket_start(observed_at, grain),
+            "min_price": price,
+            "max_price": price,
+            "price_sum": price,
+            "sample_count": 1,
+            "last_price": price,
+            "last_at": observed_at,
+        }
+        for product_id, price, observed_at in observations
+        for grain in GRAINS
+    ]
+
+    table = PriceRollup.__table__
+    stmt = sqlite_insert(table)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["product_id", "grain", "bucket_start"],
+        set_={
+            "min_price": func.min(table.c.min_price, excluded.min_price),
+            "max_price": func.max(table.c.max_price, excluded.max_price),
+            "price_sum": table.c.price_sum + excluded.price_sum,
+            "sample_count": table.c.sample_count + excluded.sample_count,
+            "last_price": case(
+                (excluded.last_at >= table.c.last_at, excluded.last_price),
+                else_=table.c.last_price,
+            ),
+            "last_at": func.max(table.c.last_at, excluded.last_at),
+        },
+    )
+    session.execute(stmt, rows)
+
+
+def backfill_rollups(session: Session) -> int:
+    """由既有 price_history 重建所有 rollup，回傳處理的觀測值數量"""
+    session.execute(delete(PriceRollup))
+
+    count = 0
+    batch: List[Tuple[int, int, datetime]] = []
+    rows = session.execute(
+        select(
+            PriceHistory.product_id,
+            PriceHistory.price,
+            PriceHistory.snapshot_at,
+            PriceHistory.last_seen_at,
+        ).execution_options(yield_per=_BACKFILL_BATCH_SIZE)
+    )
+    for product_id, price, snapshot_at, last_seen_at in rows:
+        batch.append((product_id, price, snapshot_at))
+        # 變動才寫入模式下，last_seen_at 代表同價格的最後一次觀測
+        if last_seen_at is not None and last_seen_at > snapshot_at:
+            batch.append((product_id, price, last_seen_at))
+        if len(batch) >= _BACKFILL_BATCH_SIZE:
+            update_rollups(session, batch)
+            count += len(batch)
+            batch = []
+    update_rollups(session, batch)
+    count += len(batch)
+
+    session.commit()
+    logger.info(f"Backfilled price rollups from {count} observations")
+    return count
+
+
+def rollup_query(
+    product_id: int,
+    grain: str,
+    start: datetime,
+    end: Optional[datetime] = None,
+    include_partial: bool = True,
+):
+    """指定範圍內某 grain 的 rollup 查詢（sync / async session 共用）
+
+    bucket 以 UTC 切分。include_partial 為 False 時不含起點之前開始的 bucket，
+    統計結果不會超出所要求的範圍。
+    """
+    first = bucket_start(start, grain) if include_partial else start
+    stmt = (
+        select(PriceRollup)
+        .where(
+            PriceRollup.product_id == product_id,
+            PriceRollup.grain == grain,
+            PriceRollup.bucket_start >= first,
+        )
+        .order_by(PriceRollup.bucket_start.asc())
+    )
+    if end is not None:
+        stmt = stmt.where(PriceRollup.bucket_start <= end)
+    return stmt
+
+
+def first_rollup_query(product_id: int):
+    """商品最早的 rollup bucket 起點；未指定起點時用來估算資料跨度"""
+    return select(func.min(PriceRollup.bucket_start)).where(
+        PriceRollup.product_id == product_id, PriceRollup.grain == "hour"
+    )
+
+
+def rollup_points(rollups: List[PriceRollup]) -> List[PricePoint]:
+    """將 rollup 轉為圖表用的點：每個 bucket 的最低價（置於 bucket 起點）與最後價格
+
+    只取最後價格會讓 bucket 內回升的短暫低價（例如限時特賣）從圖上消失。
+    """
+    points: List[PricePoint] = []
+    for r in rollups:
+        if r.min_price != r.last_price:
+            points.append(PricePoint(price=r.min_price, snapshot_at=r.bucket_start))
+        points.append(PricePoint(price=r.last_price, snapshot_at=max(r.last_at, r.bucket_start)))
+    return points
+
+
+def summarize_rollups(rollups: List[PriceRollup]) -> Dict[str, Optional[float]]:
+    """彙總多個 bucket 的最低／最高／平均／最新價"""
+    if not rollups:
+        return {"min_price": None, "max_price": None, "avg_price": None, "last_price": None}
+    samples = sum(r.sample_count for r in rollups)
+    latest = max(rollups, key=lambda r: r.last_at)
+    return {
+        "min_price": min(r.min_price for r in rollups),
+        "max_price": max(r.max_price for r in rollups),
+        "avg_price": round(sum(r.price_sum for r in rollups) / samples, 2) if samples else None,
+        "last_price": latest.last_price,
+    }
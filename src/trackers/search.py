@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from loguru import logger
+
+from src.trackers.base import ProductResult
+from src.trackers.search_cache import normalize_keyword, search_cache
+from src.trackers.utils import get_async_tracker
+
+
+@dataclass
+class RankedProduct:
+    product: ProductResult
+    score: float
+    rank: int  # 在原平台搜尋結果中的名次
+
+
+@dataclass
+class MultiSearchResult:
+    items: List[RankedProduct]
+    # 各平台狀態：ok / timeout / error
+    platforms: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def partial(self) -> bool:
+        return any(status != "ok" for status in self.platforms.values())
+
+
+def _bigrams(text: str) -> Set[str]:
+    compact = text.replace(" ", "")
+    if len(compact) < 2:
+        return {compact} if compact else set()
+    return {compact[i : i + 2] for i in range(len(compact) - 1)}
+
+
+def relevance_score(query: str, title: str) -> float:
+    """以正規化後的標題計算與查詢的相關度（0 ~ 1.2）
+
+    關鍵字覆蓋率處理以空白分隔的查詢；字元 bigram 的 Dice 係數處理沒有空白的中文；
+    完整片語出現在標題中再額外加分。
+    """
+    q = normalize_keyword(query)
+    t = normalize_keyword(title)
+    if not q or not t:
+        return 0.0
+
+    tokens = q.split(" ")
+    coverage = sum(token in t for token in tokens) / len(tokens)
+    q_grams, t_grams = _bigrams(q), _bigrams(t)
+    dice = 2 * len(q_grams & t_grams) / (len(q_grams) + len(t_grams))
+    phrase = 0.2 if q in t else 0.0
+    return round(0.6 * coverage + 0.4 * dice + phrase, 3)
+
+
+def merge_results(query: str, results: Dict[str, List[ProductResult]]) -> List[RankedProduct]:
+    """合併各平台結果：相關度高者優先，同分時依原平台名次交錯排列"""
+    ranked = [
+        RankedProduct(product=product, score=relevance_score(query, product.name), rank=rank)
+        for products in results.values()
+        for rank, product in enumerate(products)
+    ]
+    ranked.sort(key=lambda r: (-r.score, r.rank, r.product.price))
+    return ranked
+
+
+async def search_all_platforms(
+    query: str, platforms: List[str], deadline: float
+) -> MultiSearchResult:
+    """同時搜尋所有平台，deadline 秒內未回應的平台以部分結果回傳
+
+    逾時的搜尋不會被取消（由 search_cache 繼續完成並寫入快取），下次查詢即可命中。
+    """
+    tasks: Dict[str, asyncio.Task] = {}
+    statuses: Dict[str, str] = {}
+    for platform in platforms:
+        tracker = get_async_tracker(platform)
+        if tracker is None:
+            statuses[platform] = "error"
+            continue
+        tasks[platform] = asyncio.ensure_future(search_cache.search(tracker, query))
+
+    if tasks:
+        await asyncio.wait(tasks.values(), timeout=deadline)
+
+    results: Dict[str, List[ProductResult]] = {}
+    for platform, task in tasks.items():
+        if not task.done():
+            statuses[platform] = "timeout"
+            # 只取消這個等待者；search_cache 內部以 shield 保護實際的搜尋
+            task.cancel()
+            continue
+        error: Optional[BaseException] = None if task.cancelled() else task.exception()
+        if task.cancelled() or error is not None:
+            logger.warning(f"Search on {platform} failed: {error}")
+            statuses[platform] = "error"
+            continue
+        statuses[platform] = "ok"
+        results[platform] = task.result()
+
+    return MultiSearchResult(items=merge_results(query, results), platforms=statuses)
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from src.config import get_settings
+from src.trackers.base import AsyncBaseTracker, ProductResult
+
+DEFAULT_MAX_ENTRIES = 512
+
+CacheKey = Tuple[str, str]
+
+
+def normalize_keyword(keyword: str) -> str:
+    """全形轉半形、忽略大小寫並合併空白，讓「ＳＯＮＹ  耳機」與「sony 耳機」共用快取"""
+    text = unicodedata.normalize("NFKC", keyword).casefold()
+    return re.sub(r"\s+", " ", text).strip()
+
+
+@dataclass
+class _Entry:
+    results: List[ProductResult]
+    fetched_at: float
+
+
+class SearchCache:
+    """(platform, 正規化關鍵字) 為 key 的搜尋結果快取
+
+    - 未超過 ttl：直接回傳快取。
+    - 超過 ttl 但未超過 ttl + stale_ttl：先回傳舊結果，背景重新搜尋（stale-while-revalidate）。
+    - 同一 key 同時只會有一個搜尋在進行，其餘請求等待同一個結果（single-flight）。
+    空結果與例外不寫入快取。
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        stale_ttl: Optional[float] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        settings = get_settings()
+        self.ttl = ttl if ttl is not None else settings.search_cache_ttl_seconds
+        self.stale_ttl = stale_ttl if stale_ttl is not None else settings.search_cache_stale_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._inflight: Dict[CacheKey, asyncio.Task] = {}
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "joined": 0, "errors": 0}
+
+    async def search(self, tracker: AsyncBaseTracker, keyword: str) -> List[ProductResult]:
+        key = (tracker.platform, normalize_keyword(keyword))
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            age = self._clock() - entry.fetched_at
+            if age < self.ttl:
+                self._counters["hits"] += 1
+                return entry.results
+            if age < self.ttl + self.stale_ttl:
+                self._counters["stale_hits"] += 1
+                if key not in self._inflight:
+                    self._start_fetch(key, tracker, keyword)
+                return entry.results
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._counters["joined"] += 1
+        else:
+            self._counters["misses"] += 1
+            task = self._start_fetch(key, tracker, keyword)
+        # shield：某個等待中的請求被取消時，不影響其他共用同一搜尋的請求
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "entries": len(self._entries), "inflight": len(self._inflight)}
+
+    def _start_fetch(self, key: CacheKey, tracker: AsyncBaseTracker, keyword: str) -> asyncio.Task:
+        task = asyncio.ensure_future(self._fetch(key, tracker, keyword))
+        # 背景更新沒有人等待結果，先取出例外避免 "exception was never retrieved"
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        return task
+
+    async def _fetch(
+        self, key: CacheKey, tracker: AsyncBaseTracker, keyword: str
+    ) -> List[ProductResult]:
+        try:
+            results = await tracker.search_products(keyword)
+        except Exception as e:
+            self._counters["errors"] += 1
+            logger.error(f"Search failed for {key}: {e}")
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        if results:
+            self._entries[key] = _Entry(results=results, fetched_at=self._clock())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return results
+
+
+search_cache = SearchCache()
@@ -1,146 +1,369 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 from loguru import logger
+from sqlalchemy import and_, func, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
+from src.config import get_settings
 from src.models.flash_deal import FlashDeal
 from src.models.notification_log import NotificationType
 from src.models.price_history import PriceHistory
 from src.models.tracked_product import TrackedProduct
 from src.notifications.dispatcher import NotificationDispatcher
-from src.notifications.formatter import format_price_drop_alert
-from src.trackers.base import BaseTracker
+from src.notifications.formatter import PRICE_ALERT_BATCH_SIZE, format_price_drop_alerts
+from src.trackers.adapter import as_async
+from src.trackers.base import AsyncBaseTracker, BaseTracker, FlashDealResult, PriceSnapshot
+from src.trackers.events import event_bus
+from src.trackers.flash_deals import FLASH_DEAL_DEFAULT_TTL, active_deal_clause
+from src.trackers.registry import tracker_registry
+from src.trackers.rollups import update_rollups
 
+# SQLite 單一語句的參數數量有上限，IN 查詢分段執行
+IN_CHUNK_SIZE = 500
 
-def get_tracker(platform: str) -> Optional[BaseTracker]:
-    """根據 platform 名稱取得對應 Tracker 實例"""
-    if platform == "pchome":
-        from src.trackers.platforms.pchome import PChomeTracker
 
-        return PChomeTracker()
-    elif platform == "momo":
-        from src.trackers.platforms.momo import MomoTracker
+def utcnow() -> datetime:
+    """與 SQLite CURRENT_TIMESTAMP（server_default）相同基準的 naive UTC 時間"""
+    return datetime.utcnow()
 
-        return MomoTracker()
-    logger.warning(f"Unknown platform: {platform}")
-    return None
 
+@dataclass
+class PriceCheckResult:
+    product: TrackedProduct
+    snapshot: PriceHistory
+    is_price_drop: bool
+    is_target_reached: bool
 
-def check_price_and_snapshot(
-    session: Session, product: TrackedProduct
-) -> Tuple[Optional[PriceHistory], bool, bool]:
-    """
-    爬取最新價格並存入 price_history。
 
-    Returns:
-        (new_snapshot, is_price_drop, is_target_reached)
-    """
-    tracker = get_tracker(product.platform)
+def get_tracker(platform: str) -> Optional[BaseTracker]:
+    """取得 platform 對應的共用 Tracker 實例（由 tracker_registry 管理，勿自行 close）"""
+    tracker = tracker_registry.get(platform)
     if tracker is None:
-        return None, False, False
-
-    snapshot = tracker.fetch_price(product.product_id)
-    if snapshot is None:
-        logger.warning(f"No price fetched for product {product.id}")
-        return None, False, False
-
-    last = (
-        session.query(PriceHistory)
-        .filter_by(product_id=product.id)
-        .order_by(PriceHistory.snapshot_at.desc())
-        .first()
-    )
+        logger.warning(f"Unknown platform: {platform}")
+    return tracker
+
+
+def get_async_tracker(platform: str) -> Optional[AsyncBaseTracker]:
+    """取得 platform 對應 tracker 的 async 介面，供 async route 直接 await"""
+    tracker = get_tracker(platform)
+    return as_async(tracker) if tracker is not None else None
+
+
+def get_last_snapshots(session: Session, product_ids: List[int]) -> Dict[int, PriceHistory]:
+    """一次查出多個商品最近一筆 price_history"""
+    last_snapshots: Dict[int, PriceHistory] = {}
+    for i in range(0, len(product_ids), IN_CHUNK_SIZE):
+        chunk = product_ids[i : i + IN_CHUNK_SIZE]
+        latest_ids = (
+            session.query(func.max(PriceHistory.id))
+            .filter(PriceHistory.product_id.in_(chunk))
+            .group_by(PriceHistory.product_id)
+        )
+        rows = session.query(PriceHistory).filter(PriceHistory.id.in_(latest_ids)).all()
+        last_snapshots.update((row.product_id, row) for row in rows)
+    return last_snapshots
+
+
+def seed_lowest_prices(session: Session, products: List[TrackedProduct]) -> None:
+    """lowest_price 尚未設定的商品（欄位新增前就在追蹤）由既有 price_history 補上歷史最低價"""
+    by_id = {product.id: product for product in products if product.lowest_price is None}
+    product_ids = list(by_id)
+    for i in range(0, len(product_ids), IN_CHUNK_SIZE):
+        chunk = product_ids[i : i + IN_CHUNK_SIZE]
+        lowest = (
+            select(PriceHistory.product_id, func.min(PriceHistory.price).label("price"))
+            .where(PriceHistory.product_id.in_(chunk))
+            .group_by(PriceHistory.product_id)
+            .subquery()
+        )
+        rows = session.execute(
+            select(PriceHistory.product_id, PriceHistory.price, func.min(PriceHistory.snapshot_at))
+            .join(lowest, and_(
+                PriceHistory.product_id == lowest.c.product_id,
+                PriceHistory.price == lowest.c.price,
+            ))
+            .group_by(PriceHistory.product_id, PriceHistory.price)
+        )
+        for product_id, price, at in rows:
+            by_id[product_id].lowest_price = price
+            by_id[product_id].lowest_price_at = at
 
-    new_record = PriceHistory(
-        product_id=product.id,
-        price=snapshot.price,
-        original_price=snapshot.original_price,
-        in_stock=snapshot.in_stock,
-        source="price_check",
-    )
-    session.add(new_record)
-    session.commit()
-    session.refresh(new_record)
 
-    is_price_drop = last is not None and snapshot.price < last.price
-    is_target_reached = (
-        product.target_price is not None and snapshot.price <= product.target_price
+def _is_unchanged(last: Optional[PriceHistory], snapshot: PriceSnapshot) -> bool:
+    return (
+        last is not None
+        and last.price == snapshot.price
+        and last.original_price == snapshot.original_price
+        and last.in_stock == snapshot.in_stock
     )
 
-    return new_record, is_price_drop, is_target_reached
+
+def _observe_price(product: TrackedProduct, price: int, at: datetime) -> None:
+    """更新 TrackedProduct 上的最新價與歷史最低價（與快照同一個交易）"""
+    product.last_price = price
+    product.last_checked_at = at
+    if product.lowest_price is None or price < product.lowest_price:
+        product.lowest_price = price
+        product.lowest_price_at = at
+
+
+def record_price_snapshots(
+    session: Session,
+    snapshots: List[Tuple[TrackedProduct, PriceSnapshot]],
+    now: Optional[datetime] = None,
+) -> List[PriceCheckResult]:
+    """批次寫入價格快照、更新 rollup，並判斷是否降價或達到目標價
+
+    price_history_mode 為 "changes" 時，價格與庫存都沒變就不新增資料列，
+    只把最近一筆的 last_seen_at 更新為現在，回傳的 snapshot 即為該筆。
+    降價判斷使用 TrackedProduct.last_price，只有價格可能沒變的商品才需查最近一筆快照。
+    只做 flush 不 commit，交易邊界由呼叫端決定（排程每輪只 commit 一次）。
+    """
+    if not snapshots:
+        return []
+    now = now or utcnow()
+
+    changes_only = get_settings().price_history_mode == "changes"
+    # last_price 為空代表欄位新增前就有的商品，同樣查一次最近快照
+    lookup_ids = [
+        product.id
+        for product, snapshot in snapshots
+        if product.last_price is None or (changes_only and product.last_price == snapshot.price)
+    ]
+    last_snapshots = get_last_snapshots(session, lookup_ids) if lookup_ids else {}
+    seed_lowest_prices(session, [product for product, _ in snapshots])
+
+    results = []
+    for product, snapshot in snapshots:
+        last = last_snapshots.get(product.id)
+        previous_price = product.last_price
+        if previous_price is None and last is not None:
+            previous_price = last.price
+
+        if changes_only and _is_unchanged(last, snapshot):
+            last.last_seen_at = now
+            record = last
+        else:
+            record = PriceHistory(
+                product_id=product.id,
+                price=snapshot.price,
+                original_price=snapshot.original_price,
+                in_stock=snapshot.in_stock,
+                snapshot_at=now,
+                source="price_check",
+            )
+            session.add(record)
+        _observe_price(product, snapshot.price, now)
+        _queue_price_events(session, product, snapshot.price, previous_price, now)
+
+        results.append(
+            PriceCheckResult(
+                product=product,
+                snapshot=record,
+                is_price_drop=previous_price is not None and snapshot.price < previous_price,
+                is_target_reached=(
+                    product.target_price is not None
+                    and snapshot.price <= product.target_price
+                ),
+            )
+        )
+
+    update_rollups(session, [(product.id, snapshot.price, now) for product, snapshot in snapshots])
+    session.flush()
+    return results
+
+
+def _queue_price_events(
+    session: Session,
+    product: TrackedProduct,
+    price: int,
+    previous_price: Optional[int],
+    at: datetime,
+) -> None:
+    """價格變動與剛達到目標價時排入事件，commit 後推送給 SSE 連線"""
+    if not event_bus.has_subscribers():
+        return
+    data = {
+        "product_id": product.id,
+        "platform": product.platform,
+        "name": product.name,
+        "price": price,
+        "at": at.isoformat(),
+    }
+    if previous_price is not None and price != previous_price:
+        event_bus.publish_after_commit(
+            session,
+            "price_changed",
+            {**data, "previous_price": previous_price, "lowest_price": product.lowest_price},
+        )
+    # 持續低於目標價時只在第一次跨過時推送
+    target = product.target_price
+    if target is not None and price <= target:
+        if previous_price is None or previous_price > target:
+            event_bus.publish_after_commit(
+                session, "target_reached", {**data, "target_price": target}
+            )
+
+
+def _queue_flash_deal_events(session: Session, platform: str, urls: List[str]) -> None:
+    """新上架的特賣排入 flash_deal_added 事件（含 id，前端可直接加入列表）"""
+    if not urls or not event_bus.has_subscribers():
+        return
+    for i in range(0, len(urls), IN_CHUNK_SIZE):
+        rows = session.scalars(
+            select(FlashDeal).where(
+                FlashDeal.platform == platform,
+                FlashDeal.product_url.in_(urls[i : i + IN_CHUNK_SIZE]),
+            )
+        )
+        for deal in rows:
+            event_bus.publish_after_commit(session, "flash_deal_added", {
+                "id": deal.id,
+                "platform": deal.platform,
+                "product_name": deal.product_name,
+                "product_url": deal.product_url,
+                "sale_price": deal.sale_price,
+                "original_price": deal.original_price,
+                "discount_rate": deal.discount_rate,
+                "start_at": deal.start_at.isoformat() if deal.start_at else None,
+                "end_at": deal.end_at.isoformat() if deal.end_at else None,
+            })
 
 
 def refresh_flash_deals(session: Session, platform: str) -> int:
     """爬取並更新 flash_deals 資料表，回傳新增筆數。
     若新加入的特賣商品與追蹤清單有 URL 匹配，建立 PriceHistory 並視情況發送通知。
+
+    進行中的特賣與追蹤商品各只查一次，特賣以單一 upsert 批次寫入，
+    本輪所有通知依類型合併後一次送出。
     """
     tracker = get_tracker(platform)
     if tracker is None:
         return 0
 
     deals = tracker.fetch_flash_deals()
-    count = 0
-    for deal in deals:
-        existing = (
-            session.query(FlashDeal)
-            .filter_by(platform=deal.platform, product_url=deal.product_url)
-            .first()
-        )
-        if existing is not None:
-            continue
-
-        record = FlashDeal(
-            platform=deal.platform,
-            product_name=deal.product_name,
-            product_url=deal.product_url,
-            sale_price=deal.sale_price,
-            original_price=deal.original_price,
-            discount_rate=deal.discount_rate,
-        )
-        session.add(record)
-        count += 1
-
-        # 比對追蹤清單
-        matched = (
-            session.query(TrackedProduct)
-            .filter_by(url=deal.product_url, is_active=True)
-            .first()
+    if not deals:
+        return 0
+
+    now = utcnow()
+    active_urls = set(
+        session.scalars(
+            select(FlashDeal.product_url).where(
+                FlashDeal.platform == platform, active_deal_clause(now)
+            )
         )
-        if matched is None:
-            continue
-
-        last = (
-            session.query(PriceHistory)
-            .filter_by(product_id=matched.id)
-            .order_by(PriceHistory.snapshot_at.desc())
-            .first()
+    )
+    unique_deals: Dict[str, FlashDealResult] = {}
+    for deal in deals:
+        unique_deals.setdefault(deal.product_url, deal)
+    new_deals = {url: deal for url, deal in unique_deals.items() if url not in active_urls}
+
+    # 已存在的特賣更新價格與場次時間；已結束但再次上架的特賣視為新特賣
+    stmt = sqlite_insert(FlashDeal)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["platform", "product_url"],
+        set_={
+            column: stmt.excluded[column]
+            for column in (
+                "product_name", "sale_price", "original_price", "discount_rate",
+                "start_at", "end_at",
+            )
+        },
+    )
+    session.execute(stmt, [
+        {
+            "platform": deal.platform,
+            "product_name": deal.product_name,
+            "product_url": deal.product_url,
+            "sale_price": deal.sale_price,
+            "original_price": deal.original_price,
+            "discount_rate": deal.discount_rate,
+            "start_at": deal.start_at,
+            "end_at": deal.end_at or now + FLASH_DEAL_DEFAULT_TTL,
+        }
+        for deal in unique_deals.values()
+    ])
+    _queue_flash_deal_events(session, platform, list(new_deals))
+
+    # 比對追蹤清單
+    tracked = get_active_products_by_url(session, list(new_deals))
+    matches = [(product, new_deals[url]) for url, product in tracked.items()]
+    if matches:
+        _record_flash_deal_snapshots(session, matches)
+
+    session.commit()
+    return len(new_deals)
+
+
+def get_active_products_by_url(session: Session, urls: List[str]) -> Dict[str, TrackedProduct]:
+    """一次查出 URL 對應的 active 追蹤商品"""
+    products: Dict[str, TrackedProduct] = {}
+    for i in range(0, len(urls), IN_CHUNK_SIZE):
+        chunk = urls[i : i + IN_CHUNK_SIZE]
+        rows = session.scalars(
+            select(TrackedProduct).where(
+                TrackedProduct.url.in_(chunk), TrackedProduct.is_active == True  # noqa: E712
+            )
         )
+        products.update((product.url, product) for product in rows)
+    return products
+
+
+def _record_flash_deal_snapshots(
+    session: Session, matches: List[Tuple[TrackedProduct, FlashDealResult]]
+) -> None:
+    """為命中追蹤清單的特賣批次寫入快照，並合併發送降價／目標價通知"""
+    now = utcnow()
+    # last_price 為空代表欄位新增前就有的商品，退回查最近快照
+    missing = [product.id for product, _ in matches if product.last_price is None]
+    last_snapshots = get_last_snapshots(session, missing) if missing else {}
+    seed_lowest_prices(session, [product for product, _ in matches])
+
+    alerts = []
+    for product, deal in matches:
+        previous_price = product.last_price
+        if previous_price is None and product.id in last_snapshots:
+            previous_price = last_snapshots[product.id].price
 
         snapshot = PriceHistory(
-            product_id=matched.id,
+            product_id=product.id,
             price=deal.sale_price,
             original_price=deal.original_price,
             in_stock=True,
+            snapshot_at=now,
             source="flash_deal",
         )
         session.add(snapshot)
-        session.flush()
+        _observe_price(product, deal.sale_price, now)
+        _queue_price_events(session, product, deal.sale_price, previous_price, now)
 
-        is_price_drop = last is not None and deal.sale_price < last.price
+        is_price_drop = previous_price is not None and deal.sale_price < previous_price
         is_target_reached = (
-            matched.target_price is not None and deal.sale_price <= matched.target_price
+            product.target_price is not None and deal.sale_price <= product.target_price
         )
-
         if is_price_drop or is_target_reached:
-            notification_type = (
-                NotificationType.target_price_reached if is_target_reached
-                else NotificationType.price_drop
-            )
-            message = format_price_drop_alert(matched, snapshot, [], is_target_reached)
-            dispatcher = NotificationDispatcher(session)
-            dispatcher.dispatch(notification_type, [snapshot.id], message)
+            alerts.append((product, snapshot, [], is_target_reached))
 
-    session.commit()
-    return count
+    update_rollups(session, [(product.id, deal.sale_price, now) for product, deal in matches])
+    session.flush()
+
+    by_type: Dict[NotificationType, list] = {}
+    for alert in alerts:
+        notification_type = (
+            NotificationType.target_price_reached if alert[3] else NotificationType.price_drop
+        )
+        by_type.setdefault(notification_type, []).append(alert)
+    if not by_type:
+        return
+
+    dispatcher = NotificationDispatcher(session)
+    for notification_type, items in by_type.items():
+        for i in range(0, len(items), PRICE_ALERT_BATCH_SIZE):
+            batch = items[i : i + PRICE_ALERT_BATCH_SIZE]
+            reference_ids = [snapshot.id for _, snapshot, _, _ in batch]
+            dispatcher.dispatch(notification_type, reference_ids, format_price_drop_alerts(batch))
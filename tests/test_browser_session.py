@@ -0,0 +1,127 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from playwright.async_api import Error as PlaywrightError
+
+from src.trackers.browser import BrowserSession
+from src.trackers.platforms.momo import MomoTracker
+
+
+def _mock_page():
+    page = MagicMock()
+    page.is_closed.return_value = False
+    page.close = AsyncMock()
+    return page
+
+
+def _mock_playwright():
+    """建立假的 async_playwright()，每次 launch 回傳新的 browser mock"""
+    playwright = MagicMock()
+    playwright.stop = AsyncMock()
+
+    async def launch(**kwargs):
+        browser = MagicMock()
+        browser.is_connected.return_value = True
+        browser.close = AsyncMock()
+        context = MagicMock()
+        context.close = AsyncMock()
+        context.new_page = AsyncMock(side_effect=lambda: _mock_page())
+        browser.new_context = AsyncMock(return_value=context)
+        return browser
+
+    playwright.chromium.launch.side_effect = launch
+    factory = MagicMock()
+    factory.return_value.start = AsyncMock(return_value=playwright)
+    return factory, playwright
+
+
+def _patches(factory):
+    stealth = MagicMock()
+    stealth.return_value.apply_stealth_async = AsyncMock()
+    return (
+        patch("src.trackers.browser.async_playwright", factory),
+        patch("src.trackers.browser.Stealth", stealth),
+    )
+
+
+async def _identity(page):
+    return page
+
+
+@pytest.mark.asyncio
+async def test_session_reuses_browser_and_page():
+    factory, playwright = _mock_playwright()
+    p1, p2 = _patches(factory)
+    with p1, p2:
+        session = BrowserSession()
+        first = await session.run(_identity)
+        second = await session.run(_identity)
+        await session.aclose()
+
+    assert playwright.chromium.launch.call_count == 1
+    assert first is second
+    assert session.launch_count == 1
+    playwright.stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_session_relaunches_after_crash():
+    factory, playwright = _mock_playwright()
+    calls = []
+
+    async def flaky(page):
+        calls.append(page)
+        if len(calls) == 1:
+            # 模擬瀏覽器程序崩潰：連線中斷並拋出 Playwright 錯誤
+            session._browser.is_connected.return_value = False
+            raise PlaywrightError("Target closed")
+        return "ok"
+
+    p1, p2 = _patches(factory)
+    with p1, p2:
+        session = BrowserSession()
+        result = await session.run(flaky)
+        await session.aclose()
+
+    assert result == "ok"
+    assert session.launch_count == 2
+
+
+@pytest.mark.asyncio
+async def test_session_does_not_retry_when_browser_healthy():
+    factory, _ = _mock_playwright()
+
+    async def timeout(page):
+        raise PlaywrightError("Timeout 15000ms exceeded")
+
+    p1, p2 = _patches(factory)
+    with p1, p2:
+        session = BrowserSession()
+        with pytest.raises(PlaywrightError):
+            await session.run(timeout)
+        assert session.stats()["idle_pages"] == 1
+        await session.aclose()
+
+    assert session.launch_count == 1
+
+
+@pytest.mark.asyncio
+async def test_closed_session_rejects_work():
+    session = BrowserSession()
+    await session.aclose()
+    with pytest.raises(RuntimeError):
+        await session.run(_identity)
+
+
+def test_momo_tracker_uses_injected_session():
+    session = MagicMock()
+    session.run = AsyncMock(return_value=None)
+    session.aclose = AsyncMock()
+    tracker = MomoTracker(session=session, mode="browser")
+
+    assert tracker.fetch_price("12345") is None
+    session.run.assert_awaited_once()
+
+    # 注入的 session 由呼叫端管理，tracker.close() 不應關閉它
+    tracker.close()
+    session.aclose.assert_not_called()
@@ -0,0 +1,140 @@
+import asyncio
+import json
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from src.api.events import _parse_types, event_stream
+from src.db.database import Base
+from src.models.tracked_product import TrackedProduct
+from src.trackers.base import FlashDealResult, PriceSnapshot
+from src.trackers.events import EventBus, event_bus
+from src.trackers.utils import record_price_snapshots, refresh_flash_deals
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+async def test_subscribers_receive_events_from_other_threads():
+    bus = EventBus(max_queue=10)
+    with bus.subscribe() as everything, bus.subscribe({"flash_deal_added"}) as deals_only:
+        worker = threading.Thread(target=bus.publish, args=("price_changed", {"price": 1}))
+        worker.start()
+        worker.join()
+        bus.publish("flash_deal_added", {"id": 7})
+
+        first = await everything.get(timeout=1)
+        assert (first.type, first.data) == ("price_changed", {"price": 1})
+        assert (await everything.get(timeout=1)).type == "flash_deal_added"
+        assert (await deals_only.get(timeout=1)).data == {"id": 7}
+        assert await deals_only.get(timeout=0.01) is None
+
+    assert bus.has_subscribers() is False
+
+
+async def test_full_queue_drops_oldest_event():
+    bus = EventBus(max_queue=2)
+    with bus.subscribe() as subscription:
+        for i in range(3):
+            bus.publish("price_changed", {"i": i})
+        await asyncio.sleep(0)
+
+        assert [(await subscription.get(timeout=1)).data["i"] for _ in range(2)] == [1, 2]
+        assert subscription.dropped == 1
+
+
+async def test_events_published_only_after_commit(db):
+    with event_bus.subscribe() as subscription:
+        db.execute(select(1))
+        event_bus.publish_after_commit(db, "price_changed", {"rolled": "back"})
+        db.rollback()
+        event_bus.publish_after_commit(db, "price_changed", {"ok": True})
+        assert await subscription.get(timeout=0.01) is None
+
+        db.commit()
+        event = await subscription.get(timeout=1)
+        assert event.data == {"ok": True}
+        assert await subscription.get(timeout=0.01) is None
+
+
+async def test_record_price_snapshots_queues_change_and_target_events(db):
+    product = TrackedProduct(
+        platform="pchome", product_id="A", name="耳機", url="https://example.com/A",
+        target_price=900, last_price=1000,
+    )
+    db.add(product)
+    db.commit()
+
+    with event_bus.subscribe() as subscription:
+        record_price_snapshots(db, [(product, PriceSnapshot(price=880))])
+        db.commit()
+        changed = await subscription.get(timeout=1)
+        reached = await subscription.get(timeout=1)
+
+        # 已低於目標價後再次降價：只推送價格變動
+        record_price_snapshots(db, [(product, PriceSnapshot(price=850))])
+        db.commit()
+        again = await subscription.get(timeout=1)
+        assert await subscription.get(timeout=0.01) is None
+
+    assert changed.type == "price_changed"
+    assert (changed.data["price"], changed.data["previous_price"]) == (880, 1000)
+    assert reached.type == "target_reached"
+    assert reached.data["target_price"] == 900
+    assert again.type == "price_changed"
+
+
+async def test_refresh_flash_deals_publishes_new_deals(db):
+    tracker = MagicMock()
+    tracker.fetch_flash_deals.return_value = [
+        FlashDealResult(
+            platform="pchome", product_name="耳機", product_url="https://example.com/deal",
+            sale_price=500,
+        )
+    ]
+    with event_bus.subscribe({"flash_deal_added"}) as subscription:
+        with patch("src.trackers.utils.get_tracker", return_value=tracker):
+            assert refresh_flash_deals(db, "pchome") == 1
+            # 第二次抓到同一筆進行中的特賣不再推送
+            refresh_flash_deals(db, "pchome")
+        event = await subscription.get(timeout=1)
+        assert await subscription.get(timeout=0.01) is None
+
+    assert event.data["product_url"] == "https://example.com/deal"
+    assert event.data["id"] is not None
+
+
+async def test_event_stream_formats_sse_and_heartbeat():
+    request = MagicMock()
+    request.is_disconnected = AsyncMock(side_effect=[False, False, True])
+    stream = event_stream(request, heartbeat=0.01)
+
+    assert await stream.__anext__() == "retry: 5000\n\n"
+    assert event_bus.has_subscribers()
+    event_bus.publish("flash_deal_added", {"id": 1, "product_name": "耳機"})
+    chunk = await stream.__anext__()
+    assert await stream.__anext__() == ": keep-alive\n\n"
+    with pytest.raises(StopAsyncIteration):
+        await stream.__anext__()
+
+    lines = chunk.strip().split("\n")
+    assert lines[1] == "event: flash_deal_added"
+    assert json.loads(lines[2][len("data: "):]) == {"id": 1, "product_name": "耳機"}
+    assert not event_bus.has_subscribers()
+
+
+def test_parse_types_rejects_unknown():
+    from fastapi import HTTPException
+
+    assert _parse_types("price_changed, target_reached") == {"price_changed", "target_reached"}
+    assert _parse_types(None) is None
+    with pytest.raises(HTTPException):
+        _parse_types("price_changed,bogus")
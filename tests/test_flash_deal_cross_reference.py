@@ -161,3 +161,71 @@ def test_flash_deal_triggers_notification_when_target_price_reached(db):
     assert mock_dispatcher.dispatch.called
     call_args = mock_dispatcher.dispatch.call_args[0]
     assert call_args[0] == NotificationType.target_price_reached
+
+
+def _deal(url, sale_price):
+    return FlashDealResult(
+        platform="pchome", product_name=url, product_url=url,
+        sale_price=sale_price, original_price=9000, discount_rate=0.5,
+    )
+
+
+def test_flash_deal_refresh_is_set_based_and_batches_notifications(db):
+    """同一輪多筆命中只送一次通知；重複的特賣不會再次寫入"""
+    from src.models.flash_deal import FlashDeal
+
+    a = _make_tracked(db, url="https://24h.pchome.com.tw/prod/A")
+    a.last_price = 8000
+    b = TrackedProduct(
+        platform="pchome", product_id="B", name="B",
+        url="https://24h.pchome.com.tw/prod/B", is_active=True, last_price=7000,
+    )
+    db.add(b)
+    db.commit()
+
+    deals = [
+        _deal(a.url, 5000),
+        _deal(b.url, 6000),
+        _deal(a.url, 5000),  # 同一批內重複
+        _deal("https://24h.pchome.com.tw/prod/C", 100),
+    ]
+    mock_tracker = MagicMock()
+    mock_tracker.fetch_flash_deals.return_value = deals
+
+    mock_dispatcher = MagicMock()
+    with patch("src.trackers.utils.get_tracker", return_value=mock_tracker), \
+         patch("src.trackers.utils.NotificationDispatcher", return_value=mock_dispatcher):
+        assert refresh_flash_deals(db, "pchome") == 3
+        assert refresh_flash_deals(db, "pchome") == 0
+
+    assert db.query(FlashDeal).count() == 3
+    assert db.query(PriceHistory).count() == 2
+    assert (a.last_price, a.lowest_price) == (5000, 5000)
+    mock_dispatcher.dispatch.assert_called_once()
+    _, reference_ids, message = mock_dispatcher.dispatch.call_args[0]
+    assert len(reference_ids) == 2
+    assert len(message["discord_embeds"]) == 2
+
+
+def test_flash_deal_notifications_are_chunked(db):
+    """大量命中時依 PRICE_ALERT_BATCH_SIZE 拆成多則通知"""
+    products = []
+    for i in range(3):
+        product = TrackedProduct(
+            platform="pchome", product_id=f"P{i}", name=f"商品{i}",
+            url=f"https://24h.pchome.com.tw/prod/P{i}", is_active=True, last_price=1000,
+        )
+        db.add(product)
+        products.append(product)
+    db.commit()
+
+    mock_tracker = MagicMock()
+    mock_tracker.fetch_flash_deals.return_value = [_deal(p.url, 500) for p in products]
+    mock_dispatcher = MagicMock()
+    with patch("src.trackers.utils.get_tracker", return_value=mock_tracker), \
+         patch("src.trackers.utils.NotificationDispatcher", return_value=mock_dispatcher), \
+         patch("src.trackers.utils.PRICE_ALERT_BATCH_SIZE", 2):
+        refresh_flash_deals(db, "pchome")
+
+    sizes = [len(call.args[1]) for call in mock_dispatcher.dispatch.call_args_list]
+    assert sizes == [2, 1]
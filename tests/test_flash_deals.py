@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.orm import Session
+
+from src.db.database import Base, upgrade_schema
+from src.models.flash_deal import FlashDeal
+from src.trackers.base import FlashDealResult
+from src.trackers.flash_deals import (
+    FLASH_DEAL_DEFAULT_TTL,
+    active_deal_clause,
+    decode_cursor,
+    encode_cursor,
+    purge_ended_flash_deals,
+)
+from src.trackers.utils import refresh_flash_deals
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _add_deal(db, name, **kwargs):
+    deal = FlashDeal(
+        platform="pchome", product_name=name,
+        product_url=f"https://24h.pchome.com.tw/prod/{name}", sale_price=100, **kwargs,
+    )
+    db.add(deal)
+    db.flush()
+    return deal
+
+
+def test_active_deal_clause(db):
+    _add_deal(db, "ACTIVE", start_at=NOW - timedelta(hours=1), end_at=NOW + timedelta(hours=1))
+    _add_deal(db, "ENDED", end_at=NOW - timedelta(minutes=1))
+    _add_deal(db, "UPCOMING", start_at=NOW + timedelta(hours=1), end_at=NOW + timedelta(hours=3))
+
+    names = db.scalars(select(FlashDeal.product_name).where(active_deal_clause(NOW))).all()
+    assert names == ["ACTIVE"]
+
+
+def test_purge_ended_flash_deals(db):
+    _add_deal(db, "OLD", end_at=NOW - timedelta(days=10))
+    _add_deal(db, "RECENT", end_at=NOW - timedelta(days=1))
+    legacy = _add_deal(db, "LEGACY")
+    legacy.created_at = NOW - timedelta(days=30)
+    db.commit()
+
+    assert purge_ended_flash_deals(db, NOW, timedelta(days=7)) == 2
+    assert db.scalars(select(FlashDeal.product_name)).all() == ["RECENT"]
+
+
+def test_refresh_sets_window_and_relists_ended_deal(db):
+    ended = _add_deal(db, "A", end_at=NOW - timedelta(hours=1))
+    db.commit()
+
+    deal = FlashDealResult(
+        platform="pchome", product_name="A", product_url=ended.product_url, sale_price=90,
+    )
+    mock_tracker = MagicMock()
+    mock_tracker.fetch_flash_deals.return_value = [deal]
+
+    with patch("src.trackers.utils.get_tracker", return_value=mock_tracker), \
+         patch("src.trackers.utils.utcnow", return_value=NOW):
+        # 已結束的特賣再次上架視為新特賣，並沿用同一筆資料
+        assert refresh_flash_deals(db, "pchome") == 1
+        assert refresh_flash_deals(db, "pchome") == 0
+
+    db.refresh(ended)
+    assert ended.sale_price == 90
+    assert ended.end_at == NOW + FLASH_DEAL_DEFAULT_TTL
+    assert db.query(FlashDeal).count() == 1
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(0.35, 42)) == (0.35, 42)
+    assert decode_cursor(encode_cursor(None, 7)) == (1.0, 7)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_upgrade_schema_adds_unique_index_to_old_table():
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as connection:
+        # 加入唯一約束前的資料表
+        connection.execute(text(
+            "CREATE TABLE flash_deals (id INTEGER PRIMARY KEY, platform VARCHAR(20) NOT NULL, "
+            "product_name VARCHAR(255) NOT NULL, product_url VARCHAR(500) NOT NULL, "
+            "sale_price INTEGER NOT NULL, original_price INTEGER, discount_rate FLOAT, "
+            "start_at DATETIME, end_at DATETIME, created_at DATETIME, updated_at DATETIME)"
+        ))
+        for price in (120, 100):
+            connection.execute(text(
+                "INSERT INTO flash_deals (platform, product_name, product_url, sale_price, "
+                "end_at) VALUES ('pchome', 'A', 'https://24h.pchome.com.tw/prod/A', :price, "
+                "'2026-03-01 11:00:00')"
+            ), {"price": price})
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        upgrade_schema(connection)
+        upgrade_schema(connection)  # 重複執行不會再建索引
+        indexes = {i["name"] for i in inspect(connection).get_indexes("flash_deals")}
+    assert "ix_flash_deals_active" in indexes
+
+    deal = FlashDealResult(
+        platform="pchome", product_name="A", product_url="https://24h.pchome.com.tw/prod/A",
+        sale_price=90,
+    )
+    mock_tracker = MagicMock()
+    mock_tracker.fetch_flash_deals.return_value = [deal]
+    with Session(engine) as db, \
+            patch("src.trackers.utils.get_tracker", return_value=mock_tracker), \
+            patch("src.trackers.utils.utcnow", return_value=NOW):
+        assert refresh_flash_deals(db, "pchome") == 1
+        # 重複資料只保留最新一筆，upsert 更新該筆
+        assert db.scalars(select(FlashDeal.sale_price)).all() == [90]
+
+
+def test_upgrade_schema_skips_new_table():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        upgrade_schema(connection)
+        names = [i["name"] for i in inspect(connection).get_indexes("flash_deals")]
+    assert "uq_flash_deals_platform_url" not in names
@@ -13,3 +13,227 @@ def test_calculate_discount_rate():
     from src.trackers.platforms.momo import _calculate_discount_rate
     assert _calculate_discount_rate(6500, 8490) == pytest.approx(0.766, abs=0.001)
     assert _calculate_discount_rate(6500, 0) is None
+
+
+def test_parse_time_range_to_utc():
+    from datetime import datetime
+
+    from src.trackers.platforms.momo import _parse_time_range
+    now = datetime(2026, 3, 1, 11, 0)  # 台灣時間
+    assert _parse_time_range("搶購中 10:00~12:00", now) == (
+        datetime(2026, 3, 1, 2, 0), datetime(2026, 3, 1, 4, 0),
+    )
+    # 跨日場次
+    assert _parse_time_range("22:00-02:00", now)[1] == datetime(2026, 3, 1, 18, 0)
+    assert _parse_time_range("即將開賣", now) == (None, None)
+
+
+def test_parse_time_range_after_midnight():
+    from datetime import datetime
+
+    from src.trackers.platforms.momo import _parse_time_range
+    now = datetime(2026, 3, 2, 1, 0)  # 台灣時間，前一天 22:00 開始的場次仍在進行
+    assert _parse_time_range("22:00~02:00", now) == (
+        datetime(2026, 3, 1, 14, 0), datetime(2026, 3, 1, 18, 0),
+    )
+    # 尚未開始的當日場次不往前移
+    assert _parse_time_range("10:00~12:00", now)[0] == datetime(2026, 3, 2, 2, 0)
+
+
+def test_parse_search_items_from_bulk_extraction():
+    from src.trackers.platforms.momo import _parse_search_items
+    results = _parse_search_items([
+        {"name": " Sony 耳機 ", "price": "6,990", "url": "/goods/GoodsDetail.jsp?i_code=123"},
+        {"name": None, "price": "100", "url": "/goods/GoodsDetail.jsp?i_code=456"},
+    ])
+    assert len(results) == 1
+    assert results[0].product_id == "123"
+    assert results[0].name == "Sony 耳機"
+    assert results[0].price == 6990
+    assert results[0].url.startswith("https://www.momoshop.com.tw/goods/")
+
+
+def test_parse_search_xhr_payload():
+    from src.trackers.platforms.momo import _parse_search_xhr
+    payload = {"rtnSearchData": {"goodsInfoList": [
+        {"goodsCode": "789", "goodsName": "Apple AirPods", "goodsPrice": "$5,990",
+         "goodsPriceOri": "6,490", "imgUrl": "https://img/789.jpg"},
+        {"goodsCode": "", "goodsName": "no code", "goodsPrice": "1"},
+    ]}}
+    results = _parse_search_xhr(payload)
+    assert [r.product_id for r in results] == ["789"]
+    assert results[0].original_price == 6490
+    assert results[0].url.endswith("i_code=789")
+    assert _parse_search_xhr([]) == []
+
+
+def test_parse_flash_deal_items_uses_first_parsable_slot():
+    from src.trackers.platforms.momo import _parse_flash_deal_items
+    results = _parse_flash_deal_items({
+        "slots": ["即將開賣", "10:00~12:00"],
+        "items": [{"brand": "SONY", "name": "耳機", "sale_price": "6,500",
+                   "original_price": "8,490", "url": "//www.momoshop.com.tw/goods/1"}],
+    })
+    assert results[0].product_name == "SONY 耳機"
+    assert results[0].product_url == "https://www.momoshop.com.tw/goods/1"
+    assert results[0].start_at is not None
+
+
+class _FakePage:
+    """模擬 page.on / remove_listener；goto 時把 responses 依序送給 listener"""
+
+    def __init__(self, responses=(), evaluated=None):
+        from unittest.mock import AsyncMock
+        self.responses = list(responses)
+        self.listeners = []
+        self.evaluate = AsyncMock(return_value=evaluated)
+        self.wait_for_selector = AsyncMock()
+
+    def on(self, event, handler):
+        self.listeners.append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners.remove(handler)
+
+    async def goto(self, url, timeout=None):
+        for response in self.responses:
+            for handler in list(self.listeners):
+                await handler(response)
+
+
+async def test_search_uses_captured_xhr_and_skips_dom():
+    from unittest.mock import AsyncMock, MagicMock
+
+    from src.trackers.platforms.momo import AsyncMomoTracker
+    response = MagicMock(url="https://www.momoshop.com.tw/ajax/textSearch.jsp")
+    response.json = AsyncMock(return_value={"rtnSearchData": {"goodsInfoList": [
+        {"goodsCode": "1", "goodsName": "耳機", "goodsPrice": "100"},
+    ]}})
+    page = _FakePage(responses=[response])
+    tracker = AsyncMomoTracker(session=MagicMock())
+
+    results = await tracker._search_on_page(page, "耳機")
+
+    assert [r.product_id for r in results] == ["1"]
+    page.evaluate.assert_not_called()
+    assert page.listeners == []
+    assert tracker.served["search"] == {"http": 0, "xhr": 1, "dom": 0}
+
+
+async def test_search_falls_back_to_single_evaluate(monkeypatch):
+    from unittest.mock import MagicMock
+
+    from src.trackers.platforms import momo
+    monkeypatch.setattr(momo, "XHR_WAIT_SECONDS", 0.01)
+    page = _FakePage(evaluated=[
+        {"name": "耳機", "price": "100", "url": "/goods/GoodsDetail.jsp?i_code=2"},
+    ])
+    tracker = momo.AsyncMomoTracker(session=MagicMock())
+
+    results = await tracker._search_on_page(page, "耳機")
+
+    assert [r.product_id for r in results] == ["2"]
+    page.evaluate.assert_awaited_once()
+    assert page.listeners == []
+    assert tracker.served["search"] == {"http": 0, "xhr": 0, "dom": 1}
+
+
+GOODS_HTML = """
+<html><head>
+<meta property="product:price:amount" content="6990">
+<meta property="product:availability" content="in stock">
+</head><body>
+<div class="goodsPrice"><ul><li class="price"><b>6,990</b></li>
+<li class="originalPrice">8,490</li></ul></div>
+</body></html>
+"""
+
+
+def test_parse_goods_html():
+    from src.trackers.platforms.momo import _parse_goods_html
+    snapshot = _parse_goods_html(GOODS_HTML)
+    assert (snapshot.price, snapshot.original_price, snapshot.in_stock) == (6990, 8490, True)
+
+    # 沒有 meta 時改讀價格區塊，庫存看是否有加入購物車按鈕
+    snapshot = _parse_goods_html(
+        '<div class="goodsPrice"><span class="price"><b>$1,200</b></span></div>'
+    )
+    assert (snapshot.price, snapshot.in_stock) == (1200, False)
+    assert _parse_goods_html("<html><body>請完成驗證</body></html>") is None
+    assert _parse_goods_html("") is None
+
+
+def _http_tracker(handler, mode=None):
+    from unittest.mock import AsyncMock, MagicMock
+
+    import httpx
+
+    from src.trackers.base import PriceSnapshot
+    from src.trackers.platforms.momo import AsyncMomoTracker
+    session = MagicMock()
+    session.run = AsyncMock(return_value=PriceSnapshot(price=1, in_stock=True))
+    tracker = AsyncMomoTracker(
+        session=session, mode=mode, transport=httpx.MockTransport(handler)
+    )
+    return tracker, session
+
+
+async def test_fetch_price_over_http_skips_browser():
+    import httpx
+    tracker, session = _http_tracker(lambda request: httpx.Response(200, text=GOODS_HTML))
+
+    snapshot = await tracker.fetch_price("12345", mode="auto")
+
+    assert snapshot.price == 6990
+    session.run.assert_not_called()
+    assert tracker.stats()["served"]["price"] == {"http": 1, "browser": 0}
+    await tracker.aclose()
+    # 關閉後可再次使用（重建 client）
+    assert (await tracker.fetch_price("12345", mode="http")).price == 6990
+    await tracker.aclose()
+
+
+async def test_fetch_price_falls_back_to_browser_when_blocked():
+    import httpx
+    tracker, session = _http_tracker(lambda request: httpx.Response(403), mode="auto")
+
+    snapshot = await tracker.fetch_price("12345")
+
+    assert snapshot.price == 1
+    session.run.assert_awaited_once()
+    assert tracker.fallbacks == 1
+
+    # 指定 http 模式時被擋就直接失敗，不啟動瀏覽器
+    assert await tracker.fetch_price("12345", mode="http") is None
+    session.run.assert_awaited_once()
+    await tracker.aclose()
+
+
+async def test_search_products_over_http_api():
+    import json
+
+    import httpx
+    seen = []
+
+    def handler(request):
+        seen.append(json.loads(request.content)["data"]["searchValue"])
+        return httpx.Response(200, json={"rtnSearchData": {"goodsInfoList": [
+            {"goodsCode": "1", "goodsName": "耳機", "goodsPrice": "100"},
+        ]}})
+
+    tracker, session = _http_tracker(handler, mode="http")
+    results = await tracker.search_products("耳機")
+
+    assert [r.product_id for r in results] == ["1"]
+    assert seen == ["耳機"]
+    session.run.assert_not_called()
+    assert tracker.served["search"]["http"] == 1
+    await tracker.aclose()
+
+
+def test_unknown_fetch_mode_rejected():
+    from unittest.mock import MagicMock
+
+    from src.trackers.platforms.momo import AsyncMomoTracker
+    with pytest.raises(ValueError):
+        AsyncMomoTracker(session=MagicMock(), mode="carrier-pigeon")
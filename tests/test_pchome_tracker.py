@@ -1,6 +1,10 @@
-from unittest.mock import MagicMock, patch
+import asyncio
+from datetime import datetime
 
-from src.trackers.platforms.pchome import PChomeTracker
+import httpx
+import pytest
+
+from src.trackers.platforms.pchome import AsyncPChomeTracker, PChomeTracker
 
 MOCK_SEARCH_RESPONSE = {
     "prods": [
@@ -38,41 +42,151 @@ MOCK_FLASH_RESPONSE = {
 }
 
 
+def _tracker(handler):
+    return PChomeTracker(transport=httpx.MockTransport(handler))
+
+
+def _json_handler(payload):
+    return lambda request: httpx.Response(200, json=payload)
+
+
 def test_search_products():
-    tracker = PChomeTracker()
-    with patch.object(tracker.client, "get") as mock_get:
-        mock_get.return_value = MagicMock(
-            status_code=200,
-            json=lambda: MOCK_SEARCH_RESPONSE,
-        )
-        results = tracker.search_products("Sony 耳機")
+    tracker = _tracker(_json_handler(MOCK_SEARCH_RESPONSE))
+    results = tracker.search_products("Sony 耳機")
+    tracker.close()
     assert len(results) == 1
     assert results[0].platform == "pchome"
     assert results[0].price == 6990
 
 
 def test_fetch_price():
-    tracker = PChomeTracker()
-    with patch.object(tracker.client, "get") as mock_get:
-        mock_get.return_value = MagicMock(
-            status_code=200,
-            json=lambda: MOCK_PRODUCT_RESPONSE,
-        )
-        snapshot = tracker.fetch_price("DYAQD6-A9009CMYB")
+    tracker = _tracker(_json_handler(MOCK_PRODUCT_RESPONSE))
+    snapshot = tracker.fetch_price("DYAQD6-A9009CMYB")
+    tracker.close()
     assert snapshot is not None
     assert snapshot.price == 6990
     assert snapshot.in_stock is True
 
 
 def test_fetch_flash_deals():
-    tracker = PChomeTracker()
-    with patch.object(tracker.client, "get") as mock_get:
-        mock_get.return_value = MagicMock(
-            status_code=200,
-            json=lambda: MOCK_FLASH_RESPONSE,
-        )
-        deals = tracker.fetch_flash_deals()
+    tracker = _tracker(_json_handler(MOCK_FLASH_RESPONSE))
+    deals = tracker.fetch_flash_deals()
+    tracker.close()
     assert len(deals) == 1
     assert deals[0].platform == "pchome"
     assert deals[0].sale_price == 6500
     assert deals[0].product_url == "https://24h.pchome.com.tw/prod/ABCD12-XYZ"
+    # 時段代碼為台灣時間，轉為 UTC 存放；當天最後一個時段到特賣日結束（台灣時間午夜）為止
+    assert deals[0].start_at == datetime(2026, 2, 22, 7, 0)
+    assert deals[0].end_at == datetime(2026, 2, 22, 16, 0)
+
+
+def test_fetch_flash_deals_slot_window():
+    response = {
+        "data": [
+            {"slot": "202602221200", "status": "end", "products": []},
+            {**MOCK_FLASH_RESPONSE["data"][0]},
+            {"slot": "202602221800", "status": "next", "products": []},
+        ]
+    }
+    tracker = _tracker(_json_handler(response))
+    deals = tracker.fetch_flash_deals()
+    tracker.close()
+    assert (deals[0].start_at, deals[0].end_at) == (
+        datetime(2026, 2, 22, 7, 0), datetime(2026, 2, 22, 10, 0),
+    )
+
+
+def test_fetch_prices_uses_batch_endpoint():
+    requested = []
+
+    def handler(request):
+        requested.append(str(request.url))
+        return httpx.Response(
+            200,
+            json=[
+                {"Id": "AAA-000", "Price": {"M": 100, "P": 120}, "Qty": 3,
+                 "ButtonType": "ForSale"},
+                {"Id": "BBB-000", "Price": {"M": 200, "P": 250}, "Qty": 0,
+                 "ButtonType": "SoldOut"},
+            ],
+        )
+
+    tracker = _tracker(handler)
+    results = tracker.fetch_prices(["AAA", "BBB"])
+    tracker.close()
+
+    assert len(requested) == 1
+    assert "id=AAA,BBB" in requested[0]
+    assert results["AAA"].price == 100
+    assert results["AAA"].in_stock is True
+    assert results["BBB"].in_stock is False
+
+
+def test_fetch_prices_falls_back_to_single_requests():
+    def handler(request):
+        if "/prod/button" in str(request.url):
+            return httpx.Response(500)
+        if str(request.url).endswith("/prod/AAA"):
+            return httpx.Response(200, json=MOCK_PRODUCT_RESPONSE)
+        return httpx.Response(404)
+
+    tracker = _tracker(handler)
+    results = tracker.fetch_prices(["AAA", "MISSING", "AAA"])
+    tracker.close()
+
+    assert set(results) == {"AAA", "MISSING"}
+    assert results["AAA"].price == 6990
+    assert results["MISSING"] is None
+
+
+def test_fetch_prices_empty():
+    assert PChomeTracker().fetch_prices([]) == {}
+
+
+def test_stats_counts_requests():
+    tracker = _tracker(_json_handler(MOCK_PRODUCT_RESPONSE))
+    tracker.fetch_price("A")
+    tracker.fetch_price("B")
+    assert tracker.stats()["requests"] == 2
+    tracker.close()
+    assert tracker.stats()["closed"] is True
+
+
+def test_tracker_usable_after_close():
+    tracker = _tracker(_json_handler(MOCK_PRODUCT_RESPONSE))
+    assert tracker.fetch_price("A").price == 6990
+    tracker.close()
+    # close 後再次使用會在新的 event loop 上重建 client
+    assert tracker.fetch_price("A").price == 6990
+    tracker.close()
+
+
+@pytest.mark.asyncio
+async def test_async_tracker_runs_searches_concurrently():
+    in_flight = []
+    peak = []
+
+    async def handler(request):
+        in_flight.append(request)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+        return httpx.Response(200, json=MOCK_SEARCH_RESPONSE)
+
+    tracker = AsyncPChomeTracker(transport=httpx.MockTransport(handler))
+    results = await asyncio.gather(*(tracker.search_products(f"q{i}") for i in range(3)))
+    await tracker.aclose()
+
+    assert all(len(r) == 1 for r in results)
+    assert max(peak) == 3
+
+
+@pytest.mark.asyncio
+async def test_adapter_aio_awaits_from_another_loop():
+    """API 的 event loop 透過 aio 代理呼叫，實際請求在 tracker 專屬 loop 執行"""
+    tracker = _tracker(_json_handler(MOCK_PRODUCT_RESPONSE))
+    snapshot = await tracker.aio.fetch_price("A")
+    # 同一個 tracker 也可從同步端使用
+    assert (await asyncio.to_thread(tracker.fetch_price, "B")).price == snapshot.price
+    tracker.close()
@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import Session
+
+from src.db.database import Base, upgrade_schema
+from src.models.flash_deal import FlashDeal
+from src.models.price_history import PriceHistory
+from src.models.tracked_product import TrackedProduct
+from src.trackers.polling import (
+    DEFAULT_INTERVAL,
+    MAX_INTERVAL,
+    MIN_INTERVAL,
+    compute_poll_interval,
+    count_price_changes,
+    get_due_products,
+    schedule_next_checks,
+)
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _make_tracked(db, product_id="A", **kwargs):
+    product = TrackedProduct(
+        platform="pchome", product_id=product_id, name=product_id,
+        url=f"https://24h.pchome.com.tw/prod/{product_id}", **kwargs,
+    )
+    product.created_at = NOW - timedelta(days=30)
+    db.add(product)
+    db.flush()
+    return product
+
+
+def test_interval_flash_deal_is_minimum():
+    assert compute_poll_interval(0, 7, in_flash_deal=True) == MIN_INTERVAL
+
+
+def test_interval_new_product_uses_default():
+    assert compute_poll_interval(5, 0.5) == DEFAULT_INTERVAL
+
+
+def test_interval_by_volatility():
+    assert compute_poll_interval(0, 7) == MAX_INTERVAL
+    assert compute_poll_interval(1, 7) == timedelta(hours=2)
+    assert compute_poll_interval(3, 7) == timedelta(minutes=30)
+    assert compute_poll_interval(14, 7) == timedelta(minutes=15)
+
+
+def test_interval_near_target_price():
+    # 價格穩定但離目標價不到 5%
+    assert compute_poll_interval(0, 7, current_price=1030, target_price=1000) == timedelta(
+        minutes=15
+    )
+    assert compute_poll_interval(0, 7, current_price=1200, target_price=1000) == MAX_INTERVAL
+
+
+def test_due_products(db):
+    due = _make_tracked(db, "DUE", next_check_at=NOW - timedelta(minutes=1))
+    never = _make_tracked(db, "NEVER")
+    _make_tracked(db, "LATER", next_check_at=NOW + timedelta(hours=1))
+    _make_tracked(db, "INACTIVE", is_active=False)
+
+    assert {p.id for p in get_due_products(db, NOW)} == {due.id, never.id}
+
+
+def test_count_price_changes(db):
+    product = _make_tracked(db)
+    for hours_ago, price in [(200, 900), (48, 1000), (36, 1000), (24, 950), (12, 1000)]:
+        db.add(PriceHistory(
+            product_id=product.id, price=price, snapshot_at=NOW - timedelta(hours=hours_ago),
+        ))
+    db.flush()
+
+    # 200 小時前的紀錄在 7 天窗外，不列入
+    assert count_price_changes(db, [product.id], NOW - timedelta(days=7)) == {product.id: 2}
+
+
+def test_schedule_next_checks(db):
+    stable = _make_tracked(db, "STABLE")
+    on_sale = _make_tracked(db, "SALE")
+    deal = FlashDeal(
+        platform="pchome", product_name="SALE", product_url=on_sale.url,
+        sale_price=100, end_at=NOW + timedelta(hours=2),
+    )
+    db.add(deal)
+    db.flush()
+
+    schedule_next_checks(db, [(stable, 1000), (on_sale, 100)], NOW)
+
+    assert stable.next_check_at == NOW + MAX_INTERVAL
+    assert stable.poll_interval_minutes == 360
+    assert on_sale.next_check_at == NOW + MIN_INTERVAL
+
+
+def test_upgrade_schema_adds_polling_columns_to_old_table():
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as connection:
+        # 加入輪詢欄位前的資料表
+        connection.execute(text(
+            "CREATE TABLE tracked_products (id INTEGER PRIMARY KEY, platform VARCHAR(20) NOT NULL, "
+            "product_id VARCHAR(100) NOT NULL, name VARCHAR(255) NOT NULL, "
+            "url VARCHAR(500) NOT NULL, target_price INTEGER, is_active BOOLEAN, "
+            "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+        ))
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        upgrade_schema(connection)
+        upgrade_schema(connection)  # 重複執行不會再加欄位
+        inspector = inspect(connection)
+        columns = {c["name"] for c in inspector.get_columns("tracked_products")}
+        indexes = {i["name"] for i in inspector.get_indexes("tracked_products")}
+
+    assert {"poll_interval_minutes", "next_check_at"} <= columns
+    assert "ix_tracked_products_due" in indexes
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, inspect, text
+
+from src.db.database import Base, upgrade_schema
+from src.models.price_history import PriceHistory
+from src.trackers.history import (
+    PricePoint,
+    downsample_lttb,
+    expand_price_runs,
+    to_columnar,
+)
+
+T0 = datetime(2026, 3, 1)
+
+
+def test_expand_price_runs_clamps_to_range():
+    rows = [
+        PriceHistory(price=1000, snapshot_at=T0, last_seen_at=T0 + timedelta(days=10)),
+        PriceHistory(price=900, snapshot_at=T0 + timedelta(days=11)),
+    ]
+    points = expand_price_runs(rows, start=T0 + timedelta(days=2), end=T0 + timedelta(days=5))
+    assert [(p.price, p.snapshot_at) for p in points] == [
+        (1000, T0 + timedelta(days=2)),
+        (1000, T0 + timedelta(days=5)),
+    ]
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    prices = [1000] * 500
+    prices[123] = 500  # 短暫特價
+    points = [
+        PricePoint(price=price, snapshot_at=T0 + timedelta(hours=i))
+        for i, price in enumerate(prices)
+    ]
+    sampled = downsample_lttb(points, 50)
+
+    assert len(sampled) == 50
+    assert sampled[0] is points[0]
+    assert sampled[-1] is points[-1]
+    assert any(p.price == 500 for p in sampled)
+
+
+def test_lttb_small_inputs():
+    points = [PricePoint(price=i, snapshot_at=T0 + timedelta(hours=i)) for i in range(5)]
+    assert downsample_lttb(points, 10) == points
+    assert downsample_lttb(points, 2) == [points[0], points[-1]]
+
+
+def test_to_columnar():
+    points = [PricePoint(price=100, snapshot_at=T0, original_price=120)]
+    assert to_columnar(points) == {
+        "ts": ["2026-03-01T00:00:00"],
+        "price": [100],
+        "original_price": [120],
+        "in_stock": [True],
+    }
+
+
+def test_upgrade_schema_adds_last_seen_at_to_old_table():
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as connection:
+        # 變動才寫入模式前的資料表
+        connection.execute(text(
+            "CREATE TABLE price_history (id INTEGER PRIMARY KEY, product_id INTEGER NOT NULL, "
+            "price INTEGER NOT NULL, original_price INTEGER, in_stock BOOLEAN, "
+            "snapshot_at DATETIME NOT NULL, source VARCHAR(20))"
+        ))
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        upgrade_schema(connection)
+        inspector = inspect(connection)
+        columns = {c["name"] for c in inspector.get_columns("price_history")}
+        indexes = {i["name"] for i in inspector.get_indexes("price_history")}
+
+    assert "last_seen_at" in columns
+    assert "ix_price_history_product_time" in indexes
@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from src.db.database import Base
+from src.models.price_history import PriceHistory
+from src.models.price_rollup import PriceRollup
+from src.models.tracked_product import TrackedProduct
+from src.trackers.rollups import (
+    backfill_rollups,
+    choose_grain,
+    rollup_query,
+    summarize_rollups,
+    update_rollups,
+)
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def product(db):
+    product = TrackedProduct(
+        platform="pchome", product_id="A", name="A", url="https://24h.pchome.com.tw/prod/A"
+    )
+    db.add(product)
+    db.flush()
+    return product
+
+
+def _rollups(db, grain):
+    return db.scalars(
+        select(PriceRollup).where(PriceRollup.grain == grain).order_by(PriceRollup.bucket_start)
+    ).all()
+
+
+def test_update_rollups_aggregates_bucket(db, product):
+    update_rollups(db, [
+        (product.id, 1000, NOW),
+        (product.id, 900, NOW + timedelta(minutes=30)),
+    ])
+    # 較晚寫入但時間較早的觀測值不影響 last_price
+    update_rollups(db, [
+        (product.id, 1100, NOW + timedelta(minutes=10)),
+        (product.id, 950, NOW + timedelta(hours=2)),
+    ])
+
+    hourly = _rollups(db, "hour")
+    assert [(r.bucket_start.hour, r.sample_count) for r in hourly] == [(12, 3), (14, 1)]
+    first = hourly[0]
+    assert (first.min_price, first.max_price, first.last_price) == (900, 1100, 900)
+    assert first.avg_price == 1000
+
+    (daily,) = _rollups(db, "day")
+    assert daily.bucket_start == datetime(2026, 3, 1)
+    assert (daily.min_price, daily.max_price, daily.sample_count) == (900, 1100, 4)
+    assert daily.last_price == 950
+
+
+def test_choose_grain():
+    assert choose_grain(timedelta(days=90), 60) == "day"
+    assert choose_grain(timedelta(days=7), 100) == "hour"
+    assert choose_grain(timedelta(hours=6), 100) is None
+    assert choose_grain(timedelta(days=30)) == "day"
+
+
+def test_backfill_rebuilds_from_history(db, product):
+    db.add_all([
+        PriceHistory(
+            product_id=product.id, price=1000,
+            snapshot_at=NOW - timedelta(days=2), last_seen_at=NOW - timedelta(days=1),
+        ),
+        PriceHistory(product_id=product.id, price=800, snapshot_at=NOW),
+    ])
+    update_rollups(db, [(product.id, 1, NOW)])  # 舊的錯誤資料會被清除
+
+    assert backfill_rollups(db) == 3
+
+    daily = _rollups(db, "day")
+    assert [(r.min_price, r.sample_count) for r in daily] == [(1000, 1), (1000, 1), (800, 1)]
+    summary = summarize_rollups(
+        db.scalars(rollup_query(product.id, "day", NOW - timedelta(days=30))).all()
+    )
+    assert summary == {
+        "min_price": 800, "max_price": 1000, "avg_price": 933.33, "last_price": 800,
+    }
+
+
+def test_summarize_empty():
+    assert summarize_rollups([])["min_price"] is None
@@ -0,0 +1,210 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from src.db.database import Base, upgrade_schema
+from src.models.notification_log import NotificationType
+from src.models.price_history import PriceHistory
+from src.models.tracked_product import TrackedProduct
+from src.trackers.base import PriceSnapshot
+from src.trackers.polling import get_due_products
+from src.trackers.utils import record_price_snapshots
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _make_tracked(db, platform, product_id, target_price=None):
+    product = TrackedProduct(
+        platform=platform, product_id=product_id, name=f"商品 {product_id}",
+        url=f"https://example.com/{product_id}", target_price=target_price,
+    )
+    db.add(product)
+    db.flush()
+    return product
+
+
+def _mock_tracker(prices):
+    tracker = MagicMock()
+    tracker.fetch_prices.side_effect = lambda ids: {
+        pid: PriceSnapshot(price=prices[pid]) if pid in prices else None for pid in ids
+    }
+    return tracker
+
+
+def test_record_price_snapshots_detects_drop_and_target(db):
+    a = _make_tracked(db, "pchome", "A")
+    b = _make_tracked(db, "pchome", "B", target_price=500)
+    db.add_all([
+        PriceHistory(product_id=a.id, price=1200),
+        PriceHistory(product_id=a.id, price=1000),
+    ])
+    db.commit()
+
+    results = record_price_snapshots(
+        db, [(a, PriceSnapshot(price=900)), (b, PriceSnapshot(price=480))]
+    )
+
+    assert results[0].is_price_drop is True  # 相對最近一筆 1000
+    assert results[0].is_target_reached is False
+    assert results[1].is_price_drop is False  # 沒有歷史紀錄
+    assert results[1].is_target_reached is True
+    assert db.query(PriceHistory).count() == 4
+
+
+@patch("src.scheduler.jobs.NotificationDispatcher")
+@patch("src.scheduler.jobs.get_sync_session")
+def test_price_tracking_fetches_per_platform_and_batches_alerts(
+    mock_get_session, mock_dispatcher_cls, db
+):
+    mock_get_session.return_value.__enter__ = MagicMock(return_value=db)
+    mock_get_session.return_value.__exit__ = MagicMock(return_value=False)
+
+    p1 = _make_tracked(db, "pchome", "P1", target_price=100)
+    p2 = _make_tracked(db, "pchome", "P2", target_price=100)
+    _make_tracked(db, "pchome", "P3")
+    m1 = _make_tracked(db, "momo", "M1", target_price=100)
+    db.commit()
+
+    trackers = {
+        "pchome": _mock_tracker({"P1": 90, "P2": 95}),  # P3 抓取失敗
+        "momo": _mock_tracker({"M1": 80}),
+    }
+
+    from src.scheduler.jobs import run_price_tracking
+
+    with patch("src.trackers.utils.get_tracker", side_effect=trackers.get):
+        run_price_tracking()
+
+    for tracker in trackers.values():
+        tracker.fetch_prices.assert_called_once()
+        # tracker 由 registry 共用，任務結束後不應被關閉
+        tracker.close.assert_not_called()
+    assert trackers["pchome"].fetch_prices.call_args[0][0] == ["P1", "P2", "P3"]
+
+    assert db.query(PriceHistory).count() == 3
+
+    # 三筆達到目標價的通知合併為一次 dispatch
+    dispatch = mock_dispatcher_cls.return_value.dispatch
+    dispatch.assert_called_once()
+    notification_type, reference_ids, message = dispatch.call_args[0]
+    assert notification_type == NotificationType.target_price_reached
+    assert len(reference_ids) == 3
+    assert len(message["discord_embeds"]) == 3
+    assert {p1.id, p2.id, m1.id} == {
+        h.product_id for h in db.query(PriceHistory).filter(PriceHistory.id.in_(reference_ids))
+    }
+
+
+def test_record_price_snapshots_unchanged_extends_last_row(db):
+    product = _make_tracked(db, "pchome", "A")
+    prior = PriceHistory(product_id=product.id, price=1000, in_stock=True)
+    db.add(prior)
+    db.commit()
+
+    results = record_price_snapshots(db, [(product, PriceSnapshot(price=1000))])
+
+    assert db.query(PriceHistory).count() == 1
+    assert results[0].snapshot.id == prior.id
+    assert prior.last_seen_at is not None
+
+    # 庫存改變也算變動
+    record_price_snapshots(db, [(product, PriceSnapshot(price=1000, in_stock=False))])
+    assert db.query(PriceHistory).count() == 2
+
+
+def test_record_price_snapshots_all_mode_always_inserts(db):
+    product = _make_tracked(db, "pchome", "A")
+    db.add(PriceHistory(product_id=product.id, price=1000, in_stock=True))
+    db.commit()
+
+    settings = MagicMock(price_history_mode="all")
+    with patch("src.trackers.utils.get_settings", return_value=settings):
+        record_price_snapshots(db, [(product, PriceSnapshot(price=1000))])
+
+    assert db.query(PriceHistory).count() == 2
+
+
+def test_record_price_snapshots_maintains_denormalized_prices(db):
+    product = _make_tracked(db, "pchome", "A")
+    t1, t2, t3 = datetime(2026, 3, 1), datetime(2026, 3, 2), datetime(2026, 3, 3)
+
+    record_price_snapshots(db, [(product, PriceSnapshot(price=1000))], now=t1)
+    results = record_price_snapshots(db, [(product, PriceSnapshot(price=800))], now=t2)
+    assert results[0].is_price_drop is True
+    results = record_price_snapshots(db, [(product, PriceSnapshot(price=900))], now=t3)
+    assert results[0].is_price_drop is False
+
+    assert (product.last_price, product.last_checked_at) == (900, t3)
+    assert (product.lowest_price, product.lowest_price_at) == (800, t2)
+
+
+def test_record_price_snapshots_seeds_lowest_price_from_history(db):
+    """欄位新增前就在追蹤的商品，歷史最低價由既有 price_history 補上"""
+    product = _make_tracked(db, "pchome", "A")
+    old_low = datetime(2025, 11, 11)
+    db.add_all([
+        PriceHistory(product_id=product.id, price=700, snapshot_at=old_low),
+        PriceHistory(product_id=product.id, price=700, snapshot_at=datetime(2025, 12, 1)),
+        PriceHistory(product_id=product.id, price=1000, snapshot_at=datetime(2026, 2, 1)),
+    ])
+    db.commit()
+
+    record_price_snapshots(db, [(product, PriceSnapshot(price=900))], now=datetime(2026, 3, 1))
+
+    assert (product.lowest_price, product.lowest_price_at) == (700, old_low)
+    assert product.last_price == 900
+
+
+def test_record_price_snapshots_on_upgraded_database():
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as connection:
+        # 最早版本的資料表：沒有輪詢、最後價格與 last_seen_at 欄位
+        connection.execute(text(
+            "CREATE TABLE tracked_products (id INTEGER PRIMARY KEY, platform VARCHAR(20) NOT NULL, "
+            "product_id VARCHAR(100) NOT NULL, name VARCHAR(255) NOT NULL, "
+            "url VARCHAR(500) NOT NULL, target_price INTEGER, is_active BOOLEAN, "
+            "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+        ))
+        connection.execute(text(
+            "CREATE TABLE price_history (id INTEGER PRIMARY KEY, product_id INTEGER NOT NULL, "
+            "price INTEGER NOT NULL, original_price INTEGER, in_stock BOOLEAN, "
+            "snapshot_at DATETIME NOT NULL, source VARCHAR(20))"
+        ))
+        connection.execute(text(
+            "INSERT INTO tracked_products VALUES (1, 'pchome', 'A', 'A', 'https://example.com/A', "
+            "NULL, 1, '2025-11-01 00:00:00', '2025-11-01 00:00:00')"
+        ))
+        connection.execute(text(
+            "INSERT INTO price_history (product_id, price, in_stock, snapshot_at) VALUES "
+            "(1, 700, 1, '2025-11-11 00:00:00'), (1, 1000, 1, '2026-02-01 00:00:00')"
+        ))
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        upgrade_schema(connection)
+
+    with Session(engine) as db:
+        (product,) = get_due_products(db, now=datetime(2026, 3, 1))
+        record_price_snapshots(db, [(product, PriceSnapshot(price=900))], now=datetime(2026, 3, 1))
+
+        assert (product.last_price, product.lowest_price) == (900, 700)
+        assert product.lowest_price_at == datetime(2025, 11, 11)
+
+
+def test_record_price_snapshots_skips_history_lookup_when_price_changed(db):
+    product = _make_tracked(db, "pchome", "A")
+    record_price_snapshots(db, [(product, PriceSnapshot(price=1000))])
+
+    with patch("src.trackers.utils.get_last_snapshots") as mock_lookup:
+        results = record_price_snapshots(db, [(product, PriceSnapshot(price=900))])
+
+    mock_lookup.assert_not_called()
+    assert results[0].is_price_drop is True
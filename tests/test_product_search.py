@@ -0,0 +1,91 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from src.main import app
+from src.trackers.base import ProductResult
+from src.trackers.search import merge_results, relevance_score, search_all_platforms
+from src.trackers.search_cache import SearchCache
+
+
+def _product(platform, name, price=100):
+    return ProductResult(platform=platform, product_id=name, name=name, url=name, price=price)
+
+
+def _tracker(platform, search):
+    tracker = MagicMock()
+    tracker.platform = platform
+    tracker.search_products = AsyncMock(side_effect=search)
+    return tracker
+
+
+def test_relevance_score():
+    exact = relevance_score("AirPods Pro", "Apple AirPods Pro 2")
+    partial = relevance_score("AirPods Pro", "Apple AirPods 3")
+    unrelated = relevance_score("AirPods Pro", "Sony 耳機")
+    assert exact > partial > unrelated == 0
+    # 沒有空白的中文查詢以 bigram 比對
+    assert relevance_score("降噪耳機", "Sony 無線降噪耳機") > relevance_score("降噪耳機", "耳機架")
+
+
+def test_merge_results_orders_by_score_then_rank():
+    merged = merge_results("sony 耳機", {
+        "pchome": [_product("pchome", "耳機架"), _product("pchome", "Sony 耳機 XM5")],
+        "momo": [_product("momo", "SONY 無線耳機")],
+    })
+    assert [(r.product.platform, r.product.name) for r in merged] == [
+        ("pchome", "Sony 耳機 XM5"),
+        ("momo", "SONY 無線耳機"),
+        ("pchome", "耳機架"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_search_all_platforms_returns_partial_results():
+    async def fast(keyword):
+        return [_product("pchome", "Switch OLED")]
+
+    async def slow(keyword):
+        await asyncio.sleep(1)
+        return [_product("momo", "Switch")]
+
+    async def broken(keyword):
+        raise RuntimeError("blocked")
+
+    trackers = {
+        "pchome": _tracker("pchome", fast),
+        "momo": _tracker("momo", slow),
+        "shopee": _tracker("shopee", broken),
+    }
+    with patch("src.trackers.search.get_async_tracker", side_effect=trackers.get), \
+         patch("src.trackers.search.search_cache", SearchCache(ttl=60, stale_ttl=60)):
+        result = await search_all_platforms(
+            "switch", ["pchome", "momo", "shopee", "unknown"], deadline=0.1
+        )
+
+    assert result.platforms == {
+        "pchome": "ok", "momo": "timeout", "shopee": "error", "unknown": "error",
+    }
+    assert result.partial is True
+    assert [r.product.name for r in result.items] == ["Switch OLED"]
+
+
+@pytest.mark.asyncio
+async def test_search_endpoint():
+    async def search(keyword):
+        return [_product("pchome", "iPhone 16 Pro", 36900), _product("pchome", "iPhone 殼", 390)]
+
+    with patch("src.trackers.search.get_async_tracker",
+               return_value=_tracker("pchome", search)), \
+         patch("src.trackers.search.search_cache", SearchCache(ttl=60, stale_ttl=60)), \
+         patch("src.api.products.tracker_registry") as registry:
+        registry.platforms.return_value = ["pchome"]
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            resp = await ac.get("/api/products/search", params={"q": "iphone pro", "limit": 1})
+
+    data = resp.json()
+    assert resp.status_code == 200
+    assert data["partial"] is False
+    assert [(i["platform"], i["name"]) for i in data["items"]] == [("pchome", "iPhone 16 Pro")]
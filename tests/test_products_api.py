@@ -1,9 +1,16 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from src.db.database import Base, get_db
 from src.main import app
+from src.models.flash_deal import FlashDeal
+from src.models.price_history import PriceHistory
+from src.models.tracked_product import TrackedProduct
+from src.trackers.rollups import update_rollups
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
@@ -21,7 +28,7 @@ async def test_db():
             yield session
 
     app.dependency_overrides[get_db] = override_get_db
-    yield
+    yield session_factory
     app.dependency_overrides.clear()
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
@@ -38,10 +45,279 @@ async def test_get_products_empty(test_db):
     assert isinstance(data["items"], list)
 
 
+@pytest.mark.asyncio
+async def test_get_products_returns_denormalized_prices(test_db):
+    async with test_db() as session:
+        session.add(TrackedProduct(
+            platform="pchome", product_id="A", name="A", url="https://24h.pchome.com.tw/prod/A",
+            last_price=1200, last_checked_at=datetime(2026, 3, 2),
+            lowest_price=990, lowest_price_at=datetime(2026, 2, 14),
+        ))
+        await session.commit()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.get("/api/products")
+    (item,) = resp.json()["items"]
+    assert (item["current_price"], item["lowest_price"]) == (1200, 990)
+    assert item["lowest_price_at"] == "2026-02-14T00:00:00"
+
+
 @pytest.mark.asyncio
 async def test_get_flash_deals_empty(test_db):
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         resp = await ac.get("/api/flash-deals")
     assert resp.status_code == 200
     data = resp.json()
-    assert isinstance(data, list)
+    assert data == {"items": [], "next_cursor": None}
+
+
+@pytest.mark.asyncio
+async def test_price_history_expands_runs(test_db):
+    async with test_db() as session:
+        product = TrackedProduct(
+            platform="pchome", product_id="A", name="A", url="https://24h.pchome.com.tw/prod/A"
+        )
+        session.add(product)
+        await session.flush()
+        session.add_all([
+            PriceHistory(
+                product_id=product.id, price=1000,
+                snapshot_at=datetime(2026, 3, 1), last_seen_at=datetime(2026, 3, 5),
+            ),
+            PriceHistory(product_id=product.id, price=900, snapshot_at=datetime(2026, 3, 6)),
+        ])
+        await session.commit()
+        product_id = product.id
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.get(f"/api/products/{product_id}/history")
+    data = resp.json()
+    assert [(d["price"], d["snapshot_at"][:10]) for d in data] == [
+        (1000, "2026-03-01"),
+        (1000, "2026-03-05"),
+        (900, "2026-03-06"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_price_history_range_downsample_columnar(test_db):
+    async with test_db() as session:
+        product = TrackedProduct(
+            platform="pchome", product_id="B", name="B", url="https://24h.pchome.com.tw/prod/B"
+        )
+        session.add(product)
+        await session.flush()
+        session.add_all([
+            PriceHistory(
+                product_id=product.id, price=1000 + (i % 7) * 10,
+                snapshot_at=datetime(2026, 1, 1) + timedelta(hours=i),
+            )
+            for i in range(24 * 20)
+        ])
+        await session.commit()
+        product_id = product.id
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.get(
+            f"/api/products/{product_id}/history",
+            params={
+                "from": "2026-01-05T00:00:00",
+                "to": "2026-01-10T23:59:59",
+                "max_points": 40,
+                "format": "columnar",
+            },
+        )
+    data = resp.json()
+    assert resp.status_code == 200
+    assert len(data["ts"]) == len(data["price"]) == 40
+    assert data["ts"][0] == "2026-01-05T00:00:00"
+    assert data["ts"][-1] == "2026-01-10T23:00:00"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [
+    {"from": "2026-01-02T00:00:00Z", "to": "2026-01-02T08:00:00+08:00"},
+    {"from": "2026-01-02T00:00:00Z", "to": "2026-01-02T08:00:00+08:00", "max_points": 100},
+])
+async def test_price_history_accepts_timezone_aware_range(test_db, params):
+    async with test_db() as session:
+        product = TrackedProduct(
+            platform="pchome", product_id="Z", name="Z", url="https://24h.pchome.com.tw/prod/Z"
+        )
+        session.add(product)
+        await session.flush()
+        session.add_all([
+            PriceHistory(
+                product_id=product.id, price=1000 + i,
+                snapshot_at=datetime(2026, 1, 1) + timedelta(hours=i),
+            )
+            for i in range(72)
+        ])
+        await session.commit()
+        product_id = product.id
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        resp = await ac.get(f"/api/products/{product_id}/history", params=params)
+
+    assert resp.status_code == 200
+    # 兩端皆為 2026-01-02 00:00 UTC
+    assert [(d["price"], d["snapshot_at"]) for d in resp.json()] == [
+        (1024, "2026-01-02T00:00:00")
+    ]
+
+
+@pytest.mark.asyncio
+async def test_price_stats_and_history_from_rollups(test_db):
+    now = datetime.utcnow().replace(microsecond=0)
+    async with test_db() as session:
+        product = TrackedProduct(
+            platform="pchome", product_id="C", name="C", url="https://24h.pchome.com.tw/prod/C"
+        )
+        session.add(product)
+        await session.flush()
+        observations = [
+            (product.id, 500 + (i % 3) * 100, now - timedelta(hours=i)) for i in range(72)
+        ]
+        await session.run_sync(lambda s: update_rollups(s, observations))
+        await session.commit()
+        product_id = product.id
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        stats = (await ac.get(f"/api/products/{product_id}/stats", params={"days": 7})).json()
+        history = (await ac.get(
+            f"/api/products/{product_id}/history",
+            params={"from": (now - timedelta(days=7)).isoformat(), "max_points": 7},
+        )).json()
+
+    assert stats["grain"] == "day"
+    assert (stats["min_price"], stats["max_price"], stats["avg_price"]) == (500, 700, 600)
+    assert stats["last_price"] == 500
+    # 7 天 / 7 點 → 每日 rollup（每日最多最低與最後兩點），原始資料中沒有 price_history
+    assert 3 <= len(history) <= 7
+    assert min(point["price"] for point in history) == 500
+
+
+@pytest.mark.asyncio
+async def test_stats_fill_leading_partial_day_from_hours(test_db):
+    now = datetime(2026, 3, 2, 12, 0)
+    async with test_db() as session:
+        product = TrackedProduct(
+            platform="pchome", product_id="F", name="F", url="https://24h.pchome.com.tw/prod/F"
+        )
+        session.add(product)
+        await session.flush()
+        observations = [
+            (product.id, 100, datetime(2026, 3, 1, 6, 0)),  # 超過 24 小時
+            (product.id, 400, datetime(2026, 3, 1, 13, 0)),  # 前一個 UTC 日，但在 24 小時內
+            (product.id, 800, datetime(2026, 3, 2, 8, 0)),
+        ]
+        await session.run_sync(lambda s: update_rollups(s, observations))
+        await session.commit()
+        product_id = product.id
+
+    with patch("src.api.products.utcnow", return_value=now):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            stats = (await ac.get(f"/api/products/{product_id}/stats", params={"days": 1})).json()
+
+    assert (stats["min_price"], stats["max_price"], stats["last_price"]) == (400, 800, 800)
+    assert stats["avg_price"] == 600
+
+
+@pytest.mark.asyncio
+async def test_history_without_from_reads_rollups(test_db):
+    now = datetime.utcnow().replace(microsecond=0)
+    async with test_db() as session:
+        product = TrackedProduct(
+            platform="pchome", product_id="E", name="E", url="https://24h.pchome.com.tw/prod/E"
+        )
+        session.add(product)
+        await session.flush()
+        observations = [(product.id, 900 + i % 5, now - timedelta(hours=i)) for i in range(24 * 60)]
+        await session.run_sync(lambda s: update_rollups(s, observations))
+        await session.commit()
+        product_id = product.id
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        data = (await ac.get(
+            f"/api/products/{product_id}/history",
+            params={"max_points": 300, "format": "columnar"},
+        )).json()
+
+    # 圖表只帶 max_points：資料跨度由 rollup 推得，沒有原始 price_history 仍有資料
+    assert 0 < len(data["ts"]) <= 300
+    assert data["ts"][0] <= (now - timedelta(days=59)).isoformat()
+
+
+@pytest.mark.asyncio
+async def test_rollup_history_keeps_intra_bucket_dip_and_stats_stay_in_range(test_db):
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    async with test_db() as session:
+        product = TrackedProduct(
+            platform="pchome", product_id="D", name="D", url="https://24h.pchome.com.tw/prod/D"
+        )
+        session.add(product)
+        await session.flush()
+        observations = [(product.id, 1000, today - timedelta(days=d)) for d in range(1, 30)]
+        # 10 天前中午限時特賣跌到 600，當天傍晚回到 1000
+        dip_day = today - timedelta(days=10)
+        observations += [
+            (product.id, 600, dip_day + timedelta(hours=12)),
+            (product.id, 1000, dip_day + timedelta(hours=18)),
+        ]
+        # 範圍起點之前、同一個 UTC 日內的低價不應計入 7 天統計
+        observations.append((product.id, 100, today - timedelta(days=7, hours=-1)))
+        await session.run_sync(lambda s: update_rollups(s, observations))
+        await session.commit()
+        product_id = product.id
+
+    # 固定在當天中午查詢，範圍起點落在 7 天前的 12:00
+    with patch("src.api.products.utcnow", return_value=today + timedelta(hours=12)):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            history = (await ac.get(
+                f"/api/products/{product_id}/history",
+                params={"from": (today - timedelta(days=30)).isoformat(), "max_points": 20},
+            )).json()
+            stats = (await ac.get(
+                f"/api/products/{product_id}/stats", params={"days": 7}
+            )).json()
+
+    assert 600 in [point["price"] for point in history]
+    assert len(history) <= 20
+    assert stats["bucket_timezone"] == "UTC"
+    assert stats["min_price"] == 1000
+
+
+@pytest.mark.asyncio
+async def test_flash_deals_active_only_with_cursor(test_db):
+    now = datetime.utcnow()
+    async with test_db() as session:
+        session.add_all([
+            FlashDeal(
+                platform="pchome", product_name=f"D{i}",
+                product_url=f"https://24h.pchome.com.tw/prod/D{i}",
+                sale_price=100, discount_rate=0.5 + i / 100, end_at=now + timedelta(hours=1),
+            )
+            for i in range(5)
+        ] + [
+            FlashDeal(
+                platform="pchome", product_name="ENDED",
+                product_url="https://24h.pchome.com.tw/prod/ENDED",
+                sale_price=100, discount_rate=0.1, end_at=now - timedelta(hours=1),
+            )
+        ])
+        await session.commit()
+
+    names, cursor = [], None
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        for _ in range(3):
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            data = (await ac.get("/api/flash-deals", params=params)).json()
+            names += [d["product_name"] for d in data["items"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        bad = await ac.get("/api/flash-deals", params={"cursor": "garbage"})
+
+    assert names == ["D0", "D1", "D2", "D3", "D4"]
+    assert cursor is None
+    assert bad.status_code == 400
@@ -0,0 +1,115 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.db.database import Base
+from src.models import Bank, CreditCard, Promotion
+from src.recommender.catalog import CatalogSnapshot, CatalogStore
+from src.recommender.engine import RecommendationEngine, RecommendRequest
+
+PROFILES = [
+    {"spending_habits": {"dining": 0.6, "online_shopping": 0.4}, "monthly_amount": 30000},
+    {"spending_habits": {"overseas": 1.0}, "monthly_amount": 80000, "limit": 2},
+    {"spending_habits": {"dining": 1.0}, "monthly_amount": 5000,
+     "preferences": ["no_annual_fee"], "limit": 10},
+]
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        bank = Bank(name="測試銀行", code="test")
+        session.add(bank)
+        session.flush()
+        specs = [
+            (0, 1.0, "dining", 3.0, None),
+            (1800, 1.5, "overseas", 4.0, 500),
+            (0, 1.0, "online_shopping", 5.0, 200),
+            (3000, 2.0, "dining", 6.0, None),
+            (0, 1.0, "dining", 3.0, None),  # 與第一張同分
+        ]
+        for i, (fee, base, category, rate, limit) in enumerate(specs):
+            card = CreditCard(bank_id=bank.id, name=f"卡片{i}", annual_fee=fee,
+                              base_reward_rate=base)
+            session.add(card)
+            session.flush()
+            session.add(Promotion(card_id=card.id, title=f"優惠{i}", category=category,
+                                  reward_rate=rate, reward_limit=limit))
+        session.commit()
+    return engine
+
+
+def _requests():
+    return [RecommendRequest(preferences=[], **profile) if "preferences" not in profile
+            else RecommendRequest(**profile) for profile in PROFILES]
+
+
+def test_recommend_many_matches_recommend(engine):
+    with Session(engine) as session:
+        snapshot = CatalogSnapshot.load(session)
+    recommender = RecommendationEngine(catalog=snapshot)
+
+    batch = recommender.recommend_many(_requests())
+
+    for request, results in zip(_requests(), batch):
+        expected = recommender.recommend(request)
+        assert [r.card.id for r in results] == [r.card.id for r in expected]
+        assert [r.score for r in results] == pytest.approx([r.score for r in expected])
+        assert [r.estimated_monthly_reward for r in results] == [
+            r.estimated_monthly_reward for r in expected
+        ]
+        assert all(r.reasons == [] for r in results)
+    # 免年費偏好排除有年費且無減免的卡
+    assert len(batch[2]) == 3
+    assert recommender.recommend_many([]) == []
+
+
+@pytest.mark.parametrize("accept,threshold", [
+    ("application/json", 200),
+    ("application/x-ndjson", 200),
+    ("application/json", 1),
+])
+async def test_batch_api_json_and_ndjson(engine, accept, threshold):
+    from src.config import get_settings
+    from src.main import app
+
+    store = CatalogStore(sessionmaker(bind=engine))
+    store.current()  # 記憶體資料庫只存在於目前連線，先在此建好快照
+    settings = get_settings()
+    with patch("src.api.recommend.catalog_store", store), \
+            patch.object(settings, "recommend_batch_stream_threshold", threshold), \
+            patch.object(settings, "recommend_batch_chunk_size", 2):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/recommend/batch", json={"profiles": PROFILES},
+                headers={"accept": accept},
+            )
+
+    assert response.status_code == 200
+    if response.headers["content-type"].startswith("application/x-ndjson"):
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["index"] for line in lines] == [0, 1, 2]
+        results = lines
+    else:
+        assert threshold == 200 and accept == "application/json"
+        results = response.json()["results"]
+    assert [len(r["recommendations"]) for r in results] == [5, 2, 3]
+    assert results[0]["recommendations"][0]["rank"] == 1
+
+
+async def test_batch_api_rejects_too_many_profiles():
+    from src.config import get_settings
+    from src.main import app
+
+    with patch.object(get_settings(), "recommend_batch_max_profiles", 2):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/recommend/batch", json={"profiles": PROFILES})
+    assert response.status_code == 413
@@ -0,0 +1,92 @@
+from unittest.mock import AsyncMock, patch
+
+from httpx import ASGITransport, AsyncClient
+
+from src.recommender.cache import RecommendationCache, request_key
+from src.recommender.engine import RecommendRequest
+
+
+def _request(spending, amount=30000, preferences=(), limit=5):
+    return RecommendRequest(
+        spending_habits=spending, monthly_amount=amount, preferences=list(preferences),
+        limit=limit,
+    )
+
+
+def test_request_key_quantizes_and_sorts():
+    a = _request({"online_shopping": 0.301, "dining": 0.699}, 30100, ["no_annual_fee", "cashback"])
+    b = _request({"dining": 0.7, "online_shopping": 0.298}, 30200, ["cashback", "no_annual_fee"])
+
+    assert request_key(a, 0.01) == request_key(b, 0.01)
+    assert request_key(a, 0.01)[0] == (("dining", 0.7), ("online_shopping", 0.3))
+    # 不同 limit 是不同結果
+    assert request_key(a, 0.01) != request_key(_request(a.spending_habits, 30100, limit=3), 0.01)
+
+
+def test_request_key_groups_amounts_by_relative_width():
+    def key(amount):
+        return request_key(_request({"dining": 1.0}, amount), 0.01)[1]
+
+    # 小金額不會被併入大一號的金額
+    assert len({key(amount) for amount in (100, 300, 600, 1000)}) == 4
+    assert key(30000) == key(30200)
+    assert key(30000) != key(31000)
+    assert key(0) == 0 and key(1) == 1
+
+
+def test_cache_lru_ttl_and_version():
+    now = [0.0]
+    cache = RecommendationCache(ttl=60, max_entries=2, amount_tolerance=0.01, clock=lambda: now[0])
+    first, second, third = (
+        _request({"dining": 1.0}, amount) for amount in (10000, 20000, 30000)
+    )
+
+    cache.put(first, 0, "a")
+    cache.put(second, 0, "b")
+    assert cache.get(first, 0) == "a"
+    cache.put(third, 0, "c")  # 擠掉最久沒用的 second
+    assert cache.get(second, 0) is None
+    assert cache.get(first, 0) == "a"
+
+    now[0] = 61
+    assert cache.get(first, 0) is None
+
+    cache.put(first, 0, "a")
+    assert cache.get(first, 1) is None  # 目錄版本變動，整個快取失效
+    cache.put(first, 0, "stale")  # 以舊版本算出的結果不寫入
+    assert cache.get(first, 1) is None
+    assert cache.stats() == {
+        "hits": 2, "misses": 4, "invalidations": 1, "entries": 0, "version": 1,
+    }
+
+
+async def test_recommend_api_serves_nearby_requests_from_cache():
+    from src.main import app
+    from src.recommender.catalog import catalog_store
+
+    cache = RecommendationCache(ttl=60, max_entries=10, amount_tolerance=0.01)
+    run = AsyncMock(return_value={"recommendations": []})
+    with patch("src.api.recommend.recommendation_cache", cache), \
+            patch("src.api.recommend.recommend_executor.run", run):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            for amount in (30200, 30100):
+                response = await client.post(
+                    "/api/recommend",
+                    json={"spending_habits": {"online_shopping": 0.4, "dining": 0.6},
+                          "monthly_amount": amount},
+                )
+                assert response.status_code == 200
+            catalog_store.invalidate()
+            await client.post(
+                "/api/recommend",
+                json={"spending_habits": {"online_shopping": 0.4, "dining": 0.6},
+                      "monthly_amount": 30000},
+            )
+
+    assert run.await_count == 2
+    # 以呼叫端原本的請求計算，類別順序不變
+    computed = run.await_args_list[0].args[1]
+    assert computed.monthly_amount == 30200
+    assert list(computed.spending_habits) == ["online_shopping", "dining"]
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from src.recommender.executor import (
+    RecommendBusyError,
+    RecommendExecutor,
+    RecommendTimeoutError,
+)
+
+
+async def test_runs_on_dedicated_pool_without_blocking_loop():
+    executor = RecommendExecutor(max_workers=2, max_concurrency=2, timeout=2)
+    ticks = []
+
+    async def ticker():
+        for _ in range(3):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    def slow():
+        time.sleep(0.1)
+        return threading.current_thread().name
+
+    name, _ = await asyncio.gather(executor.run(slow), ticker())
+
+    assert name.startswith("recommend")
+    assert len(ticks) == 3
+    assert executor.stats()["completed"] == 1
+    executor.shutdown()
+
+
+async def test_rejects_when_concurrency_limit_reached():
+    executor = RecommendExecutor(max_workers=2, max_concurrency=1, timeout=0.05)
+    release = threading.Event()
+    first = asyncio.ensure_future(executor.run(release.wait))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(RecommendBusyError):
+        await executor.run(lambda: "never")
+    # 第一個請求同樣受期限限制
+    with pytest.raises(RecommendTimeoutError):
+        await first
+
+    release.set()
+    assert executor.stats()["rejected"] == 1
+    assert executor.stats()["timeouts"] == 1
+    executor.shutdown()
+
+
+async def test_timeout_keeps_slot_until_work_finishes():
+    executor = RecommendExecutor(max_workers=1, max_concurrency=1, timeout=0.05)
+    release = threading.Event()
+
+    with pytest.raises(RecommendTimeoutError):
+        await executor.run(release.wait)
+    assert executor.stats()["in_flight"] == 1
+
+    release.set()
+    await asyncio.sleep(0.05)
+    assert executor.stats()["in_flight"] == 0
+    assert await executor.run(lambda: 42) == 42
+    executor.shutdown()
+
+
+@pytest.mark.parametrize("error,status", [
+    (RecommendBusyError(), 503),
+    (RecommendTimeoutError(), 504),
+])
+async def test_recommend_api_maps_executor_errors(error, status):
+    from src.main import app
+
+    with patch("src.api.recommend.recommend_executor.run", AsyncMock(side_effect=error)):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/recommend",
+                json={"spending_habits": {"dining": 1.0}, "monthly_amount": 30000},
+            )
+    assert response.status_code == status
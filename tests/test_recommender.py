@@ -425,6 +425,7 @@ def test_generate_reasons_roi_reason():
         "feature_score": 50,
         "promotion_score": 0,
         "annual_fee_roi_score": 70,
+        "monthly_reward": 1500,
     }
     reasons = engine._generate_reasons(card, request, scores, [])
     assert any("年費" in r and "回饋" in r for r in reasons)
@@ -649,11 +650,11 @@ def test_engine_estimate_reward_respects_limit(db_session):
     db_session.commit()
 
     engine = RecommendationEngine(db_session)
-    reward = engine._estimate_monthly_reward(
-        card,
-        spending_habits={"dining": 1.0},
-        monthly_amount=30000,
-        promotions=[promo],
+    results = engine.recommend(
+        RecommendRequest(
+            spending_habits={"dining": 1.0}, monthly_amount=30000, preferences=[], limit=10
+        )
     )
+    reward = next(r.estimated_monthly_reward for r in results if r.card.id == card.id)
     # Without limit: 30000 * 10% = 3000, capped to 500
     assert reward == 500.0
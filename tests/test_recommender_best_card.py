@@ -0,0 +1,103 @@
+import random
+from unittest.mock import patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from src.models import Bank, CreditCard, Promotion
+from src.recommender.best_card import BestCardIndex
+from src.recommender.catalog import CatalogSnapshot
+from src.recommender.matrix import RewardMatrix
+from src.recommender.scoring import calculate_shopping_reward
+
+
+def _snapshot(n, seed):
+    rnd = random.Random(seed)
+    bank = Bank(id=1, name="測試銀行", code="test")
+    cards, promotions = [], {}
+    for i in range(n):
+        card = CreditCard(id=i + 1, bank_id=1, bank=bank, name=f"卡片{i}",
+                          base_reward_rate=rnd.choice([None, 0.5, 1.0, 1.5]))
+        cards.append(card)
+        promotions[card.id] = tuple(
+            Promotion(category=rnd.choice(["online_shopping", "dining"]),
+                      reward_rate=rnd.choice([2.0, 3.0, 5.0, 10.0]),
+                      reward_limit=rnd.choice([None, 0, 100, 200, 500]))
+            for _ in range(rnd.randint(0, 2))
+        )
+    matrix = RewardMatrix(cards, promotions)
+    return CatalogSnapshot(
+        version=0, built_at=0.0, cards=tuple(cards), banks={1: bank},
+        promotions_by_card=promotions, matrix=matrix,
+        shopping_indexes={"online_shopping": BestCardIndex(matrix, "online_shopping")},
+    )
+
+
+def _brute_force(snapshot, platform, amount, top_n):
+    ranked = []
+    for card in snapshot.cards:
+        result = calculate_shopping_reward(
+            card, platform, amount, list(snapshot.promotions_by_card[card.id])
+        )
+        # 以未四捨五入的回饋排序
+        limits = [p.reward_limit for p in snapshot.promotions_by_card[card.id]
+                  if p.category == "online_shopping" and p.reward_rate == result["best_rate"]]
+        raw = amount * result["best_rate"] / 100
+        if limits and limits[0] is not None:
+            raw = min(raw, limits[0])
+        ranked.append((raw, {"card": card, **result}))
+    ranked.sort(key=lambda x: x[0], reverse=True)
+    return [result for _, result in ranked[:top_n]]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_index_matches_full_scan(seed):
+    snapshot = _snapshot(60, seed)
+
+    for amount in [0, 1, 999, 1000, 2000, 4000, 5000, 9999, 20000, 100000]:
+        for top_n in (1, 3, 10):
+            expected = _brute_force(snapshot, "momo", amount, top_n)
+            actual = snapshot.best_cards("momo", amount, top_n)
+            assert [r["reward_amount"] for r in actual] == [
+                r["reward_amount"] for r in expected
+            ], amount
+            assert actual == expected, amount
+
+
+def test_index_switches_from_rate_to_cap():
+    cards = [
+        CreditCard(id=1, name="高回饋低上限", base_reward_rate=1.0),
+        CreditCard(id=2, name="一般卡", base_reward_rate=2.0),
+    ]
+    promotions = {1: [Promotion(category="online_shopping", reward_rate=10.0, reward_limit=300)],
+                  2: []}
+    index = BestCardIndex(RewardMatrix(cards, promotions), "online_shopping")
+
+    assert index.top(1000, 2) == [(0, 100.0), (1, 20.0)]
+    # 超過 15000 元後 2% 的卡贏過封頂 300 元的卡
+    assert index.top(20000, 2) == [(1, 400.0), (0, 300.0)]
+    with pytest.raises(ValueError):
+        index.top(1000, index.depth + 1)
+
+
+@pytest.mark.parametrize("params,status", [
+    ({"platform": "pchome", "amount": 5000}, 200),
+    ({"platform": "shopee", "amount": 5000}, 400),
+    ({"platform": "momo", "amount": -1}, 422),
+])
+async def test_best_card_api(params, status):
+    from src.main import app
+
+    snapshot = _snapshot(20, 7)
+    with patch("src.api.recommend.catalog_store.current", return_value=snapshot):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/best-card", params=params)
+
+    assert response.status_code == status
+    if status == 200:
+        body = response.json()
+        expected = _brute_force(snapshot, "pchome", 5000, 3)
+        assert [card["card_id"] for card in body["cards"]] == [r["card"].id for r in expected]
+        assert body["cards"][0]["bank_name"] == "測試銀行"
+        assert body["cards"][0]["rank"] == 1
@@ -0,0 +1,119 @@
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.db.database import Base
+from src.models import Bank, CreditCard, Promotion
+from src.recommender.catalog import CatalogSnapshot, CatalogStore
+from src.recommender.engine import RecommendationEngine, RecommendRequest
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        bank = Bank(name="測試銀行", code="test")
+        session.add(bank)
+        session.flush()
+        for i in range(3):
+            card = CreditCard(bank_id=bank.id, name=f"卡片{i}", annual_fee=0,
+                              base_reward_rate=1.0 + i)
+            session.add(card)
+            session.flush()
+            session.add(Promotion(card_id=card.id, title=f"優惠{i}", category="dining",
+                                  reward_rate=3.0 + i))
+        session.commit()
+    return engine
+
+
+def _count_queries(engine):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    return statements
+
+
+def test_snapshot_loads_catalog_in_two_queries(engine):
+    statements = _count_queries(engine)
+    with Session(engine) as session:
+        snapshot = CatalogSnapshot.load(session, version=3)
+
+    assert len(statements) == 2
+    assert snapshot.version == 3
+    assert [card.name for card in snapshot.cards] == ["卡片0", "卡片1", "卡片2"]
+    # session 關閉後仍可讀取預先載入的關聯
+    card = snapshot.cards[0]
+    assert snapshot.banks[card.bank_id].name == "測試銀行"
+    assert [p.title for p in snapshot.promotions_by_card[card.id]] == ["優惠0"]
+    # 購物最佳卡索引隨快照建立
+    assert [r["card"].name for r in snapshot.best_cards("pchome", 1000)] == [
+        "卡片2", "卡片1", "卡片0"
+    ]
+
+
+def test_recommend_with_snapshot_runs_no_queries(engine):
+    with Session(engine) as session:
+        snapshot = CatalogSnapshot.load(session)
+    statements = _count_queries(engine)
+
+    results = RecommendationEngine(catalog=snapshot).recommend(
+        RecommendRequest(spending_habits={"dining": 1.0}, monthly_amount=30000, preferences=[])
+    )
+
+    assert statements == []
+    assert results[0].card.name == "卡片2"
+
+
+def test_store_swaps_snapshot_when_version_changes(engine):
+    now = [0.0]
+    store = CatalogStore(sessionmaker(bind=engine), max_age=60, clock=lambda: now[0])
+
+    first = store.current()
+    assert store.current() is first
+
+    with Session(engine) as session:
+        session.add(CreditCard(bank_id=1, name="新卡", base_reward_rate=1.0))
+        session.commit()
+    assert store.current() is first  # 尚未通知版本變動
+
+    store.invalidate()
+    second = store.current()
+    assert second is not first
+    assert second.version == 1
+    assert len(second.cards) == 4
+
+    # 超過 max_age 也會重建（其他行程寫入的資料）
+    now[0] = 61
+    assert store.current() is not second
+    assert store.stats()["rebuilds"] == 3
+
+
+def test_store_rebuilds_with_caller_session(engine):
+    store = CatalogStore(session_factory=None)
+    with Session(engine) as session:
+        snapshot = store.current(session)
+        session.commit()  # 呼叫端之後 commit 不影響快照
+    assert snapshot.cards[0].name == "卡片0"
+    assert snapshot.promotions_by_card[snapshot.cards[0].id][0].title == "優惠0"
+    assert store.current() is snapshot
+
+
+def test_recommend_generates_reasons_only_for_returned_cards(engine):
+    with Session(engine) as session:
+        snapshot = CatalogSnapshot.load(session)
+    recommender = RecommendationEngine(catalog=snapshot)
+    request = RecommendRequest(spending_habits={"dining": 1.0}, monthly_amount=30000,
+                               preferences=[], limit=2)
+
+    with patch.object(recommender, "_generate_reasons", wraps=recommender._generate_reasons) as spy:
+        results = recommender.recommend(request)
+
+    assert [r.card.name for r in results] == ["卡片2", "卡片1"]
+    assert spy.call_count == 2
+    assert all(r.reasons for r in results)
+    # 與依分數穩定排序後截斷的結果相同
+    scores = snapshot.matrix.score(request.spending_habits, request.monthly_amount, [])
+    expected = sorted(range(len(snapshot.cards)), key=lambda i: scores.total[i], reverse=True)
+    assert [r.card for r in results] == [snapshot.cards[i] for i in expected[:2]]
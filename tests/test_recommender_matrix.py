@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from src.models import CreditCard, Promotion
+from src.recommender.matrix import RewardMatrix, top_k
+from src.recommender.scoring import calculate_total_score, estimate_monthly_reward
+
+
+def _catalog():
+    cards = [
+        CreditCard(id=1, name="免年費卡", annual_fee=0, base_reward_rate=1.0,
+                   features={"dining": True, "reward_type": "cashback"}),
+        CreditCard(id=2, name="年費卡", annual_fee=3000, base_reward_rate=2.0,
+                   features={"lounge": True}),
+        CreditCard(id=3, name="減免卡", annual_fee=1200, annual_fee_waiver="刷滿免年費",
+                   base_reward_rate=0.5),
+        CreditCard(id=4, name="無資料卡"),
+    ]
+    promotions = {
+        1: [
+            Promotion(title="網購", category="online_shopping", reward_rate=5.0, reward_limit=300),
+            # 同率以先出現者（有上限）為準
+            Promotion(title="網購2", category="online_shopping", reward_rate=5.0),
+            Promotion(title="新戶", category="new_cardholder"),
+        ],
+        2: [
+            Promotion(title="餐飲", category="dining", reward_rate=6.0),
+            Promotion(title="低於基本回饋", category="transport", reward_rate=1.5,
+                      reward_limit=10),
+        ],
+        3: [Promotion(title="海外", category="overseas", reward_rate=3.0, reward_limit=200)],
+        4: [],
+    }
+    return cards, promotions
+
+
+@pytest.mark.parametrize("spending,amount,preferences", [
+    ({"online_shopping": 0.5, "dining": 0.3, "others": 0.2}, 30000, []),
+    ({"overseas": 0.7, "transport": 0.3}, 50000, ["no_annual_fee", "lounge_access"]),
+    ({"dining": 1.0}, 0, ["cashback", "unknown", "dining"]),
+])
+def test_matrix_matches_scalar_scoring(spending, amount, preferences):
+    cards, promotions = _catalog()
+    scores = RewardMatrix(cards, promotions).score(spending, amount, preferences)
+
+    for i, card in enumerate(cards):
+        expected = calculate_total_score(card, spending, amount, preferences, promotions[card.id])
+        actual = scores.for_card(i)
+        for key, value in expected.items():
+            assert actual[key] == pytest.approx(value), (card.name, key)
+        assert actual["monthly_reward"] == pytest.approx(
+            estimate_monthly_reward(card, spending, amount, promotions[card.id])
+        )
+
+
+def test_matrix_columns_and_fee_filter():
+    cards, promotions = _catalog()
+    matrix = RewardMatrix(cards, promotions)
+
+    rates, caps = matrix.columns(["online_shopping", "not_in_catalog"])
+    assert rates[0].tolist() == [5.0, 1.0]
+    assert caps[0].tolist() == [300, float("inf")]
+    assert rates[3].tolist() == [0.0, 0.0]
+    # 有年費且沒有減免條件的卡
+    assert matrix.fee_blocked.tolist() == [False, True, False, False]
+    assert matrix.monthly_rewards({"online_shopping": 1.0}, 100000, apply_limits=False)[0] == 5000
+
+
+def test_score_many_matches_single_profile_scoring():
+    cards, promotions = _catalog()
+    matrix = RewardMatrix(cards, promotions)
+    profiles = [
+        ({"online_shopping": 0.5, "dining": 0.3, "others": 0.2}, 30000, []),
+        ({"overseas": 0.7, "transport": 0.3}, 50000, ["no_annual_fee", "lounge_access"]),
+        ({"dining": 1.0}, 0, ["cashback", "unknown", "dining"]),
+    ]
+
+    batch = matrix.score_many(profiles)
+
+    assert batch.total.shape == (3, 4)
+    for p, (spending, amount, preferences) in enumerate(profiles):
+        single = matrix.score(spending, amount, preferences)
+        for field in ("total", "reward_score", "feature_score", "promotion_score",
+                      "annual_fee_roi_score", "monthly_reward"):
+            assert getattr(batch, field)[p] == pytest.approx(getattr(single, field)), field
+
+
+def test_top_k_orders_ties_by_index():
+    totals = np.array([50.0, 80.0, 50.0, -np.inf, 80.0, 50.0])
+
+    assert top_k(totals, 3).tolist() == [1, 4, 0]
+    assert top_k(totals, 10).tolist() == [1, 4, 0, 2, 5, 3]
+    assert top_k(totals, 0).tolist() == []
@@ -0,0 +1,137 @@
+import itertools
+import random
+from unittest.mock import patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from src.models import CreditCard, Promotion
+from src.recommender.matrix import RewardMatrix
+from src.recommender.portfolio import PortfolioOptimizer
+from src.recommender.scoring import estimate_monthly_reward
+
+SPENDING = {"dining": 0.3, "online_shopping": 0.3, "overseas": 0.2, "transport": 0.1,
+            "others": 0.1}
+
+
+def _random_catalog(n, seed):
+    rnd = random.Random(seed)
+    categories = ["dining", "online_shopping", "overseas", "transport", "travel"]
+    cards, promotions = [], {}
+    for i in range(n):
+        card = CreditCard(id=i + 1, name=f"卡片{i}", annual_fee=rnd.choice([0, 0, 1200, 3000]),
+                          base_reward_rate=rnd.choice([0.5, 1.0, 1.2]))
+        cards.append(card)
+        promotions[card.id] = [
+            Promotion(category=rnd.choice(categories), reward_rate=rnd.choice([2, 3, 5, 8]),
+                      reward_limit=rnd.choice([None, 100, 300, 500]))
+            for _ in range(rnd.randint(0, 3))
+        ]
+    return cards, promotions
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_optimizer_matches_brute_force(seed):
+    cards, promotions = _random_catalog(12, seed)
+    optimizer = PortfolioOptimizer(RewardMatrix(cards, promotions), SPENDING, 40000)
+
+    for k in (1, 2, 3):
+        portfolio = optimizer.optimize(k)
+        brute = max(
+            optimizer.value(combo)
+            for size in range(1, k + 1)
+            for combo in itertools.combinations(range(len(cards)), size)
+        )
+        assert portfolio.net_monthly_value == pytest.approx(brute)
+        assert 1 <= len(portfolio.cards) <= k
+
+
+def test_single_card_value_matches_estimate():
+    cards, promotions = _random_catalog(8, 42)
+    optimizer = PortfolioOptimizer(RewardMatrix(cards, promotions), SPENDING, 40000)
+
+    for i, card in enumerate(cards):
+        expected = estimate_monthly_reward(card, SPENDING, 40000, promotions[card.id])
+        assert optimizer.value([i]) == pytest.approx(expected - (card.annual_fee or 0) / 12)
+
+
+def test_spills_to_next_card_after_cap():
+    cards = [
+        CreditCard(id=1, name="高回饋有上限", annual_fee=0, base_reward_rate=0.5),
+        CreditCard(id=2, name="一般卡", annual_fee=0, base_reward_rate=2.0),
+        CreditCard(id=3, name="年費卡", annual_fee=12000, base_reward_rate=3.0),
+    ]
+    promotions = {
+        1: [Promotion(category="dining", reward_rate=10.0, reward_limit=500)],
+        2: [],
+        3: [],
+    }
+    optimizer = PortfolioOptimizer(RewardMatrix(cards, promotions), {"dining": 1.0}, 20000)
+
+    portfolio = optimizer.optimize(2)
+
+    assert [card.id for card in portfolio.cards] == [1, 2]
+    dining = portfolio.assignments["dining"]
+    # 前 5000 元刷到上限 500 元，其餘 15000 元改刷 2% 的卡
+    assert [(a.card_id, a.spend, a.reward) for a in dining] == [(1, 5000, 500), (2, 15000, 300)]
+    assert portfolio.net_monthly_value == pytest.approx(800)
+    # 3% 年費卡每月 600 元回饋抵不過 1000 元年費攤提
+    assert optimizer.value([0, 2]) < portfolio.net_monthly_value
+
+
+def test_prunes_cards_dominated_by_k_others():
+    cards = [CreditCard(id=i + 1, name=f"卡片{i}", annual_fee=0, base_reward_rate=rate)
+             for i, rate in enumerate([3.0, 2.0, 1.0, 2.0])]
+    optimizer = PortfolioOptimizer(RewardMatrix(cards, {}), {"dining": 1.0}, 10000)
+
+    assert optimizer._prune(optimizer.candidates, 1).tolist() == [0]
+    # 相同的卡只留索引較小者不被支配
+    assert optimizer._prune(optimizer.candidates, 2).tolist() == [0, 1]
+
+
+def test_large_catalog_prunes_search():
+    cards, promotions = _random_catalog(400, 1)
+    portfolio = PortfolioOptimizer(RewardMatrix(cards, promotions), SPENDING, 40000).optimize(3)
+
+    assert len(portfolio.cards) <= 3
+    # 400 選 3 有一千萬種組合，剪枝後只評估其中極小部分
+    assert portfolio.explored < 100_000
+
+
+@pytest.mark.parametrize("cards,status", [(2, 200), (0, 400), (4, 400)])
+async def test_portfolio_api(cards, status):
+    from src.main import app
+    from src.models import Bank
+    from src.recommender.catalog import CatalogSnapshot
+
+    bank = Bank(id=1, name="測試銀行", code="test")
+    catalog_cards = [
+        CreditCard(id=1, bank_id=1, bank=bank, name="餐飲卡", annual_fee=0,
+                   base_reward_rate=0.5),
+        CreditCard(id=2, bank_id=1, bank=bank, name="一般卡", annual_fee=0,
+                   base_reward_rate=1.0),
+    ]
+    promotions = {1: (Promotion(category="dining", reward_rate=5.0, reward_limit=100),), 2: ()}
+    snapshot = CatalogSnapshot(
+        version=0, built_at=0.0, cards=tuple(catalog_cards), banks={1: bank},
+        promotions_by_card=promotions, matrix=RewardMatrix(catalog_cards, promotions),
+    )
+
+    with patch("src.api.recommend.catalog_store.current", return_value=snapshot):
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post(
+                "/api/recommend/portfolio",
+                json={"spending_habits": {"dining": 1.0}, "monthly_amount": 10000,
+                      "cards": cards},
+            )
+
+    assert response.status_code == status
+    if status == 200:
+        body = response.json()
+        assert [card["card_name"] for card in body["cards"]] == ["餐飲卡", "一般卡"]
+        assert body["assignments"]["dining"] == [
+            {"card_id": 1, "spend": 2000.0, "reward": 100.0},
+            {"card_id": 2, "spend": 8000.0, "reward": 80.0},
+        ]
+        assert body["net_monthly_value"] == 180.0
@@ -164,3 +164,23 @@ class TestCheckExpiringPromotions:
         check_expiring_promotions()
 
         mock_dispatcher_cls.assert_not_called()
+
+
+def test_create_scheduler_registers_all_jobs():
+    from src.scheduler.runner import create_scheduler
+
+    scheduler = create_scheduler()
+    jobs = {job.id: job for job in scheduler.get_jobs()}
+
+    assert set(jobs) == {
+        "daily_promotion_crawl",
+        "weekly_card_crawl",
+        "cleanup_expired",
+        "check_new_promotions",
+        "check_expiring_promotions",
+        "price_tracking",
+        "flash_deals_refresh",
+        "flash_deals_purge",
+    }
+    assert jobs["flash_deals_refresh"].func.__name__ == "run_flash_deals_refresh"
+    assert jobs["flash_deals_purge"].func.__name__ == "run_flash_deals_purge"
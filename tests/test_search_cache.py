@@ -0,0 +1,99 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.trackers.base import ProductResult
+from src.trackers.search_cache import SearchCache, normalize_keyword
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _result(name):
+    return ProductResult(platform="pchome", product_id=name, name=name, url=name, price=100)
+
+
+def _tracker(*side_effect):
+    tracker = MagicMock()
+    tracker.platform = "pchome"
+    tracker.search_products = AsyncMock(side_effect=list(side_effect))
+    return tracker
+
+
+def test_normalize_keyword():
+    assert normalize_keyword("  ＳＯＮＹ   耳機 ") == "sony 耳機"
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_within_ttl():
+    clock = FakeClock()
+    cache = SearchCache(ttl=60, stale_ttl=600, clock=clock)
+    tracker = _tracker([_result("A")], [_result("B")])
+
+    assert (await cache.search(tracker, "Sony 耳機"))[0].name == "A"
+    clock.now = 30
+    assert (await cache.search(tracker, "sony  耳機"))[0].name == "A"
+
+    assert tracker.search_products.call_count == 1
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_searches_share_one_fetch():
+    cache = SearchCache(ttl=60, stale_ttl=600)
+    release = asyncio.Event()
+
+    async def slow_search(keyword):
+        await release.wait()
+        return [_result(keyword)]
+
+    tracker = _tracker()
+    tracker.search_products.side_effect = slow_search
+
+    tasks = [asyncio.create_task(cache.search(tracker, "airpods")) for _ in range(5)]
+    await asyncio.sleep(0.05)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert tracker.search_products.call_count == 1
+    assert all(r[0].name == "airpods" for r in results)
+    assert cache.stats()["joined"] == 4
+
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate():
+    clock = FakeClock()
+    cache = SearchCache(ttl=60, stale_ttl=600, clock=clock)
+    tracker = _tracker([_result("OLD")], [_result("NEW")])
+    await cache.search(tracker, "ipad")
+
+    clock.now = 120
+    assert (await cache.search(tracker, "ipad"))[0].name == "OLD"
+    for _ in range(100):  # 等背景更新完成
+        if cache.stats()["inflight"] == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert (await cache.search(tracker, "ipad"))[0].name == "NEW"
+
+    # 超過 stale 期限就必須重新搜尋
+    clock.now = 10_000
+    tracker.search_products.side_effect = [[_result("FRESH")]]
+    assert (await cache.search(tracker, "ipad"))[0].name == "FRESH"
+
+
+@pytest.mark.asyncio
+async def test_errors_and_empty_results_are_not_cached():
+    cache = SearchCache(ttl=60, stale_ttl=600)
+    tracker = _tracker(RuntimeError("blocked"), [], [_result("A")])
+
+    with pytest.raises(RuntimeError):
+        await cache.search(tracker, "switch")
+    assert await cache.search(tracker, "switch") == []
+    assert (await cache.search(tracker, "switch"))[0].name == "A"
+    assert cache.stats()["errors"] == 1
@@ -0,0 +1,72 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.trackers.adapter import SyncTrackerAdapter, ThreadedAsyncTracker, as_async
+from src.trackers.base import AsyncBaseTracker, PriceSnapshot
+
+
+class FakeAsyncTracker(AsyncBaseTracker):
+    platform = "fake"
+
+    def __init__(self):
+        self.loops = set()
+        self.closed = False
+
+    async def search_products(self, keyword):
+        self.loops.add(asyncio.get_running_loop())
+        return []
+
+    async def fetch_product_by_url(self, url):
+        return None
+
+    async def fetch_price(self, product_id):
+        self.loops.add(asyncio.get_running_loop())
+        return PriceSnapshot(price=len(product_id))
+
+    async def fetch_flash_deals(self):
+        return []
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_adapter_runs_on_single_loop_across_threads():
+    tracker = FakeAsyncTracker()
+    adapter = SyncTrackerAdapter(tracker)
+
+    threads = [threading.Thread(target=adapter.fetch_price, args=("abc",)) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert adapter.fetch_prices(["a", "bb"]) == {
+        "a": PriceSnapshot(price=1), "bb": PriceSnapshot(price=2),
+    }
+    assert len(tracker.loops) == 1
+    adapter.close()
+    assert tracker.closed is True
+
+
+@pytest.mark.asyncio
+async def test_aio_proxy_does_not_run_on_caller_loop():
+    tracker = FakeAsyncTracker()
+    adapter = SyncTrackerAdapter(tracker)
+
+    assert as_async(adapter) is adapter.aio
+    await adapter.aio.search_products("x")
+    assert asyncio.get_running_loop() not in tracker.loops
+    adapter.close()
+
+
+@pytest.mark.asyncio
+async def test_as_async_wraps_plain_sync_tracker():
+    sync_tracker = MagicMock(platform="legacy")
+    sync_tracker.fetch_price.return_value = PriceSnapshot(price=10)
+
+    tracker = as_async(sync_tracker)
+    assert isinstance(tracker, ThreadedAsyncTracker)
+    assert (await tracker.fetch_price("A")).price == 10
@@ -0,0 +1,51 @@
+import threading
+from unittest.mock import MagicMock
+
+from src.trackers.registry import TrackerRegistry
+
+
+def _registry(created):
+    def factory():
+        tracker = MagicMock()
+        tracker.stats.return_value = {"requests": 0}
+        created.append(tracker)
+        return tracker
+
+    return TrackerRegistry({"pchome": factory})
+
+
+def test_registry_returns_same_instance():
+    created = []
+    registry = _registry(created)
+    assert registry.get("pchome") is registry.get("pchome")
+    assert len(created) == 1
+
+
+def test_registry_unknown_platform():
+    assert _registry([]).get("shopee") is None
+
+
+def test_registry_thread_safe_single_instance():
+    created = []
+    registry = _registry(created)
+    threads = [threading.Thread(target=registry.get, args=("pchome",)) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(created) == 1
+    assert registry.stats()["pchome"]["hits"] == 20
+
+
+def test_registry_close_all():
+    created = []
+    registry = _registry(created)
+    registry.get("pchome")
+    registry.close_all()
+
+    created[0].close.assert_called_once()
+    assert registry.stats() == {}
+    # 關閉後再次取用會重新建立
+    registry.get("pchome")
+    assert len(created) == 2